@@ -1,4 +1,11 @@
 # speech_analysis/__init__.py
-from .analyzer import router
-
 __all__ = ["router"]
+
+
+def __getattr__(name):
+    # Load the router lazily: chunk-analysis worker processes import
+    # speech_analysis.utils and must not load Whisper/NLTK on startup
+    if name == "router":
+        from .analyzer import router
+        return router
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
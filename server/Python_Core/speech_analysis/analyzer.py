@@ -1,24 +1,43 @@
 # speech_analysis/analyzer.py
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, WebSocket
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 import librosa
-import noisereduce as nr
 import soundfile as sf
 import os
 import numpy as np
 import json
+import queue
+import threading
+import time
+import uuid
 from datetime import datetime
 
 # Import speech analysis services
-from .utils.audio_utils import split_audio_into_chunks, extract_features
-from .services.transcribe_audio import transcribe_audio
+from .utils.audio_utils import FEATURE_GROUPS, FRAME_LENGTH, HOP_LENGTH, extract_clip_features
+from .utils.feature_table import ChunkFeatureTable
+from .utils.parallel_processing import CHUNK_WORKERS, extract_features_parallel
+from .utils.streaming import stream_chunk_features, write_denoised_wav
+from .utils.audio_io import RESAMPLER, decode_audio, decode_audio_bytes
+from .utils.denoise import SNR_THRESHOLD_DB, reduce_noise
+from .utils.encoding import dumps, json_response, to_columns
+from .utils.pipeline import Stage, get_executor, resolve_stages, run_pipeline
+from .utils.pitch_tracking import F0_BACKEND, FMAX, FMIN
+from .utils.result_cache import ResultCache, cache_dir, content_key, file_blocks
+from .utils.speech_rate import estimate_speech_rate
+from .utils.transcript import TranscriptDocument
+from .utils.vad import VAD_ENABLED, speech_regions, summarize_regions, whisper_clips
+from .services.transcribe_audio import BACKEND, FW_COMPUTE, TRANSCRIPTION_TIERS, transcribe_audio, transcribe_window
+from .services.live_transcription import LiveTranscriber
 from .services.fluency_service import calculate_fluency
 from .services.context_service import detect_overall_context
 from .services.emotion_service import aggregate_emotions
 from .services.tone_evaluator import evaluate_tone
-from .services.pronunciation_service import assess_pronunciation_from_transcription
-from .services.pitch_service import analyze_pitch_variation
+from .services.pronunciation_service import assess_pronunciation_from_transcription, pronunciation_settings
+from .services.pitch_service import CONTOUR_POINTS, analyze_pitch_variation, pitch_contour
 from .services.scoring_service import calculate_scores
+from .services.prompt_match_service import match_prompt
 import nltk
 
 # Ensure NLTK resources
@@ -37,19 +56,192 @@ PROCESSED_DIR = os.path.join(BASE_DIR, "processed")
 TEMP_DIR = os.path.join(BASE_DIR, "temp")
 CHUNKS_DIR = os.path.join(BASE_DIR, "chunks")
 
+# Recordings longer than this are truncated unless streaming mode is used
+MAX_DURATION_SECONDS = 120
+
+# Analysis parameters; part of the result cache key
+CHUNK_DURATION = 5
+NOISE_PROP_DECREASE = 0.75
+MONOTONE_THRESHOLD = 0.15
+# Bump when the analysis output changes so stale cached results are not served
+ANALYSIS_VERSION = 9
+
+
+def _tier_setting(name, default):
+    """Transcription tier named by env var `name`; unknown names fall back to `default` with a warning."""
+    tier = os.getenv(name, default)
+    if tier not in TRANSCRIPTION_TIERS:
+        print(f"Warning: Unknown {name} '{tier}' (available: {', '.join(TRANSCRIPTION_TIERS)}), using {default}")
+        return default
+    return tier
+
+
+# Transcription tier per route (see transcribe_audio.TRANSCRIPTION_TIERS)
+PROCESS_AUDIO_TIER = _tier_setting("SPEECH_PROCESS_TIER", "accurate")
+EVALUATE_TIER = _tier_setting("SPEECH_EVALUATE_TIER", "fast")
+LIVE_TIER = _tier_setting("SPEECH_LIVE_TIER", "fast")
+
+# Longest live (/speech/live) session; the report is sent when it is reached
+LIVE_MAX_SECONDS = 600
+
+# Result cache (process-audio):
+#   SPEECH_RESULT_CACHE_SIZE          results kept in memory per process, not shared across workers (0 disables)
+#   SPEECH_RESULT_CACHE_DISK          share results across workers/restarts on disk (1/0, off by default)
+#   SPEECH_RESULT_CACHE_DISK_ENTRIES  disk entries kept before the oldest are pruned
+#   SPEECH_CACHE_DIR                  disk tier root, outside the source tree (see result_cache.cache_dir)
+RESULT_CACHE_SIZE = int(os.getenv("SPEECH_RESULT_CACHE_SIZE", "64"))
+RESULT_CACHE_DISK = os.getenv("SPEECH_RESULT_CACHE_DISK", "0") == "1"
+RESULT_CACHE_DISK_ENTRIES = int(os.getenv("SPEECH_RESULT_CACHE_DISK_ENTRIES", "512"))
+RESULT_CACHE_DIR = cache_dir("results")
+
 # Ensure folders exist
 for folder in [UPLOADS_DIR, PROCESSED_DIR, TEMP_DIR, CHUNKS_DIR]:
     os.makedirs(folder, exist_ok=True)
 
+RESULT_CACHE = ResultCache(
+    max_entries=RESULT_CACHE_SIZE,
+    disk_dir=RESULT_CACHE_DIR if RESULT_CACHE_DISK and RESULT_CACHE_SIZE > 0 else None,
+    max_disk_entries=RESULT_CACHE_DISK_ENTRIES
+)
+
+
+def compute_chunk_features(y, sr, chunk_duration=5, include=FEATURE_GROUPS, regions=None):
+    """
+    Chunk features via the process pool when SPEECH_CHUNK_WORKERS > 1, else the whole-clip engine.
+    `regions` (speech regions from vad.speech_regions) replace the fixed chunk grid.
+    """
+    if CHUNK_WORKERS > 1:
+        return extract_features_parallel(y, sr, chunk_duration=chunk_duration, workers=CHUNK_WORKERS,
+                                         include=include, regions=regions)
+    return extract_clip_features(y, sr, chunk_duration=chunk_duration, include=include, regions=regions)
+
+
+def detect_speech(y, sr):
+    """Speech regions used as analysis units, or None when SPEECH_VAD is off."""
+    return speech_regions(y, sr, max_region_seconds=CHUNK_DURATION) if VAD_ENABLED else None
+
+
+def load_clip(file_path, sr):
+    """Decode a recording for analysis. Returns (samples truncated to MAX_DURATION_SECONDS, full duration)."""
+    y = decode_audio(file_path, sr=sr)
+    duration = len(y) / sr
+
+    if duration < 2:
+        raise HTTPException(status_code=400, detail="Audio too short. Minimum 2 seconds required.")
+    elif duration > MAX_DURATION_SECONDS:
+        y = y[:int(MAX_DURATION_SECONDS * sr)]
+    return y, duration
+
+
+def denoise(y, sr):
+    """SNR-gated noise reduction. Returns (samples, {"applied", "snr_db", "seconds"})."""
+    return reduce_noise(y, sr, prop_decrease=NOISE_PROP_DECREASE)
+
+
+def analysis_cache_key(blocks, sr, streaming, prompt=None, contour_points=CONTOUR_POINTS):
+    """
+    Content key for a recording: its decoded PCM (the raw upload bytes in
+    streaming mode, which never holds the whole decode) plus every setting that
+    changes the analysis output (a setting left out would serve results
+    computed under another configuration).
+    """
+    params = {
+        "version": ANALYSIS_VERSION,
+        "sr": sr,
+        "streaming": streaming,
+        "prompt": prompt,
+        "contour_points": contour_points,
+        "max_duration": MAX_DURATION_SECONDS,
+        "chunk_duration": CHUNK_DURATION,
+        "prop_decrease": NOISE_PROP_DECREASE,
+        "denoise_snr_db": SNR_THRESHOLD_DB,
+        "resampler": RESAMPLER,
+        "vad": VAD_ENABLED,
+        "monotone_threshold": MONOTONE_THRESHOLD,
+        # The process pool tracks F0 per chunk and returns no pitch contour
+        "chunk_engine": "process_pool" if CHUNK_WORKERS > 1 else "whole_clip",
+        "f0": {"backend": F0_BACKEND, "fmin": FMIN, "fmax": FMAX, "frame_length": FRAME_LENGTH,
+               "hop_length": HOP_LENGTH},
+        "pronunciation": pronunciation_settings(PROCESS_AUDIO_TIER),
+        "transcriber": BACKEND,
+        "tier": TRANSCRIPTION_TIERS[PROCESS_AUDIO_TIER] if BACKEND == "faster_whisper" else "base.en",
+        "compute_type": FW_COMPUTE if BACKEND == "faster_whisper" else None,
+    }
+    return content_key(blocks, params)
+
+
+def write_transcript(file_path, text):
+    transcription_filename = os.path.splitext(os.path.basename(file_path))[0] + "_transcription.txt"
+    transcription_path = os.path.join(PROCESSED_DIR, transcription_filename)
+    with open(transcription_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return transcription_path
+
+
+def defer_write_wav(path, y, sr, clean=False, source_path=None):
+    """
+    Write the processed WAV in the background; nothing on the hot path waits for it.
+    With clean=True the samples are denoised first (used when a cached result is served).
+    Without `y`, `source_path` is decoded and denoised block by block (cached streaming requests).
+    """
+    def _write():
+        try:
+            if y is None:
+                write_denoised_wav(source_path, path, sr=sr, prop_decrease=NOISE_PROP_DECREASE)
+            else:
+                sf.write(path, denoise(y, sr)[0] if clean else y, sr)
+        except Exception as e:
+            print(f"[SPEECH ERROR]: Failed to write processed audio {path}: {str(e)}")
+    get_executor().submit(_write)
+
+
+def analyze_streaming(file_path, output_path, sr):
+    """
+    Streaming ingestion: decode, denoise and analyse the recording block by
+    block, appending the denoised audio to `output_path`. This bounds memory
+    only: the audio stage ends after the last block, so later stages do not start early.
+    Returns (ChunkFeatureTable, duration_seconds, denoise report over all blocks).
+    """
+    tables = []
+    duration = 0.0
+    report = {"applied": False, "snr_db": None, "seconds": 0.0}
+    for block in stream_chunk_features(file_path, sr=sr, chunk_duration=CHUNK_DURATION, output_path=output_path,
+                                       prop_decrease=NOISE_PROP_DECREASE, vad=VAD_ENABLED):
+        tables.append(block["chunks"])
+        duration = block["end_time"]
+        block_report = block["denoise"]
+        report["applied"] = report["applied"] or block_report["applied"]
+        # The noisiest block decides the recording's SNR
+        snr_db = block_report["snr_db"]
+        if snr_db is not None and (report["snr_db"] is None or snr_db < report["snr_db"]):
+            report["snr_db"] = snr_db
+        report["seconds"] = round(report["seconds"] + block_report["seconds"], 4)
+        print(f"[SPEECH] Streamed block {block['block_index']} ({block['start_time']:.0f}-{duration:.0f}s)")
+    return ChunkFeatureTable.concat(tables), duration, report
+
 
 class ProcessAudioRequest(BaseModel):
     filePath: str
     outputPath: str
+    # Decode and analyse block by block at flat memory; no length limit
+    streaming: bool = False
+    # Write the denoised WAV to outputPath (off the critical path)
+    saveProcessed: bool = True
+    # Expected text (reading prompt or question); feeds the prompt_match score
+    prompt: str | None = None
+    # Points of the pitchContour chart (0 = no contour)
+    contourPoints: int = CONTOUR_POINTS
+    # Response sections to build (e.g. ["transcription", "scoring"]); None = all.
+    # Stages only the other sections need are not run.
+    fields: list[str] | None = None
+    # "full", or "compact": per-word/per-chunk arrays as columns (see COMPACT_SECTIONS)
+    detail: str = "full"
 
 
 class EvaluateFeatureRequest(BaseModel):
     audioData: str | None = None
-    feature: str | None = None
+    # One feature name, a list of them, or "all"; shared stages run once
+    feature: str | list[str] | None = None
     question: str | None = None
 
 
@@ -94,82 +286,326 @@ def generate_performance_summary(scoring_result, pitch_result):
     }
 
 
+def build_process_audio_stages(file_path, output_path, sr, y=None, duration=None, streaming=False,
+                               save_processed=True, transcription=None, prompt=None,
+                               contour_points=CONTOUR_POINTS, tier=PROCESS_AUDIO_TIER):
+    """
+    Stage graph for /speech/process-audio. `y`/`duration` come from load_clip
+    (already decoded to compute the cache key); streaming mode decodes itself.
+    A ready `transcription` (live sessions) replaces the Whisper stage; `tier`
+    is the transcription tier that produces (or produced) the transcript.
+
+    audio -> transcription -> document -> pronunciation / fluency / context
+    audio -> transcription -> prompt_match / transcript_file
+    audio -> chunk_features -> pitch / pitch_contour / emotion / speech_rate
+    context + emotion -> tone
+    pronunciation + fluency + pitch + tone + prompt_match + speech_rate -> scoring -> summary
+
+    The denoised signal is transcribed from memory. Streaming mode writes the
+    WAV to `output_path` while decoding and transcribes that file instead
+    (run_process_audio passes a scratch path when saveProcessed is off). The audio stage also
+    finds the speech regions: they are the chunk units and the Whisper clips.
+    The transcript is tokenized once into a TranscriptDocument for the text services.
+    """
+    def load_audio():
+        if streaming:
+            chunk_features, streamed_duration, report = analyze_streaming(file_path, output_path, sr)
+            if streamed_duration < 2:
+                raise HTTPException(status_code=400, detail="Audio too short. Minimum 2 seconds required.")
+            segmentation = None
+            if VAD_ENABLED:
+                starts = np.round(chunk_features.get("start_time") * sr).astype(np.int64)
+                ends = np.round(chunk_features.get("end_time") * sr).astype(np.int64)
+                segmentation = summarize_regions(starts, ends, int(streamed_duration * sr), sr)
+            return {"y": None, "duration": streamed_duration, "chunk_features": chunk_features, "denoise": report,
+                    "regions": None, "segmentation": segmentation}
+
+        y_clean, report = denoise(y, sr)
+        if save_processed:
+            defer_write_wav(output_path, y_clean, sr)
+        regions = detect_speech(y_clean, sr)
+        segmentation = summarize_regions(*regions, len(y_clean), sr) if regions is not None else None
+        return {"y": y_clean, "duration": duration, "denoise": report, "regions": regions,
+                "segmentation": segmentation}
+
+    def chunk_features(audio):
+        if "chunk_features" in audio:
+            return audio["chunk_features"]
+        return compute_chunk_features(audio["y"], sr, chunk_duration=CHUNK_DURATION, regions=audio["regions"])
+
+    def transcribe(audio):
+        if transcription is not None:
+            return transcription
+        if audio["y"] is None:
+            result = transcribe_audio(output_path, tier=tier)
+        else:
+            clips = whisper_clips(*audio["regions"], sr) if audio["regions"] is not None else None
+            result = transcribe_audio(audio["y"], tier=tier, clip_timestamps=clips)
+        if "error" in result:
+            raise HTTPException(status_code=500, detail=result["error"])
+        return result
+
+    def transcript_file(result):
+        return write_transcript(file_path, result.get("text", ""))
+
+    def scoring(pronunciation, fluency, pitch, tone, prompt_match, speech_rate):
+        ratio = prompt_match["ratio"] if prompt_match else 0
+        if fluency.get("error"):
+            # No usable transcript: pace the speaker from the acoustic speaking rate instead
+            fluency = dict(fluency, pacing_score=speech_rate["pacing_score"])
+        return calculate_scores(pronunciation, fluency, pitch, tone, prompt_match_ratio=ratio)
+
+    return [
+        Stage("audio", load_audio),
+        Stage("chunk_features", chunk_features, deps=["audio"]),
+        Stage("transcription", transcribe, deps=["audio"]),
+        Stage("transcript_file", transcript_file, deps=["transcription"]),
+        Stage("document", TranscriptDocument.from_transcription, deps=["transcription"]),
+        Stage("pronunciation", lambda document: assess_pronunciation_from_transcription(document, tier=tier),
+              deps=["document"]),
+        Stage("fluency", calculate_fluency, deps=["document"]),
+        Stage("context", detect_overall_context, deps=["document"]),
+        Stage("prompt_match", lambda t: match_prompt(t.get("text", ""), prompt), deps=["transcription"]),
+        Stage("pitch", lambda ch: analyze_pitch_variation(ch, monotone_threshold=MONOTONE_THRESHOLD),
+              deps=["chunk_features"]),
+        Stage("pitch_contour", lambda ch: pitch_contour(ch, points=contour_points), deps=["chunk_features"]),
+        Stage("emotion", aggregate_emotions, deps=["chunk_features"]),
+        Stage("speech_rate", estimate_speech_rate, deps=["chunk_features"]),
+        Stage("tone", lambda context, emotion: evaluate_tone(context[0], str(emotion[0])),
+              deps=["context", "emotion"]),
+        Stage("scoring", scoring,
+              deps=["pronunciation", "fluency", "pitch", "tone", "prompt_match", "speech_rate"]),
+        Stage("summary", generate_performance_summary, deps=["scoring", "pitch"]),
+    ]
+
+
+# Stages whose results make up the analysis (everything but side-effect stages)
+ANALYSIS_TARGETS = ["transcription", "pronunciation", "fluency", "pitch", "pitch_contour", "context", "emotion", "tone",
+                    "prompt_match", "speech_rate", "scoring", "summary"]
+
+
+def tone_section(results):
+    overall_context, _ = results["context"]
+    overall_emotion, _ = results["emotion"]
+    return {
+        "overallContext": overall_context,
+        "overallEmotion": str(overall_emotion),
+        "evaluation": results["tone"]
+    }
+
+
+# Response section produced when a stage finishes: stage -> (section, builder)
+SECTION_STAGES = {
+    "transcription": ("transcription", lambda results: results["transcription"]),
+    "pronunciation": ("pronunciation", lambda results: results["pronunciation"]),
+    "fluency": ("fluency", lambda results: results["fluency"]),
+    "pitch": ("pitch", lambda results: results["pitch"]),
+    "pitch_contour": ("pitchContour", lambda results: results["pitch_contour"]),
+    "tone": ("toneAnalysis", tone_section),
+    "prompt_match": ("promptMatch", lambda results: results["prompt_match"]),
+    "speech_rate": ("speechRate", lambda results: results["speech_rate"]),
+    "scoring": ("scoring", lambda results: results["scoring"]),
+    "summary": ("summary", lambda results: results["summary"]),
+}
+
+
+SECTION_NAMES = {section: stage for stage, (section, _) in SECTION_STAGES.items()}
+DETAIL_LEVELS = ("full", "compact")
+
+
+def requested_sections(fields):
+    """Validate `fields` and return the requested sections in response order (None = all)."""
+    if fields is None:
+        return None
+    if not fields:
+        raise HTTPException(status_code=400,
+                            detail=f"fields must name at least one section. Available: {', '.join(SECTION_NAMES)}")
+    unknown = [f for f in fields if f not in SECTION_NAMES]
+    if unknown:
+        raise HTTPException(status_code=400,
+                            detail=f"Unknown fields {unknown}. Available: {', '.join(SECTION_NAMES)}")
+    return [section for section in SECTION_NAMES if section in fields]
+
+
+def section_targets(stages, sections):
+    """Pipeline targets for the requested sections (None = the whole analysis)."""
+    if sections is None:
+        return None
+    targets = [SECTION_NAMES[section] for section in sections]
+    needed = {stage.name for stage in resolve_stages(stages, targets)}
+    # Side effect that belongs to the transcript: only when it is computed anyway
+    if "transcription" in needed:
+        targets.append("transcript_file")
+    return targets
+
+
+def assemble_analysis(results, sections=None):
+    """Shape pipeline results into the analysis sections of the response (`sections` None = all)."""
+    audio = results["audio"]
+    analysis = {"duration": audio["duration"], "denoise": audio["denoise"], "segmentation": audio["segmentation"]}
+    for stage, (section, build) in SECTION_STAGES.items():
+        if sections is None or section in sections:
+            analysis[section] = build(results)
+    return analysis
+
+
+def project_analysis(analysis, sections):
+    """Drop the sections that were not requested from a full analysis."""
+    if sections is None:
+        return analysis
+    return {k: v for k, v in analysis.items() if k not in SECTION_NAMES or k in sections}
+
+
+def compact_transcription(transcription):
+    segments = transcription.get("segments", []) or []
+    words = [dict(w, segment=i) for i, seg in enumerate(segments) for w in seg.get("words", []) or []]
+    compact = {k: v for k, v in transcription.items() if k != "segments"}
+    # Segment text repeats `text`; with word timestamps it is also recoverable from the words
+    compact["segments"] = to_columns(segments, keys=["start", "end"] if words else ["start", "end", "text"])
+    if words:
+        compact["words"] = to_columns(words, keys=["word", "start", "end", "probability", "segment"])
+    return compact
+
+
+def compact_pronunciation(pronunciation):
+    if "results" not in pronunciation:
+        return pronunciation
+    # Feedback strings repeat across words: send each distinct one once
+    compact = dict(pronunciation, results=to_columns(pronunciation["results"], dictionary=["feedback"]))
+    if "low_confidence_words" in pronunciation:
+        compact["low_confidence_words"] = to_columns(pronunciation["low_confidence_words"],
+                                                     keys=["word", "start", "end", "probability"])
+    return compact
+
+
+def compact_fluency(fluency):
+    return dict(fluency, **{k: to_columns(fluency[k]) for k in ("filler_words", "pauses") if k in fluency})
+
+
+def compact_pitch(pitch):
+    return dict(pitch, chunks=to_columns(pitch["chunks"])) if "chunks" in pitch else pitch
+
+
+# detail="compact": section -> encoder turning its per-item lists into {key: [values]}
+COMPACT_SECTIONS = {
+    "transcription": compact_transcription,
+    "pronunciation": compact_pronunciation,
+    "fluency": compact_fluency,
+    "pitch": compact_pitch,
+}
+
+
+def encode_section(section, data, detail="full"):
+    encode = COMPACT_SECTIONS.get(section) if detail == "compact" else None
+    return encode(data) if encode is not None and isinstance(data, dict) else data
+
+
+def analysis_response(analysis, message, detail="full", **extra):
+    now = datetime.now()
+    recording_info = {
+        "date": now.strftime("%Y-%m-%d"),
+        "time": now.strftime("%H:%M:%S"),
+        "duration": f"{analysis['duration']:.1f} seconds"
+    }
+
+    response = {"message": message, **extra}
+    response.update((k, encode_section(k, v, detail)) for k, v in analysis.items() if k != "duration")
+    response["recordingInfo"] = recording_info
+    return response
+
+
+def prepare_process_audio(payload):
+    """Validate a process-audio request and decode it. Returns (file_path, output_path, sr, y, duration, cache_key)."""
+    file_path = payload.filePath
+    output_path = payload.outputPath
+    print(f"[SPEECH] Processing: {file_path} -> {output_path}")
+
+    if not file_path or not os.path.exists(file_path):
+        raise HTTPException(status_code=400, detail="File not found")
+    if payload.detail not in DETAIL_LEVELS:
+        raise HTTPException(status_code=400, detail=f"detail must be one of {', '.join(DETAIL_LEVELS)}")
+    requested_sections(payload.fields)
+
+    sr = 16000
+    if not output_path.lower().endswith(".wav"):
+        output_path = os.path.splitext(output_path)[0] + ".wav"
+
+    # Key the result by content: the same recording under another name is a hit.
+    # Streaming mode hashes the upload bytes instead of decoding the file an extra time
+    y, duration = (None, None) if payload.streaming else load_clip(file_path, sr)
+    blocks = file_blocks(file_path) if payload.streaming else [y]
+    cache_key = analysis_cache_key(blocks, sr, payload.streaming, prompt=payload.prompt,
+                                   contour_points=payload.contourPoints)
+    return file_path, output_path, sr, y, duration, cache_key
+
+
+def run_process_audio(payload, prepared, on_section=None):
+    """
+    Analyse a prepared request (or serve it from the result cache) and return
+    the analysis. `on_section(section, data)` is called as each requested
+    response section becomes available.
+
+    A full analysis is cached under the recording's key and also serves any
+    `fields` subset; a subset computed on its own is cached under its own key.
+    """
+    file_path, output_path, sr, y, duration, cache_key = prepared
+    sections = requested_sections(payload.fields)
+    partial_key = content_key([], {"analysis": cache_key, "sections": sections}) if sections is not None else None
+
+    analysis = RESULT_CACHE.get(cache_key)
+    if analysis is None and partial_key is not None:
+        analysis = RESULT_CACHE.get(partial_key)
+    if analysis is not None:
+        print(f"[SPEECH] Result cache hit ({cache_key[:12]})")
+        analysis = project_analysis(analysis, sections)
+        if "transcription" in analysis:
+            write_transcript(file_path, analysis["transcription"].get("text", ""))
+        if payload.saveProcessed:
+            defer_write_wav(output_path, y, sr, clean=True, source_path=file_path)
+        if on_section is not None:
+            for section in SECTION_NAMES:
+                if section in analysis:
+                    on_section(section, analysis[section])
+        return analysis
+
+    def on_result(name, result, results):
+        if on_section is not None and name in SECTION_STAGES:
+            section, build = SECTION_STAGES[name]
+            if sections is None or section in sections:
+                on_section(section, build(results))
+
+    stages = build_process_audio_stages(file_path, output_path, sr, y=y, duration=duration,
+                                        streaming=payload.streaming, save_processed=payload.saveProcessed,
+                                        prompt=payload.prompt, contour_points=payload.contourPoints)
+    targets = section_targets(stages, sections)
+    scratch_path = None
+    if payload.streaming and not payload.saveProcessed:
+        # Streaming transcribes the denoised WAV it writes; without saveProcessed
+        # that WAV is a scratch file, and it is not written at all when no stage needs it
+        needed = {stage.name for stage in resolve_stages(stages, targets or ANALYSIS_TARGETS)}
+        if "transcription" in needed:
+            scratch_path = os.path.join(TEMP_DIR, f"stream_{uuid.uuid4().hex}.wav")
+        stages = build_process_audio_stages(file_path, scratch_path, sr, streaming=True, save_processed=False,
+                                            prompt=payload.prompt, contour_points=payload.contourPoints)
+    timings = {}
+    try:
+        results = run_pipeline(stages, timings=timings, targets=targets, on_result=on_result)
+    finally:
+        if scratch_path and os.path.exists(scratch_path):
+            os.remove(scratch_path)
+    print(f"[SPEECH] Stage timings (s): {timings}")
+    analysis = assemble_analysis(results, sections)
+    RESULT_CACHE.put(cache_key if sections is None else partial_key, analysis)
+    return analysis
+
+
 @router.post("/process-audio")
 def process_audio(payload: ProcessAudioRequest):
     try:
-        file_path = payload.filePath
-        output_path = payload.outputPath
-        print(f"[SPEECH] Processing: {file_path} -> {output_path}")
-        
-        if not file_path or not os.path.exists(file_path):
-            raise HTTPException(status_code=400, detail="File not found")
-
-        sr = 16000
-        y, _ = librosa.load(file_path, sr=sr, mono=True)
-        duration = len(y) / sr
-        
-        if duration < 2:
-            raise HTTPException(status_code=400, detail="Audio too short. Minimum 2 seconds required.")
-        elif duration > 120:
-            y = y[:int(120 * sr)]
-
-        noise_clip = y[0:int(0.5 * sr)]
-        y_clean = nr.reduce_noise(y=y, sr=sr, y_noise=noise_clip, prop_decrease=0.75)
-
-        if not output_path.lower().endswith(".wav"):
-            output_path = os.path.splitext(output_path)[0] + ".wav"
-
-        sf.write(output_path, y_clean, sr)
-
-        chunks = split_audio_into_chunks(y_clean, sr, chunk_duration=5)
-        chunk_features = [extract_features(chunk_data, sr, idx, start, end) 
-                         for idx, (chunk_data, start, end) in enumerate(chunks)
-                         if extract_features(chunk_data, sr, idx, start, end) is not None]
-
-        transcription_result = transcribe_audio(output_path)
-        if "error" in transcription_result:
-            raise HTTPException(status_code=500, detail=transcription_result["error"])
-        
-        transcription_text = transcription_result.get("text", "")
-        transcription_filename = os.path.splitext(os.path.basename(file_path))[0] + "_transcription.txt"
-        transcription_path = os.path.join(PROCESSED_DIR, transcription_filename)
-        with open(transcription_path, "w", encoding="utf-8") as f:
-            f.write(transcription_text)
-
-        pronunciation_result = assess_pronunciation_from_transcription(transcription_result)
-        fluency_result = calculate_fluency(transcription_result)
-        pitch_result = analyze_pitch_variation(chunk_features, monotone_threshold=0.15)
-        
-        overall_context, chunk_contexts = detect_overall_context(transcription_text)
-        overall_emotion, chunk_emotions = aggregate_emotions(chunk_features)
-        tone_result = evaluate_tone(overall_context, str(overall_emotion))
-
-        scoring_result = calculate_scores(pronunciation_result, fluency_result, pitch_result, tone_result)
-        summary = generate_performance_summary(scoring_result, pitch_result)
-
-        now = datetime.now()
-        recording_info = {
-            "date": now.strftime("%Y-%m-%d"),
-            "time": now.strftime("%H:%M:%S"),
-            "duration": f"{duration:.1f} seconds"
-        }
-
-        return {
-            "message": "File processed successfully",
-            "filePath": output_path,
-            "transcription": transcription_result,
-            "pronunciation": pronunciation_result,
-            "fluency": fluency_result,
-            "pitch": pitch_result,
-            "toneAnalysis": {
-                "overallContext": overall_context,
-                "overallEmotion": str(overall_emotion),
-                "evaluation": tone_result
-            },
-            "scoring": scoring_result,
-            "summary": summary,
-            "recordingInfo": recording_info
-        }
+        prepared = prepare_process_audio(payload)
+        analysis = run_process_audio(payload, prepared)
+        return json_response(analysis_response(analysis, "File processed successfully", detail=payload.detail,
+                                               filePath=prepared[1]))
 
     except HTTPException:
         raise
@@ -179,87 +615,301 @@ def process_audio(payload: ProcessAudioRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _sse(event, data):
+    return f"event: {event}\ndata: {dumps(data)}\n\n"
+
+
+@router.post("/process-audio/stream")
+def process_audio_stream(payload: ProcessAudioRequest):
+    """
+    Server-Sent Events variant of /process-audio. Each section (transcription,
+    pitch, pitchContour, fluency, pronunciation, toneAnalysis, promptMatch,
+    speechRate, scoring, summary) is sent as an event named after it as soon
+    as it is computed, with the seconds elapsed since the request started. A final `done` event carries message, filePath
+    and recordingInfo; failures end the stream with an `error` event.
+    `fields` limits the events to those sections and `detail` applies to each.
+    """
+    try:
+        prepared = prepare_process_audio(payload)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    started = time.perf_counter()
+    events = queue.Queue()
+
+    def on_section(section, data):
+        elapsed = round(time.perf_counter() - started, 3)
+        result = encode_section(section, data, payload.detail)
+        events.put(_sse(section, {"section": section, "elapsed": elapsed, "result": result}))
+
+    def run():
+        try:
+            analysis = run_process_audio(payload, prepared, on_section=on_section)
+            response = analysis_response(analysis, "File processed successfully", filePath=prepared[1])
+            events.put(_sse("done", {k: response[k] for k in ("message", "filePath", "recordingInfo")}))
+        except Exception as e:
+            import traceback
+            print(f"[SPEECH ERROR]: {str(e)}\n{traceback.format_exc()}")
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            events.put(_sse("error", {"detail": detail}))
+        finally:
+            events.put(None)
+
+    # The scheduler gets its own thread: it must not wait on the stage pool it feeds
+    threading.Thread(target=run, name="speech-sse", daemon=True).start()
+
+    def stream():
+        while True:
+            event = events.get()
+            if event is None:
+                return
+            yield event
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+# Per-feature scorers for /speech/evaluate-feature. Each returns (result, score)
+# and declares the analysis stages it reads; only those stages are computed.
+def _score_pronunciation(document):
+    result = assess_pronunciation_from_transcription(document, tier=EVALUATE_TIER)
+    return result, 1 if result.get("score_percent", 0) >= 80 else 0
+
+
+def _score_fluency(document):
+    result = calculate_fluency(document)
+    return result, 1 if result.get("fluency_score", 0) >= 80 else 0
+
+
+def _score_tone(document, pitch_features):
+    overall_context, _ = detect_overall_context(document)
+    overall_emotion, _ = aggregate_emotions(pitch_features)
+    result = evaluate_tone(overall_context, str(overall_emotion))
+    return result, 1 if result.get("score", 0) >= 80 else 0
+
+
+def _score_pitch(pitch_features):
+    pitch_result = analyze_pitch_variation(pitch_features, monotone_threshold=MONOTONE_THRESHOLD)
+    monotone_ratio = pitch_result["overall"]["monotone_chunks"] / max(pitch_result["overall"]["total_chunks"], 1)
+    return pitch_result, 1 if monotone_ratio < 0.3 else 0
+
+
+FEATURE_SCORERS = {
+    "Pronunciation": (_score_pronunciation, ["document"]),
+    "Fluency": (_score_fluency, ["document"]),
+    "Tone": (_score_tone, ["document", "pitch_features"]),
+    "Pitch": (_score_pitch, ["pitch_features"]),
+}
+
+
+def build_evaluate_stages(audio_bytes, question=None):
+    """
+    Stage graph for /speech/evaluate-feature.
+
+    decoded -> speech -> transcription -> document      (Pronunciation, Fluency, Tone)
+    decoded -> speech -> transcription -> prompt_match  (when a question is given)
+    decoded -> clean -> pitch_features                  (Pitch, Tone; over the speech regions)
+    Pitch features only run the F0 tracker; nothing reads MFCCs or tempo here.
+    """
+    def decode():
+        # Decode in memory straight to 16 kHz: no temp WAV, and no stage runs at 48 kHz
+        y, sr = decode_audio_bytes(audio_bytes)
+        if librosa.get_duration(y=y, sr=sr) < 2:
+            raise HTTPException(status_code=400, detail="Audio too short.")
+        return y, sr
+
+    def clean(decoded):
+        y, sr = decoded
+        try:
+            return reduce_noise(y, sr)[0], sr
+        except Exception as e:
+            print(f"Warning: Noise reduction failed: {str(e)}")
+            return y, sr
+
+    def speech(decoded):
+        y, sr = decoded
+        return detect_speech(y, sr)
+
+    def pitch_features(cleaned, regions):
+        y_clean, sr = cleaned
+        return compute_chunk_features(y_clean, sr, chunk_duration=5, include=("pitch",), regions=regions)
+
+    def transcription(decoded, regions):
+        # Transcribe the (un-denoised) upload as before
+        y, sr = decoded
+        clips = whisper_clips(*regions, sr) if regions is not None else None
+        result = transcribe_audio(y, tier=EVALUATE_TIER, clip_timestamps=clips)
+        if "error" in result:
+            raise HTTPException(status_code=500, detail=result["error"])
+        return result
+
+    stages = [
+        Stage("decoded", decode),
+        Stage("clean", clean, deps=["decoded"]),
+        Stage("speech", speech, deps=["decoded"]),
+        Stage("pitch_features", pitch_features, deps=["clean", "speech"]),
+        Stage("transcription", transcription, deps=["decoded", "speech"]),
+        Stage("document", TranscriptDocument.from_transcription, deps=["transcription"]),
+        Stage("prompt_match", lambda t: match_prompt(t.get("text", ""), question), deps=["transcription"]),
+    ]
+    stages += [Stage(feature, scorer, deps=deps) for feature, (scorer, deps) in FEATURE_SCORERS.items()]
+    return stages
+
+
+def _feature_verdict(feature, result, score):
+    return {
+        "result": result,
+        "isCorrect": score == 1,
+        "feedback": f"Good {feature.lower()}!" if score == 1 else f"Work on {feature.lower()}."
+    }
+
+
 @router.post("/evaluate-feature")
 def evaluate_feature(payload: EvaluateFeatureRequest):
-    temp_path = None
     try:
         audio_data = payload.audioData
         feature = payload.feature
 
         if not audio_data:
             raise HTTPException(status_code=400, detail="No audio data provided")
-        if feature not in ["Pronunciation", "Fluency", "Tone", "Pitch"]:
+        if feature == "all":
+            features = list(FEATURE_SCORERS)
+        elif isinstance(feature, list):
+            features = list(dict.fromkeys(feature))
+        else:
+            features = [feature]
+        if not features or any(f not in FEATURE_SCORERS for f in features):
             raise HTTPException(status_code=400, detail="Invalid feature")
 
         import base64
         audio_bytes = base64.b64decode(audio_data)
 
-        timestamp = int(datetime.now().timestamp() * 1000)
-        temp_path = os.path.join(TEMP_DIR, f"{timestamp}.wav")
-
-        with open(temp_path, "wb") as f:
-            f.write(audio_bytes)
-
-        y, sr = librosa.load(temp_path, sr=None)
-        duration = librosa.get_duration(y=y, sr=sr)
-        
-        if duration < 2:
-            os.remove(temp_path)
-            raise HTTPException(status_code=400, detail="Audio too short.")
-
-        try:
-            noise_clip = y[0:int(0.5 * sr)]
-            y_clean = nr.reduce_noise(y=y, sr=sr, y_noise=noise_clip)
-        except:
-            y_clean = y
-
-        chunks = split_audio_into_chunks(y_clean, sr, chunk_duration=5)
-        chunk_features = [extract_features(chunk_data, sr, idx, start, end) 
-                         for idx, (chunk_data, start, end) in enumerate(chunks)
-                         if extract_features(chunk_data, sr, idx, start, end) is not None]
-
-        transcription_result = transcribe_audio(temp_path)
-        if "error" in transcription_result:
-            os.remove(temp_path)
-            raise HTTPException(status_code=500, detail=transcription_result["error"])
-
-        transcription_text = transcription_result.get("text", "")
-
-        result, score = None, 0
-        if feature == "Pronunciation":
-            result = assess_pronunciation_from_transcription(transcription_result)
-            score = 1 if result.get("score_percent", 0) >= 80 else 0
-        elif feature == "Fluency":
-            result = calculate_fluency(transcription_result)
-            score = 1 if result.get("fluency_score", 0) >= 80 else 0
-        elif feature == "Tone":
-            overall_context, _ = detect_overall_context(transcription_text)
-            overall_emotion, _ = aggregate_emotions(chunk_features)
-            result = evaluate_tone(overall_context, str(overall_emotion))
-            score = 1 if result.get("score", 0) >= 80 else 0
-        elif feature == "Pitch":
-            pitch_result = analyze_pitch_variation(chunk_features, monotone_threshold=0.15)
-            result = pitch_result
-            monotone_ratio = pitch_result["overall"]["monotone_chunks"] / max(pitch_result["overall"]["total_chunks"], 1)
-            score = 1 if monotone_ratio < 0.3 else 0
-
-        if temp_path and os.path.exists(temp_path):
-            os.remove(temp_path)
-
+        # Decode, denoise, VAD, pitch tracking and transcription run once for all features
+        # The answer is matched against the question only when it is transcribed anyway
+        targets = list(features)
+        if payload.question and any("document" in FEATURE_SCORERS[f][1] for f in features):
+            targets.append("prompt_match")
+
+        timings = {}
+        results = run_pipeline(build_evaluate_stages(audio_bytes, payload.question), timings=timings,
+                               targets=targets)
+        print(f"[SPEECH] {', '.join(features)} stage timings (s): {timings}")
+        prompt_match = results.get("prompt_match")
+
+        if isinstance(feature, str) and feature != "all":
+            result, score = results[feature]
+            return {
+                "scoring": {"scores": {feature.lower(): score * 100}, "overallScore": score * 100},
+                "feature": feature,
+                **_feature_verdict(feature, result, score),
+                "promptMatch": prompt_match
+            }
+
+        scores = {f: results[f][1] for f in features}
         return {
-            "scoring": {"scores": {feature.lower(): score * 100}, "overallScore": score * 100},
-            "feature": feature,
-            "result": result,
-            "isCorrect": score == 1,
-            "feedback": f"Good {feature.lower()}!" if score == 1 else f"Work on {feature.lower()}."
+            "scoring": {
+                "scores": {f.lower(): score * 100 for f, score in scores.items()},
+                "overallScore": round(100 * sum(scores.values()) / len(scores))
+            },
+            "features": features,
+            "results": {f: _feature_verdict(f, *results[f]) for f in features},
+            "isCorrect": all(score == 1 for score in scores.values()),
+            "promptMatch": prompt_match
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
-        if temp_path and os.path.exists(temp_path):
-            os.remove(temp_path)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def live_report(y, sr, transcription, prompt=None):
+    """Full analysis of a finished live session, reusing its transcript."""
+    duration = len(y) / sr
+    if duration < 2:
+        raise HTTPException(status_code=400, detail="Audio too short. Minimum 2 seconds required.")
+    timings = {}
+    results = run_pipeline(
+        build_process_audio_stages(None, None, sr, y=y, duration=duration, save_processed=False,
+                                   transcription=transcription, prompt=prompt, tier=LIVE_TIER),
+        timings=timings, targets=ANALYSIS_TARGETS
+    )
+    print(f"[SPEECH] Live report stage timings (s): {timings}")
+    return analysis_response(assemble_analysis(results), "Live session processed successfully")
+
+
+@router.websocket("/live")
+async def live(websocket: WebSocket):
+    """
+    Live transcription while the user speaks.
+
+    Client -> server:
+      text   {"type": "start", "sampleRate": 48000, "format": "s16"|"f32", "prompt": "..."}
+             (optional; default 16 kHz s16, no prompt)
+      binary mono little-endian PCM frames
+      text   {"type": "stop"}
+    Server -> client:
+      {"type": "partial", "committed", "partial", "words", "fillers", "pauses", "wpm", "duration"}
+      {"type": "final", "report": <process-audio response>}  or  {"type": "error", "detail"}
+    """
+    await websocket.accept()
+    sr = 16000
+    input_sr, dtype = sr, np.int16
+    resampler = None
+    prompt = None
+    session = LiveTranscriber(
+        lambda window, initial_prompt=None: transcribe_window(window, tier=LIVE_TIER, initial_prompt=initial_prompt),
+        sr=sr, max_seconds=LIVE_MAX_SECONDS
+    )
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            if message.get("text") is not None:
+                control = json.loads(message["text"])
+                if control.get("type") == "start":
+                    input_sr = int(control.get("sampleRate", sr))
+                    dtype = np.float32 if control.get("format") == "f32" else np.int16
+                    prompt = control.get("prompt")
+                    if input_sr != sr:
+                        import soxr
+                        resampler = soxr.ResampleStream(input_sr, sr, 1, dtype="float32")
+                elif control.get("type") == "stop":
+                    break
+                continue
+
+            frame = np.frombuffer(message.get("bytes") or b"", dtype=dtype)
+            samples = frame.astype(np.float32) / 32768.0 if dtype == np.int16 else frame.astype(np.float32)
+            if resampler is not None:
+                samples = resampler.resample_chunk(samples)
+            if session.add_audio(samples):
+                await websocket.send_json({"type": "partial", **await run_in_threadpool(session.update)})
+            if session.n_samples >= session.max_samples:
+                break
+
+        if resampler is not None:
+            session.add_audio(resampler.resample_chunk(np.zeros(0, dtype=np.float32), last=True))
+        transcription = await run_in_threadpool(session.finish)
+        if session.error and not session.committed:
+            raise HTTPException(status_code=500, detail=session.error)
+        report = await run_in_threadpool(live_report, session.audio(), sr, transcription, prompt)
+        await websocket.send_text(dumps({"type": "final", "report": report}))
+        await websocket.close()
+
+    except HTTPException as e:
+        await websocket.send_json({"type": "error", "detail": e.detail})
+        await websocket.close()
+    except Exception as e:
+        import traceback
+        print(f"[SPEECH ERROR]: {str(e)}\n{traceback.format_exc()}")
+        await websocket.send_json({"type": "error", "detail": str(e)})
+        await websocket.close()
+
+
 @router.get("/health")
 def health():
     """Health check for speech analysis module."""
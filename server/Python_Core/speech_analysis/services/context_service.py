@@ -1,5 +1,6 @@
 from collections import Counter
-import re
+
+from ..utils.transcript import as_document
 
 def detect_context(text):
     """
@@ -18,13 +19,13 @@ def detect_context(text):
         return "neutral"
 
 def detect_overall_context(transcription_text):
-    
-    sentences = re.split(r'[.!?]', transcription_text)
-    sentences = [s.strip() for s in sentences if s.strip()]
+    """Context per sentence and the most common one. Accepts text or a TranscriptDocument."""
+    sentences = as_document(transcription_text).sentences
 
     chunk_contexts = [detect_context(sentence) for sentence in sentences]
 
-    overall_context = Counter(chunk_contexts).most_common(1)[0][0]
+    # Nothing was said (e.g. an empty transcript): neutral
+    overall_context = Counter(chunk_contexts).most_common(1)[0][0] if chunk_contexts else "neutral"
 
     return overall_context, chunk_contexts
 
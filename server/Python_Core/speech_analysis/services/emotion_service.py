@@ -1,30 +1,33 @@
 from collections import Counter
 
+import numpy as np
+
+from ..utils.feature_table import as_table
+
+EMOTIONS = ("neutral", "sad", "happy", "excited")
+# Upper bounds of pitch standard deviation for all but the last emotion
+EMOTION_STD_BOUNDS = (30, 200, 1000)
+
+
 def detect_emotion_chunk(chunk):
     """
     Rule-based emotion detection from chunk features.
     Input: dict with 'pitch_variance', 'pitch_mean', etc.
     """
     pitch_std = (chunk.get("pitch_variance", 0) ** 0.5)
+    return EMOTIONS[int(np.searchsorted(EMOTION_STD_BOUNDS, pitch_std, side="right"))]
 
-    if pitch_std < 30:
-        return "neutral"
-    elif pitch_std < 200:
-        return "sad"
-    elif pitch_std < 1000:
-        return "happy"
-    else:
-        return "excited"
 
 def aggregate_emotions(chunk_features):
     """
     Detect emotion for each audio chunk and compute overall emotion.
     Returns overall emotion and list of chunk-level emotions.
+    Works on whole columns of a ChunkFeatureTable (or a list of chunk dicts).
     """
-    chunk_emotions = []
-    for ch in chunk_features:
-        em = detect_emotion_chunk(ch)
-        chunk_emotions.append(em)
+    table = as_table(chunk_features)
+    pitch_std = np.sqrt(np.maximum(table.get("pitch_variance").astype(np.float64), 0))
+    codes = np.searchsorted(EMOTION_STD_BOUNDS, pitch_std, side="right")
+    chunk_emotions = [EMOTIONS[c] for c in codes.tolist()]
 
     overall_emotion = Counter(chunk_emotions).most_common(1)[0][0]
     return overall_emotion, chunk_emotions
@@ -1,18 +1,31 @@
 import re
-from nltk.tokenize import word_tokenize
-import nltk
 
+from ..utils.speech_rate import pacing_score_from_rate
+from ..utils.transcript import FILLER_WORDS, as_document
 
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
+PAUSE_THRESHOLD = 0.7  # seconds
+
+
+def find_pauses(spans, pause_threshold=PAUSE_THRESHOLD):
+    """Gaps of at least `pause_threshold` seconds between consecutive spans (words or segments)."""
+    pauses = []
+    prev_end = None
+    for span in spans:
+        start = span.get("start")
+        if prev_end is not None and start - prev_end >= pause_threshold:
+            pauses.append({
+                "start": round(prev_end, 2),
+                "end": round(start, 2),
+                "duration": round(start - prev_end, 2)
+            })
+        prev_end = span.get("end")
+    return pauses
 
-FILLER_WORDS = ["um", "uh", "like", "you know", "so", "actually", "basically", "right", "er", "ahm", "well"]
 
 def calculate_fluency(transcription_result):
     """
     Calculates fluency and pacing, then derives clarity score.
+    Accepts a TranscriptDocument or the transcription dict.
     Returns:
       - fluency_score (0-100 scale) -> based on filler words & pauses
       - pacing_score (0-100 scale) -> based on WPM
@@ -24,8 +37,9 @@ def calculate_fluency(transcription_result):
       - filler_words (with timestamps)
       - pauses (with timestamps)
     """
-    text = transcription_result.get("text", "")
-    segments = transcription_result.get("segments", [])
+    document = as_document(transcription_result)
+    text = document.text
+    segments = document.segments
 
     if not text or not segments:
         return {
@@ -41,9 +55,7 @@ def calculate_fluency(transcription_result):
             "error": "No transcription data"
         }
 
-    # Tokenize words
-    words = [w.lower() for w in word_tokenize(text) if w.strip()]
-    total_words = len(words)
+    total_words = len(document.tokens)
 
     # Duration
     duration = segments[-1]["end"] - segments[0]["start"]
@@ -52,61 +64,23 @@ def calculate_fluency(transcription_result):
     # Words Per Minute
     wpm = total_words / (duration / 60.0)
 
-    # Detect filler words
-    text_lower = text.lower()
-    filler_pattern = r'\b(' + '|'.join(FILLER_WORDS) + r')\b'
-    filler_matches = [(m.group(), m.start()) for m in re.finditer(filler_pattern, text_lower)]
-    filler_count = len(filler_matches)
-    detected_fillers = []
-
-    # Map fillers to timestamps
-    word_timestamps = []
-    for segment in segments:
-        for word_info in segment.get("words", []):
-            word = word_info.get("word", "").lower()
-            if word:
-                word_timestamps.append({
-                    "word": word,
-                    "start": word_info.get("start"),
-                    "end": word_info.get("end")
-                })
-
-    for filler, _ in filler_matches:
-        for i, wt in enumerate(word_timestamps):
-            if wt["word"] == filler:
-                detected_fillers.append({
-                    "word": filler,
-                    "start": round(wt["start"], 2),
-                    "end": round(wt["end"], 2)
-                })
-                word_timestamps.pop(i)  # Prevent reusing the same timestamp
-                break
-
-    # Pause detection
-    pause_threshold = 0.7  # seconds
-    pauses = []
-    prev_end = None
-    for segment in segments:
-        start = segment.get("start")
-        if prev_end is not None and start - prev_end >= pause_threshold:
-            pauses.append({
-                "start": round(prev_end, 2),
-                "end": round(start, 2),
-                "duration": round(start - prev_end, 2)
-            })
-        prev_end = segment.get("end")
+    # Word-level index when the transcription carries word timestamps
+    if document.words:
+        detected_fillers = document.fillers
+        filler_count = len(detected_fillers)
+        pauses = find_pauses(document.words)
+    else:
+        # No word timestamps: count fillers in the text, pauses between segments
+        text_lower = text.lower()
+        filler_pattern = r'\b(' + '|'.join(FILLER_WORDS) + r')\b'
+        filler_count = sum(1 for _ in re.finditer(filler_pattern, text_lower))
+        detected_fillers = []
+        pauses = find_pauses(segments)
 
     # --- Scoring ---
 
     # Pacing score from WPM (ideal range: 110–160 WPM)
-    if wpm < 80:
-        pacing_score = max(0, (wpm / 80) * 60)  # very slow
-    elif wpm > 180:
-        pacing_score = max(0, 100 - ((wpm - 180) / 50) * 40)  # very fast
-    else:
-        pacing_score = 100  # within ideal range
-
-    pacing_score = round(min(max(pacing_score, 0), 100), 2)
+    pacing_score = pacing_score_from_rate(wpm)
 
     # Fluency score from fillers & pauses
     filler_ratio = filler_count / max(total_words, 1)
@@ -0,0 +1,154 @@
+"""Rolling-window live transcription for the /speech/live WebSocket.
+
+Audio arrives in small PCM frames while the user speaks. Every STEP_SECONDS
+of new audio the uncommitted window is re-decoded:
+
+- Words on which two consecutive hypotheses agree (longest common prefix)
+  are committed; the rest of the newest hypothesis is the partial result.
+- The window then restarts at the end of the last committed word, and the
+  committed text is passed as the decoder prompt for context. A window that
+  grows past MAX_WINDOW_SECONDS without agreement is force-committed.
+- Filler, pause and pace counters are updated from newly committed words
+  only, so each update costs O(new words).
+
+When recording stops, finish() decodes the last window and returns the
+transcription in the usual {"text", "segments"} contract.
+"""
+
+import numpy as np
+
+from .fluency_service import PAUSE_THRESHOLD
+from ..utils.transcript import build_word_index, normalize_word, scan_fillers
+
+SAMPLE_RATE = 16000
+STEP_SECONDS = 1.0           # new audio between two decodes
+MAX_WINDOW_SECONDS = 15.0    # force a commit when the window grows past this
+PROMPT_WORDS = 50            # committed words passed back as decoder context
+SEGMENT_GAP_SECONDS = 1.0    # committed words are grouped into segments at longer gaps
+
+
+class LiveTranscriber:
+    def __init__(self, transcribe, sr=SAMPLE_RATE, max_seconds=600):
+        """`transcribe(window, initial_prompt=...)` returns a word-timestamped transcription dict."""
+        self.transcribe = transcribe
+        self.sr = sr
+        self.max_samples = int(max_seconds * sr)
+        # Preallocated once; only the pages actually written are touched
+        self._buffer = np.empty(self.max_samples, dtype=np.float32)
+        self.n_samples = 0
+        self._decoded_samples = 0
+        self.window_start = 0.0   # seconds; start of the uncommitted audio
+
+        self.committed = []       # [{"word", "start", "end", "probability"}], absolute times
+        self._committed_index = []
+        self.hypothesis = []      # uncommitted words of the latest decode
+        self.error = None
+
+        self.fillers = []
+        self._filler_pos = 0
+        self.pause_count = 0
+
+    @property
+    def duration(self):
+        return self.n_samples / self.sr
+
+    def audio(self):
+        """All received audio as one float32 array (a view, no copy)."""
+        return self._buffer[:self.n_samples]
+
+    def add_audio(self, samples):
+        """Append mono float32 samples; returns True when a decode is due."""
+        samples = np.asarray(samples, dtype=np.float32)
+        room = self.max_samples - self.n_samples
+        if room <= 0:
+            return False
+        samples = samples[:room]
+        self._buffer[self.n_samples:self.n_samples + len(samples)] = samples
+        self.n_samples += len(samples)
+        return self.n_samples - self._decoded_samples >= STEP_SECONDS * self.sr
+
+    def _decode_window(self):
+        start = int(self.window_start * self.sr)
+        window = self._buffer[start:self.n_samples]
+        self._decoded_samples = self.n_samples
+        if len(window) < int(0.1 * self.sr):
+            return []
+        prompt = "".join(w["word"] for w in self.committed[-PROMPT_WORDS:]).strip() or None
+        result = self.transcribe(window, initial_prompt=prompt)
+        if "error" in result:
+            self.error = result["error"]
+            return []
+        return [
+            {"word": w["word"], "start": round(w["start"] + self.window_start, 3),
+             "end": round(w["end"] + self.window_start, 3), "probability": w.get("probability")}
+            for seg in result.get("segments", []) for w in seg.get("words", []) or []
+        ]
+
+    def _commit(self, words):
+        if not words:
+            return
+        new_index = build_word_index([{"words": words}])
+        if self._committed_index and new_index:
+            gap = new_index[0]["start"] - self._committed_index[-1]["end"]
+            self.pause_count += gap >= PAUSE_THRESHOLD
+        for prev, cur in zip(new_index, new_index[1:]):
+            self.pause_count += cur["start"] - prev["end"] >= PAUSE_THRESHOLD
+
+        self.committed.extend(words)
+        self._committed_index.extend(new_index)
+        self.window_start = max(self.window_start, words[-1]["end"])
+
+        fillers, self._filler_pos = scan_fillers(self._committed_index, self._filler_pos, final=False)
+        self.fillers.extend(fillers)
+
+    def update(self):
+        """Decode the current window, commit the agreed prefix and return the live state."""
+        words = self._decode_window()
+        agreed = 0
+        for old, new in zip(self.hypothesis, words):
+            if normalize_word(old["word"]) != normalize_word(new["word"]):
+                break
+            agreed += 1
+
+        window_end = self.duration
+        if agreed == 0 and window_end - self.window_start > MAX_WINDOW_SECONDS:
+            # No agreement in a long window: commit all but the words still being spoken
+            agreed = sum(1 for w in words if w["end"] <= window_end - 2 * STEP_SECONDS)
+
+        self._commit(words[:agreed])
+        self.hypothesis = words[agreed:]
+        return self.state()
+
+    def finish(self):
+        """Decode the remaining audio, commit everything and return the transcription."""
+        if self.n_samples > self._decoded_samples or self.hypothesis:
+            # A failed or empty final decode keeps the last partial instead of dropping it
+            self._commit(self._decode_window() or self.hypothesis)
+        self.hypothesis = []
+        fillers, self._filler_pos = scan_fillers(self._committed_index, self._filler_pos, final=True)
+        self.fillers.extend(fillers)
+        return self.transcription()
+
+    def transcription(self):
+        """Committed words as {"text", "segments"}, split into segments at long gaps."""
+        segments = []
+        for word in self.committed:
+            if not segments or word["start"] - segments[-1]["end"] > SEGMENT_GAP_SECONDS:
+                segments.append({"start": word["start"], "end": word["end"], "text": "", "words": []})
+            segment = segments[-1]
+            segment["words"].append(word)
+            segment["text"] += word["word"]
+            segment["end"] = word["end"]
+        return {"text": " ".join(s["text"].strip() for s in segments).strip(), "segments": segments}
+
+    def state(self):
+        spoken = self.committed[-1]["end"] - self.committed[0]["start"] if self.committed else 0.0
+        return {
+            "committed": "".join(w["word"] for w in self.committed).strip(),
+            "partial": "".join(w["word"] for w in self.hypothesis).strip(),
+            "words": len(self.committed),
+            "fillers": len(self.fillers),
+            "pauses": self.pause_count,
+            "wpm": round(len(self.committed) / (spoken / 60.0), 1) if spoken >= 1 else 0.0,
+            "duration": round(self.duration, 2),
+        }
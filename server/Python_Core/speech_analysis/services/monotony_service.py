@@ -1,11 +1,16 @@
 # services/monotony_service.py
 
+import numpy as np
+
+from ..utils.feature_table import as_table
+
+
 def detect_monotony(chunk_features, threshold=100):
     """
     Detects monotone sections in speech based on pitch variance.
     
     Args:
-        chunk_features (list): List of chunk feature dicts from features.json
+        chunk_features: ChunkFeatureTable or list of chunk feature dicts
         threshold (float): Variance threshold below which chunk is considered monotonous
 
     Returns:
@@ -15,18 +20,21 @@ def detect_monotony(chunk_features, threshold=100):
             - total_chunks: total number of chunks
             - monotony_score: simple ratio score (higher = more monotone)
     """
-    monotonous_sections = []
-
-    for chunk in chunk_features:
-        if chunk["pitch_variance"] < threshold:
-            monotonous_sections.append({
-                "chunk_index": chunk["chunk_index"],
-                "start_time": chunk["start_time"],
-                "end_time": chunk["end_time"],
-                "pitch_variance": chunk["pitch_variance"]
-            })
-
-    total_chunks = len(chunk_features)
+    table = as_table(chunk_features)
+    variance = table.get("pitch_variance")
+    monotone = np.flatnonzero(variance < threshold)
+
+    monotonous_sections = [
+        {
+            "chunk_index": int(table.chunk_index[i]),
+            "start_time": float(table["start_time"][i]),
+            "end_time": float(table["end_time"][i]),
+            "pitch_variance": float(variance[i])
+        }
+        for i in monotone.tolist()
+    ]
+
+    total_chunks = len(table)
     total_monotonous = len(monotonous_sections)
     monotony_score = round(total_monotonous / total_chunks, 2) if total_chunks > 0 else 0
 
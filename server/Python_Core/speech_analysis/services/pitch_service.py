@@ -1,54 +1,71 @@
 
+import base64
+
 import numpy as np
 
+from ..utils.feature_table import as_table
+
+CONTOUR_POINTS = 200         # default points of the pitch contour
+MAX_CONTOUR_POINTS = 4000
+
+
 def analyze_pitch_variation(chunk_features, monotone_threshold=0.15):
     """
     Calculate pitch variation for each chunk and total pitch variation.
     Normalize by pitch range to handle male and female pitch differences.
     
     Args:
-        chunk_features: List of dictionaries with pitch features per chunk.
+        chunk_features: ChunkFeatureTable (or list of chunk feature dicts) with pitch columns.
         monotone_threshold: Relative pitch variation threshold (e.g., 0.15 = 15% of pitch range).
     
     Returns:
         Dictionary with per-chunk pitch variations and total pitch variation.
     """
-    pitch_data = []
-    monotone_chunks = 0
-    
-    for ch in chunk_features:
-        mean_pitch = float(ch.get("pitch_mean", 0))
-        pitch_std = float(np.sqrt(ch.get("pitch_variance", 0))) if ch.get("pitch_variance") else 0.0
-        pitch_max = float(ch.get("pitch_max", mean_pitch)) if ch.get("pitch_max") else mean_pitch
-        pitch_min = float(ch.get("pitch_min", mean_pitch)) if ch.get("pitch_min") else mean_pitch
-        pitch_range = pitch_max - pitch_min if pitch_max > pitch_min else 1.0  # Avoid division by zero
-        
-        # Normalize pitch variation by pitch range
-        relative_variation = pitch_std / pitch_range if pitch_range > 0 else 0.0
-        is_monotone = bool(relative_variation < monotone_threshold)
-        if is_monotone:
-            monotone_chunks += 1
-            
-        pitch_data.append({
-            "chunk_index": int(ch["chunk_index"]),
-            "start_time": float(ch.get("start_time", 0)),
-            "end_time": float(ch.get("end_time", 0)),
-            "mean_pitch": mean_pitch,
-            "pitch_std": pitch_std,
-            "pitch_range": pitch_range,
-            "relative_variation": relative_variation,
-            "is_monotone": is_monotone
-        })
+    table = as_table(chunk_features)
+    mean_pitch = table.get("pitch_mean").astype(np.float64)
+    variance = table.get("pitch_variance").astype(np.float64)
+    pitch_max = table.get("pitch_max").astype(np.float64)
+    pitch_min = table.get("pitch_min").astype(np.float64)
+
+    pitch_std = np.where(variance > 0, np.sqrt(np.maximum(variance, 0)), 0.0)
+    pitch_max = np.where(pitch_max != 0, pitch_max, mean_pitch)
+    pitch_min = np.where(pitch_min != 0, pitch_min, mean_pitch)
+    pitch_range = np.where(pitch_max > pitch_min, pitch_max - pitch_min, 1.0)  # Avoid division by zero
+
+    # Normalize pitch variation by pitch range
+    relative_variation = pitch_std / pitch_range
+    is_monotone = relative_variation < monotone_threshold
+    monotone_chunks = int(np.count_nonzero(is_monotone))
+
+    # Per-chunk dicts are rendered here, at the JSON boundary
+    pitch_data = [
+        {
+            "chunk_index": int(idx),
+            "start_time": start,
+            "end_time": end,
+            "mean_pitch": mean,
+            "pitch_std": std,
+            "pitch_range": rng,
+            "relative_variation": rel,
+            "is_monotone": mono
+        }
+        for idx, start, end, mean, std, rng, rel, mono in zip(
+            table.chunk_index.tolist(), table.get("start_time").astype(np.float64).tolist(),
+            table.get("end_time").astype(np.float64).tolist(), mean_pitch.tolist(), pitch_std.tolist(),
+            pitch_range.tolist(), relative_variation.tolist(), is_monotone.tolist()
+        )
+    ]
     
     # Calculate total pitch variation (average of relative variations)
-    total_pitch_variation = float(np.mean([p["relative_variation"] for p in pitch_data])) if pitch_data else 0.0
+    n_chunks = len(table)
+    total_pitch_variation = float(np.mean(relative_variation)) if n_chunks else 0.0
     
     overall = {
-        "avg_mean_pitch": float(np.mean([p["mean_pitch"] for p in pitch_data])) if pitch_data else 0.0,
-        "avg_pitch_std": float(np.mean([p["pitch_std"] for p in pitch_data])) if pitch_data else 0.0,
+        "avg_mean_pitch": float(np.mean(mean_pitch)) if n_chunks else 0.0,
+        "avg_pitch_std": float(np.mean(pitch_std)) if n_chunks else 0.0,
         "avg_relative_variation": total_pitch_variation,
-        "monotone_chunks": int(monotone_chunks),
-        "total_chunks": int(len(pitch_data))
+        "monotone_chunks": monotone_chunks,
+        "total_chunks": int(n_chunks)
     }
     
     return {
@@ -56,3 +73,40 @@ def analyze_pitch_variation(chunk_features, monotone_threshold=0.15):
         "chunks": pitch_data,
         "total_pitch_variation": total_pitch_variation
     }
+
+
+def pitch_contour(chunk_features, points=CONTOUR_POINTS):
+    """
+    Frame-level F0 decimated to `points` equal time bins (mean F0 of the
+    voiced frames in each bin, NaN when a bin has none).
+
+    Returns None when no frame-level track is available (e.g. chunk worker
+    processes), else:
+      points, duration, step (seconds per point), voiced_ratio,
+      encoding ("float16-base64"), f0 (little-endian float16 array, base64)
+    """
+    table = as_table(chunk_features)
+    if table.f0_track is None or points <= 0:
+        return None
+    times, f0 = table.f0_track
+    points = int(min(points, MAX_CONTOUR_POINTS))
+    # The last frame is centred on the end of the clip
+    duration = float(times[-1]) if len(times) > 1 else 0.0
+    if duration <= 0:
+        return None
+
+    bins = np.minimum((times.astype(np.float64) * (points / duration)).astype(np.int64), points - 1)
+    voiced = np.isfinite(f0)
+    counts = np.bincount(bins[voiced], minlength=points)
+    sums = np.bincount(bins[voiced], weights=f0[voiced].astype(np.float64), minlength=points)
+    contour = np.full(points, np.nan)
+    np.divide(sums, counts, out=contour, where=counts > 0)
+
+    return {
+        "points": points,
+        "duration": round(duration, 3),
+        "step": round(duration / points, 5),
+        "voiced_ratio": round(float(np.count_nonzero(counts)) / points, 4),
+        "encoding": "float16-base64",
+        "f0": base64.b64encode(contour.astype("<f2").tobytes()).decode("ascii")
+    }
@@ -0,0 +1,106 @@
+"""Match a transcript against the expected text (prompt or question).
+
+- Alignment: word-level edit distance between normalized tokens. Each DP row
+  is computed with whole-array NumPy operations; the left-to-right insertion
+  dependency is resolved with the np.minimum.accumulate trick:
+      D[i, j] = j + min_{k <= j}(T[k] - k)
+  where T holds the deletion/substitution candidates of the row.
+- Keyword coverage: share of the prompt's content words spoken anywhere.
+
+prompt_match_ratio = ALIGNMENT_WEIGHT * alignment + KEYWORD_WEIGHT * coverage
+"""
+
+import re
+
+import numpy as np
+
+ALIGNMENT_WEIGHT = 0.4
+KEYWORD_WEIGHT = 0.6
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+# Function words that do not count as prompt keywords
+STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being below between
+both but by can could did do does doing down during each few for from further had has have having he her
+here hers herself him himself his how i if in into is it its itself just me more most my myself no nor not
+now of off on once only or other our ours ourselves out over own same she should so some such than that the
+their theirs them themselves then there these they this those through to too under until up very was we were
+what when where which while who whom why will with would you your yours yourself yourselves
+""".split())
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall((text or "").lower().replace("’", "'"))
+
+
+def edit_distance_matrix(ref_ids, hyp_ids):
+    """Full (len(ref)+1) x (len(hyp)+1) word edit-distance matrix, one vectorised row at a time."""
+    n, m = len(ref_ids), len(hyp_ids)
+    cols = np.arange(m + 1, dtype=np.int32)
+    D = np.empty((n + 1, m + 1), dtype=np.int32)
+    D[0] = cols
+    for i in range(1, n + 1):
+        substitution = D[i - 1, :-1] + (hyp_ids != ref_ids[i - 1])
+        candidates = np.empty(m + 1, dtype=np.int32)
+        candidates[0] = i
+        candidates[1:] = np.minimum(D[i - 1, 1:] + 1, substitution)
+        # Insertions chain left to right: D[i, j] = min_k (candidates[k] + j - k)
+        D[i] = np.minimum.accumulate(candidates - cols) + cols
+    return D
+
+
+def align(ref, hyp, D):
+    """Backtrace the matrix into per-word operations, in spoken order."""
+    ops = []
+    i, j = len(ref), len(hyp)
+    while i > 0 or j > 0:
+        if i > 0 and j > 0 and D[i, j] == D[i - 1, j - 1] + (ref[i - 1] != hyp[j - 1]):
+            op = "match" if ref[i - 1] == hyp[j - 1] else "substitution"
+            ops.append({"op": op, "expected": ref[i - 1], "spoken": hyp[j - 1]})
+            i, j = i - 1, j - 1
+        elif i > 0 and D[i, j] == D[i - 1, j] + 1:
+            ops.append({"op": "missing", "expected": ref[i - 1], "spoken": None})
+            i -= 1
+        else:
+            ops.append({"op": "extra", "expected": None, "spoken": hyp[j - 1]})
+            j -= 1
+    ops.reverse()
+    return ops
+
+
+def match_prompt(transcript_text, expected_text):
+    """
+    Compare a transcript with the expected text.
+    Returns None when there is no expected text, else:
+      ratio, alignment_ratio, keyword_coverage, distance,
+      keywords_matched, keywords_missed, diff (per-word operations)
+    """
+    ref = tokenize(expected_text)
+    if not ref:
+        return None
+    hyp = tokenize(transcript_text)
+
+    vocabulary = {}
+    ref_ids = np.array([vocabulary.setdefault(t, len(vocabulary)) for t in ref], dtype=np.int32)
+    hyp_ids = np.array([vocabulary.setdefault(t, len(vocabulary)) for t in hyp], dtype=np.int32)
+
+    D = edit_distance_matrix(ref_ids, hyp_ids)
+    distance = int(D[-1, -1])
+    alignment_ratio = 1.0 - distance / max(len(ref), len(hyp))
+
+    keywords = list(dict.fromkeys(t for t in ref if t not in STOPWORDS)) or list(dict.fromkeys(ref))
+    spoken = set(hyp)
+    matched = [k for k in keywords if k in spoken]
+    coverage = len(matched) / len(keywords)
+
+    ratio = ALIGNMENT_WEIGHT * alignment_ratio + KEYWORD_WEIGHT * coverage
+    return {
+        "ratio": round(ratio, 4),
+        "alignment_ratio": round(alignment_ratio, 4),
+        "keyword_coverage": round(coverage, 4),
+        "distance": distance,
+        "keywords_matched": matched,
+        "keywords_missed": [k for k in keywords if k not in spoken],
+        "diff": align(ref, hyp, D)
+    }
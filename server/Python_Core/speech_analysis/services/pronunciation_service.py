@@ -1,10 +1,13 @@
 # server/services/pronunciation_service.py
 
+import os
+from functools import lru_cache
+
 import phonetics  # pip install phonetics
 import nltk
-import string
 from difflib import SequenceMatcher
-# Removed import - not needed in this file
+
+from ..utils.transcript import as_document
 
 # -------------------------
 # Ensure required NLTK resources are downloaded
@@ -14,33 +17,76 @@ try:
 except LookupError:
     nltk.download("words")
 
-try:
-    nltk.data.find("tokenizers/punkt")
-except LookupError:
-    nltk.download("punkt")
-
 # Load words corpus
 from nltk.corpus import words as nltk_words
 
-# English dictionary
-english_vocab = set(w.lower() for w in nltk_words.words())
+# -------------------------
+# Configuration
+#   SPEECH_PRONUNCIATION_MODE             confidence: judge each word by Whisper's word probability
+#                                         (acoustic evidence); vocabulary: dictionary/phonetic lookup
+#                                         of the transcribed text. Confidence mode falls back to the
+#                                         vocabulary check when the transcript has no word probabilities.
+#   SPEECH_PRONUNCIATION_MIN_PROBABILITY  words below this probability count as mispronounced
+#   SPEECH_PRONUNCIATION_FAST_MODE / SPEECH_PRONUNCIATION_FAST_MIN_PROBABILITY
+#                                         the same for transcripts of the `fast` transcription tier
+#
+# Word probabilities depend on the model and decoding: tiny.en with greedy
+# decoding (the `fast` tier) is much less confident than the `accurate` tier
+# on the same speech, so one threshold would score the same speaker lower on
+# the fast-tier routes. Fast-tier transcripts therefore use the vocabulary
+# check unless a fast-tier threshold is configured.
+# -------------------------
+PRONUNCIATION_MODES = ("confidence", "vocabulary")
+
+
+def _mode_setting(name, default):
+    mode = os.getenv(name, default)
+    if mode not in PRONUNCIATION_MODES:
+        print(f"Warning: Unknown {name} '{mode}', using {default}")
+        return default
+    return mode
+
 
-# Precompute phonetic codes for faster lookup
-phonetic_dict = {}
-for w in english_vocab:
-    code = phonetics.dmetaphone(w)
-    if code:
-        phonetic_dict[code] = w  # map code to one of the dictionary words
+PRONUNCIATION_MODE = _mode_setting("SPEECH_PRONUNCIATION_MODE", "confidence")
+MIN_WORD_PROBABILITY = float(os.getenv("SPEECH_PRONUNCIATION_MIN_PROBABILITY", "0.5"))
+
+# Pronunciation settings per transcription tier; tiers not listed use the `accurate` settings
+PRONUNCIATION_TIERS = {
+    "accurate": {"mode": PRONUNCIATION_MODE, "min_probability": MIN_WORD_PROBABILITY},
+    "fast": {
+        "mode": _mode_setting("SPEECH_PRONUNCIATION_FAST_MODE", "vocabulary"),
+        "min_probability": float(os.getenv("SPEECH_PRONUNCIATION_FAST_MIN_PROBABILITY", "0.3")),
+    },
+}
+
+
+def pronunciation_settings(tier=None):
+    """{"mode", "min_probability"} used for transcripts of transcription tier `tier`."""
+    return PRONUNCIATION_TIERS.get(tier, PRONUNCIATION_TIERS["accurate"])
+
+
+@lru_cache(maxsize=None)
+def vocabulary():
+    """
+    English dictionary and its phonetic codes, built on first use (only the
+    vocabulary mode and its fallback need them). Returns (english_vocab, phonetic_dict).
+    """
+    english_vocab = set(w.lower() for w in nltk_words.words())
+
+    # Precompute phonetic codes for faster lookup
+    phonetic_dict = {}
+    for w in english_vocab:
+        code = phonetics.dmetaphone(w)
+        if code:
+            phonetic_dict[code] = w  # map code to one of the dictionary words
+    return english_vocab, phonetic_dict
 
 # -------------------------
 # Helper functions
 # -------------------------
-def clean_word(word):
-    """Lowercase and remove punctuation"""
-    return word.lower().translate(str.maketrans("", "", string.punctuation))
-
 def phonetic_match(word):
     """Check if word matches any English word phonetically"""
+    phonetic_dict = vocabulary()[1]
     code = phonetics.dmetaphone(word)
     if code and code in phonetic_dict:
         return phonetic_dict[code]
@@ -53,13 +99,73 @@ def levenshtein_similarity(a, b):
 # -------------------------
 # Main pronunciation assessment
 # -------------------------
-def assess_pronunciation_from_transcription(transcription_result):
+def assess_pronunciation_from_transcription(transcription_result, mode=None, tier=None):
     """
-    Accepts transcription result from transcribe_audio.py
-    Returns per-word feedback, counts, and score
+    Accepts transcription result from transcribe_audio.py (or its TranscriptDocument)
+    Returns per-word feedback, counts, and score, plus the `mode` that produced them.
+    `tier` is the transcription tier that produced the transcript; it selects
+    the mode and probability threshold (see PRONUNCIATION_TIERS). `mode` overrides it.
     """
-    text = transcription_result.get("text", "")
-    spoken_words = [clean_word(w) for w in nltk.word_tokenize(text)]  # <-- use nltk tokenizer
+    document = as_document(transcription_result)
+    settings = pronunciation_settings(tier)
+    if (mode or settings["mode"]) == "confidence":
+        result = assess_pronunciation_from_confidence(document, min_probability=settings["min_probability"])
+        if result is not None:
+            return result
+    return assess_pronunciation_from_vocabulary(document)
+
+
+def assess_pronunciation_from_confidence(transcription_result, min_probability=MIN_WORD_PROBABILITY):
+    """
+    Judge each spoken word by the probability Whisper assigned to it: a word
+    the decoder was unsure of is likely unclear or mispronounced. Costs nothing
+    beyond transcription. Low-confidence words are listed with their timestamps.
+    Returns None when the transcript carries no word probabilities.
+    """
+    words = [w for w in as_document(transcription_result).words if w.get("probability") is not None]
+    if not words:
+        return None
+
+    results = []
+    low_confidence_words = []
+    for w in words:
+        probability = round(float(w["probability"]), 3)
+        is_correct = probability >= min_probability
+        results.append(
+            {
+                "spoken_word": w["word"],
+                "correct": is_correct,
+                "feedback": "Correct" if is_correct else "Unclear / possibly mispronounced",
+                "probability": probability,
+                "start": round(w["start"], 2),
+                "end": round(w["end"], 2),
+            }
+        )
+        if not is_correct:
+            low_confidence_words.append(
+                {"word": w["word"], "start": round(w["start"], 2), "end": round(w["end"], 2),
+                 "probability": probability}
+            )
+
+    total_words = len(results)
+    correct_count = total_words - len(low_confidence_words)
+    return {
+        "mode": "confidence",
+        "results": results,
+        "total_words": total_words,
+        "correct_words": correct_count,
+        "mispronounced_words": len(low_confidence_words),
+        "score_percent": round(correct_count / total_words * 100, 2),
+        "mean_probability": round(sum(r["probability"] for r in results) / total_words, 3),
+        "low_confidence_words": low_confidence_words,
+    }
+
+
+def assess_pronunciation_from_vocabulary(transcription_result):
+    """Dictionary, phonetic and closest-word checks on the transcribed text."""
+    english_vocab = vocabulary()[0]
+    # Punctuation tokens normalize to "" and are not words
+    spoken_words = as_document(transcription_result).spoken_words
 
     results = []
     correct_count = 0
@@ -105,6 +211,7 @@ def assess_pronunciation_from_transcription(transcription_result):
     score_percent = round(correct_count / total_words * 100, 2) if total_words > 0 else 0
 
     return {
+        "mode": "vocabulary",
         "results": results,
         "total_words": total_words,
         "correct_words": correct_count,
@@ -1,37 +1,108 @@
 """Robust transcription service with fallback backends.
 
-Primary: faster-whisper (CPU-friendly, reliable)
+Primary: faster-whisper (CPU-friendly, reliable), served by a WhisperPool
 Fallback: openai-whisper
 
+Input: a file path, or a mono float32 numpy array sampled at 16 kHz
+(decoded audio can be passed straight in, without a WAV round-trip).
+
 Output contract:
-- Returns dict { "text": str, "segments": [ {start, end, text} ] }
+- Returns dict { "text": str, "segments": [ {start, end, text, words} ] }
+  where words = [ {word, start, end, probability} ] (word-level timestamps)
 - On error: { "error": str }
 """
 
 import os
+import threading
+
+import numpy as np
+
+from ..utils.result_cache import ResultCache, cache_dir, content_key
+from .whisper_autotune import load_tuning, threads_per_replica
+from .whisper_pool import SAMPLE_RATE, TranscriptionBusy, WhisperPool
 
 # Configuration: allow overriding model name and compute type via env vars.
 # Example envs:
 #   FW_MODEL_NAME=tiny
 #   FW_COMPUTE=int8
 # Default uses a moderately-sized English model for better accuracy.
+# When FW_COMPUTE / FW_CPU_THREADS are unset, the result of
+# `python -m speech_analysis.services.whisper_autotune` for the model is used
+# if present (see fw_settings).
 FW_MODEL_NAME = os.getenv("FW_MODEL_NAME", "base.en")
-FW_COMPUTE = os.getenv("FW_COMPUTE", "float32")
+
+# Pool configuration (see whisper_pool.WhisperPool)
+#   FW_REPLICAS        model replicas serving requests in parallel
+#   FW_CPU_THREADS     threads per replica (0 = an equal share of the cores, see fw_settings;
+#                      a tuned count is capped at that share)
+#   FW_QUEUE_SIZE      requests allowed to wait for a replica before failing fast
+#   FW_BATCH_MAX       clips per micro-batch (1 disables micro-batching)
+#   FW_BATCH_WINDOW_MS how long the batcher waits for more short clips
+FW_REPLICAS = int(os.getenv("FW_REPLICAS", "1"))
+FW_QUEUE_SIZE = int(os.getenv("FW_QUEUE_SIZE", "32"))
+FW_BATCH_MAX = int(os.getenv("FW_BATCH_MAX", "1"))
+FW_BATCH_WINDOW_MS = int(os.getenv("FW_BATCH_WINDOW_MS", "50"))
+
+
+# Transcription tiers: model + decoding profile, picked per route.
+#   fast      interactive practice clips: small model, greedy decoding
+#   accurate  full reports: FW_MODEL_NAME, beam search, VAD, temperature fallback
+# Tier models other than FW_MODEL_NAME are loaded on first use.
+FW_FAST_MODEL = os.getenv("FW_FAST_MODEL", "tiny.en")
+TEMPERATURE_FALLBACK = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+TRANSCRIPTION_TIERS = {
+    "fast": {"model": FW_FAST_MODEL, "beam_size": 1, "vad_filter": False, "temperature": 0.0},
+    "accurate": {"model": FW_MODEL_NAME, "beam_size": 5, "vad_filter": True, "temperature": TEMPERATURE_FALLBACK},
+}
+DEFAULT_TIER = "accurate"
+
+# One pool per tier model. The pools split one thread budget: every replica
+# of every pool gets cores / (replicas * pools), so the cores are not
+# oversubscribed once the lazily loaded tier pools are warm
+FW_POOL_COUNT = len({tier["model"] for tier in TRANSCRIPTION_TIERS.values()})
+
+
+def fw_settings(model_name):
+    """(compute type, threads per replica) for `model_name`: FW_COMPUTE / FW_CPU_THREADS, else its autotuned values."""
+    tuning = load_tuning(model_name, os.getenv("FW_COMPUTE")) or {}
+    compute = os.getenv("FW_COMPUTE") or tuning.get("compute_type", "float32")
+    sharers = FW_REPLICAS * FW_POOL_COUNT
+    threads = int(os.getenv("FW_CPU_THREADS") or threads_per_replica(tuning.get("cpu_threads", 0), sharers)
+                  or max(1, (os.cpu_count() or 1) // sharers))
+    return compute, threads
+
+
+FW_COMPUTE, FW_CPU_THREADS = fw_settings(FW_MODEL_NAME)
+
+# Transcript cache, shared by every speech route:
+#   SPEECH_TRANSCRIPT_CACHE_SIZE  transcripts kept in memory per process, not shared across workers (0 disables)
+#   SPEECH_TRANSCRIPT_CACHE_DISK  also share transcripts across workers on disk (1/0, off by default),
+#                                 under SPEECH_CACHE_DIR (outside the source tree, see result_cache.cache_dir)
+TRANSCRIPT_CACHE_SIZE = int(os.getenv("SPEECH_TRANSCRIPT_CACHE_SIZE", "128"))
+TRANSCRIPT_CACHE_DISK = os.getenv("SPEECH_TRANSCRIPT_CACHE_DISK", "0") == "1"
+TRANSCRIPT_CACHE_DIR = cache_dir("transcripts")
 
 # Try faster-whisper first (configurable)
 BACKEND = None
+FW_POOL = None
 FW_MODEL = None
 OW_MODEL = None
+_ow_lock = threading.Lock()
 
 try:
-    from faster_whisper import WhisperModel  # type: ignore
+    import faster_whisper  # type: ignore  # noqa: F401
     try:
-        print(f"🔄 Loading Faster-Whisper model ({FW_MODEL_NAME}, CPU, compute={FW_COMPUTE})...")
-        FW_MODEL = WhisperModel(FW_MODEL_NAME, device="cpu", compute_type=FW_COMPUTE)
-        print("✅ Faster-Whisper loaded successfully")
+        print(f"🔄 Loading Faster-Whisper model ({FW_MODEL_NAME}, CPU, compute={FW_COMPUTE}, replicas={FW_REPLICAS})...")
+        FW_POOL = WhisperPool(
+            FW_MODEL_NAME, compute_type=FW_COMPUTE, replicas=FW_REPLICAS, cpu_threads=FW_CPU_THREADS,
+            queue_size=FW_QUEUE_SIZE, batch_max=FW_BATCH_MAX, batch_window_ms=FW_BATCH_WINDOW_MS
+        )
+        FW_MODEL = FW_POOL.models[0]
+        print(f"✅ Faster-Whisper loaded successfully ({FW_POOL.cpu_threads} threads per replica)")
         BACKEND = "faster_whisper"
     except Exception as inner_e:
         print(f"❌ Failed to load faster-whisper model {FW_MODEL_NAME} with compute {FW_COMPUTE}: {inner_e}")
+        FW_POOL = None
         FW_MODEL = None
         BACKEND = None
 except Exception:
@@ -55,41 +126,149 @@ if BACKEND is None:
 # Expose a generic `model` variable for backwards compatibility (/health check)
 model = FW_MODEL if FW_MODEL is not None else OW_MODEL
 
+# faster-whisper pools by model name; FW_MODEL_NAME is loaded eagerly above
+_fw_pools = {FW_MODEL_NAME: FW_POOL} if FW_POOL is not None else {}
+_fw_failed = set()
+_fw_pools_lock = threading.Lock()
+
+
+def get_fw_pool(model_name):
+    """Return the pool serving `model_name`, loading it on first use (falls back to FW_POOL)."""
+    with _fw_pools_lock:
+        pool = _fw_pools.get(model_name)
+        if pool is not None or model_name in _fw_failed:
+            return pool or FW_POOL
+        compute, threads = fw_settings(model_name)
+        try:
+            print(f"🔄 Loading Faster-Whisper model ({model_name}, CPU, compute={compute}, replicas={FW_REPLICAS})...")
+            pool = WhisperPool(
+                model_name, compute_type=compute, replicas=FW_REPLICAS, cpu_threads=threads,
+                queue_size=FW_QUEUE_SIZE, batch_max=FW_BATCH_MAX, batch_window_ms=FW_BATCH_WINDOW_MS
+            )
+        except Exception as e:
+            print(f"Warning: Could not load faster-whisper model {model_name}, using {FW_MODEL_NAME}: {e}")
+            _fw_failed.add(model_name)
+            return FW_POOL
+        _fw_pools[model_name] = pool
+        return pool
+
+TRANSCRIPT_CACHE = ResultCache(
+    max_entries=TRANSCRIPT_CACHE_SIZE,
+    disk_dir=TRANSCRIPT_CACHE_DIR if TRANSCRIPT_CACHE_DISK and TRANSCRIPT_CACHE_SIZE > 0 else None
+)
 
-def transcribe_audio(file_path: str):
-    """Transcribe an audio file and return text + segments or an error."""
-    if not file_path or not os.path.exists(file_path):
+# Decoding options per backend; part of the transcript cache key
+FW_OPTIONS = {"language": "en", "word_timestamps": True}
+OW_OPTIONS = {"fp16": False, "word_timestamps": True}
+
+
+def fw_options(tier):
+    """faster-whisper decoding options for a tier."""
+    options = dict(FW_OPTIONS)
+    options.update((k, v) for k, v in TRANSCRIPTION_TIERS[tier].items() if k != "model")
+    return options
+
+
+def transcript_cache_key(audio, pool=None, options=None):
+    """Key a transcript by audio content (PCM or file bytes), backend, model and decoding options."""
+    if pool is not None:
+        params = {"backend": BACKEND, "model": pool.model_name, "compute": pool.compute_type, "options": options}
+    else:
+        params = {"backend": BACKEND, "model": "base.en", "options": OW_OPTIONS}
+    if isinstance(audio, np.ndarray):
+        return content_key([audio], params)
+    with open(audio, "rb") as f:
+        return content_key([f.read()], dict(params, source="file"))
+
+
+def transcribe_audio(audio, tier=DEFAULT_TIER, clip_timestamps=None):
+    """
+    Transcribe an audio file path or a 16 kHz mono float32 array and return
+    text + segments or an error. `tier` names an entry of TRANSCRIPTION_TIERS
+    (the openai-whisper fallback ignores it). Transcripts are cached by audio content.
+    `clip_timestamps` ([start, end, ...] seconds of speech, see vad.whisper_clips)
+    restricts faster-whisper to those spans and replaces its own VAD filter.
+    """
+    if tier not in TRANSCRIPTION_TIERS:
+        return {"error": f"Unknown transcription tier '{tier}'"}
+    if isinstance(audio, np.ndarray):
+        if audio.ndim != 1 or len(audio) == 0:
+            return {"error": "Expected non-empty mono audio"}
+        audio = np.ascontiguousarray(audio, dtype=np.float32)
+    elif not audio or not os.path.exists(audio):
         return {"error": "File not found"}
 
-    if BACKEND == "faster_whisper" and FW_MODEL is not None:
+    if BACKEND is None:
+        return {"error": "No transcription backend available. Please install faster-whisper or openai-whisper."}
+
+    pool = options = None
+    if BACKEND == "faster_whisper":
+        pool = get_fw_pool(TRANSCRIPTION_TIERS[tier]["model"])
+        options = fw_options(tier)
+        if clip_timestamps:
+            options.update(clip_timestamps=list(clip_timestamps), vad_filter=False)
+
+    cache_key = transcript_cache_key(audio, pool, options)
+    cached = TRANSCRIPT_CACHE.get(cache_key)
+    if cached is not None:
+        print(f"[SPEECH] Transcript cache hit ({cache_key[:12]})")
+        return cached
+
+    result = _transcribe(audio, pool, options)
+    if "error" not in result:
+        TRANSCRIPT_CACHE.put(cache_key, result)
+    return result
+
+
+def transcribe_window(audio, tier=DEFAULT_TIER, initial_prompt=None):
+    """
+    Uncached decode of a live-audio window (see live_transcription), conditioned
+    on the already committed text through `initial_prompt`.
+    """
+    if BACKEND is None:
+        return {"error": "No transcription backend available. Please install faster-whisper or openai-whisper."}
+    if BACKEND != "faster_whisper":
+        return _transcribe(np.ascontiguousarray(audio, dtype=np.float32))
+    options = fw_options(tier)
+    if initial_prompt:
+        options["initial_prompt"] = initial_prompt
+    return _transcribe(np.ascontiguousarray(audio, dtype=np.float32),
+                       get_fw_pool(TRANSCRIPTION_TIERS[tier]["model"]), options)
+
+
+def _transcribe(audio, pool=None, options=None):
+    if BACKEND == "faster_whisper" and pool is not None:
         try:
-            # Force English; base.en doesn't require language-id tokens
-            segments, info = FW_MODEL.transcribe(file_path, language="en")
-            seg_list = []
-            full_text_parts = []
-            for seg in segments:
-                seg_list.append({
-                    "start": float(seg.start) if seg.start is not None else 0.0,
-                    "end": float(seg.end) if seg.end is not None else 0.0,
-                    "text": seg.text or ""
-                })
-                if seg.text:
-                    full_text_parts.append(seg.text.strip())
-            return {"text": " ".join(full_text_parts).strip(), "segments": seg_list}
+            # Force English (FW_OPTIONS); .en models don't require language-id tokens
+            if pool.batch_max > 1:
+                if not isinstance(audio, np.ndarray):
+                    # Decode up front so short clips can join a micro-batch
+                    from faster_whisper import decode_audio  # type: ignore
+                    audio = decode_audio(audio, sampling_rate=SAMPLE_RATE)
+                return pool.transcribe_batched(audio, keep_words=True, **options)
+            return pool.transcribe(audio, keep_words=True, **options)
+        except TranscriptionBusy as e:
+            return {"error": str(e)}
         except Exception as e:
             return {"error": f"faster-whisper failed: {e}"}
 
     if BACKEND == "openai_whisper" and OW_MODEL is not None:
         try:
             # English-only model; no language param necessary
-            result = OW_MODEL.transcribe(file_path, fp16=False)
+            with _ow_lock:
+                result = OW_MODEL.transcribe(audio, **OW_OPTIONS)
             segments = result.get("segments", []) or []
             seg_list = []
             for s in segments:
                 seg_list.append({
                     "start": float(s.get("start", 0.0)),
                     "end": float(s.get("end", 0.0)),
-                    "text": s.get("text", "")
+                    "text": s.get("text", ""),
+                    "words": [
+                        {"word": w.get("word", ""), "start": float(w.get("start", 0.0)),
+                         "end": float(w.get("end", 0.0)), "probability": float(w.get("probability", 0.0))}
+                        for w in s.get("words", []) or []
+                    ]
                 })
             return {
                 "text": result.get("text", "").strip(),
@@ -0,0 +1,190 @@
+"""Pick the fastest faster-whisper compute type / thread count that keeps accuracy.
+
+Usage (from server/Python_Core):
+    python -m speech_analysis.services.whisper_autotune --clip path/to/reference.wav
+        [--model base.en] [--compute int8,int8_float32,float32] [--threads 1,2,4]
+        [--tolerance 0.05] [--repeat 2]
+
+The reference clip can also be given with FW_AUTOTUNE_CLIP. Every
+configuration transcribes the clip (best of --repeat runs after a warm-up);
+word error rate is measured against the float32 transcript and the fastest
+configuration within --tolerance is written to FW_TUNING_FILE, which
+transcribe_audio loads at startup when FW_COMPUTE / FW_CPU_THREADS are unset.
+The file holds one entry per model (run the tuner once per tier model) with
+the fastest thread count of every accepted compute type, so an explicit
+FW_COMPUTE still gets threads tuned for it. The thread count is measured
+for one replica; with FW_REPLICAS > 1 it is capped at cores / replicas
+(threads_per_replica).
+"""
+
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+
+from ..utils.result_cache import cache_dir
+
+SAMPLE_RATE = 16000
+# Machine-specific, so it lives with the caches outside the source tree
+TUNING_FILE = os.getenv("FW_TUNING_FILE") or os.path.join(cache_dir("autotune"), "whisper_tuning.json")
+COMPUTE_TYPES = ("int8", "int8_float32", "float32")
+
+
+def _read_tunings(path):
+    """All persisted tunings ({model: entry}); a missing or malformed file reads as none."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            tunings = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return tunings if isinstance(tunings, dict) else {}
+
+
+def load_tuning(model_name, compute_type=None, path=TUNING_FILE):
+    """
+    Return {"compute_type", "cpu_threads"} tuned for `model_name`, or None.
+    `compute_type` None picks the tuned compute type; otherwise only a tuning
+    measured with that compute type is returned.
+    """
+    entry = _read_tunings(path).get(model_name)
+    if not isinstance(entry, dict) or not isinstance(entry.get("compute_types"), dict):
+        return None
+    compute_type = compute_type or entry.get("compute_type")
+    tuned = entry["compute_types"].get(compute_type)
+    if not isinstance(tuned, dict) or not isinstance(tuned.get("cpu_threads"), int):
+        return None
+    return {"compute_type": compute_type, "cpu_threads": tuned["cpu_threads"]}
+
+
+def threads_per_replica(tuned_threads, replicas, cores=None):
+    """
+    Tuned thread count for one of `replicas` replicas. The autotuner measures a
+    single replica with the whole machine to itself, so with several replicas
+    the count is capped at cores / replicas to keep them from oversubscribing.
+    """
+    if not tuned_threads:
+        return 0
+    cores = cores or os.cpu_count() or 1
+    return max(1, min(int(tuned_threads), cores // max(1, int(replicas))))
+
+
+def word_error_rate(reference, hypothesis):
+    """Word-level Levenshtein distance divided by the reference length."""
+    ref = reference.lower().split()
+    hyp = hypothesis.lower().split()
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    previous = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        current = [i]
+        for j, h in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (r != h)))
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def default_thread_counts():
+    cores = os.cpu_count() or 1
+    counts = {1, cores}
+    n = 2
+    while n < cores:
+        counts.add(n)
+        n *= 2
+    return sorted(counts)
+
+
+def measure(model_name, compute_type, cpu_threads, audio, repeat=2):
+    """Best-of-`repeat` transcription time and text for one configuration."""
+    from faster_whisper import WhisperModel  # type: ignore
+
+    model = WhisperModel(model_name, device="cpu", compute_type=compute_type,
+                         cpu_threads=cpu_threads, num_workers=1)
+
+    def _run():
+        segments, _ = model.transcribe(audio, language="en")
+        return " ".join(seg.text.strip() for seg in segments).strip()
+
+    _run()  # warm-up
+    timings = []
+    text = ""
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        text = _run()
+        timings.append(time.perf_counter() - start)
+    return min(timings), text
+
+
+def autotune(model_name, audio, compute_types=COMPUTE_TYPES, thread_counts=None, tolerance=0.05, repeat=2):
+    """Measure every configuration and return (best, rows)."""
+    thread_counts = thread_counts or default_thread_counts()
+    rows = []
+    for compute_type in compute_types:
+        for threads in thread_counts:
+            try:
+                seconds, text = measure(model_name, compute_type, threads, audio, repeat=repeat)
+            except Exception as e:
+                print(f"Warning: {compute_type} with {threads} threads failed: {str(e)}")
+                continue
+            rows.append({"compute_type": compute_type, "cpu_threads": threads, "seconds": seconds, "text": text})
+            print(f"  {compute_type:<14}{threads:>4} threads {seconds:>8.3f}s")
+
+    reference = next((r["text"] for r in sorted(rows, key=lambda r: -r["cpu_threads"])
+                      if r["compute_type"] == "float32"), None)
+    if reference is None:
+        raise RuntimeError("float32 reference transcription failed; cannot score accuracy")
+    for row in rows:
+        row["wer"] = word_error_rate(reference, row["text"])
+
+    accepted = [r for r in rows if r["wer"] <= tolerance]
+    best = min(accepted, key=lambda r: r["seconds"])
+    return best, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clip", default=os.getenv("FW_AUTOTUNE_CLIP"), help="reference speech clip")
+    parser.add_argument("--model", default=os.getenv("FW_MODEL_NAME", "base.en"))
+    parser.add_argument("--compute", default=",".join(COMPUTE_TYPES), help="comma-separated compute types")
+    parser.add_argument("--threads", default=None, help="comma-separated thread counts (default: 1, 2, 4, ... cores)")
+    parser.add_argument("--tolerance", type=float, default=0.05, help="max WER against the float32 transcript")
+    parser.add_argument("--repeat", type=int, default=2, help="timed runs per configuration; best time is kept")
+    parser.add_argument("--output", default=TUNING_FILE)
+    args = parser.parse_args()
+
+    if not args.clip or not os.path.exists(args.clip):
+        parser.error("a reference clip is required (--clip or FW_AUTOTUNE_CLIP)")
+
+    from faster_whisper import decode_audio  # type: ignore
+    audio = decode_audio(args.clip, sampling_rate=SAMPLE_RATE)
+    thread_counts = [int(t) for t in args.threads.split(",")] if args.threads else None
+
+    print(f"Autotuning {args.model} on {args.clip} ({len(audio) / SAMPLE_RATE:.1f}s)")
+    best, rows = autotune(args.model, audio, compute_types=args.compute.split(","),
+                          thread_counts=thread_counts, tolerance=args.tolerance, repeat=args.repeat)
+
+    print(f"\n{'compute':<14}{'threads':>8}{'seconds':>10}{'wer':>8}")
+    for row in sorted(rows, key=lambda r: r["seconds"]):
+        print(f"{row['compute_type']:<14}{row['cpu_threads']:>8}{row['seconds']:>10.3f}{row['wer']:>8.2%}")
+
+    # Fastest accepted thread count per compute type; other models' entries are kept
+    compute_types = {}
+    for row in sorted(rows, key=lambda r: r["seconds"], reverse=True):
+        if row["wer"] <= args.tolerance:
+            compute_types[row["compute_type"]] = {"cpu_threads": row["cpu_threads"],
+                                                  "seconds": round(row["seconds"], 3), "wer": round(row["wer"], 4)}
+    tunings = _read_tunings(args.output)
+    tunings[args.model] = {
+        "compute_type": best["compute_type"],
+        "compute_types": compute_types,
+        "clip": os.path.abspath(args.clip),
+        "tuned_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(tunings, f, indent=2)
+    print(f"\nSelected {best['compute_type']} with {best['cpu_threads']} threads -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""Pool of faster-whisper model replicas with a bounded request queue.
+
+- Replicas: `replicas` WhisperModel instances, each pinned to
+  cpu_threads = cores / replicas, so concurrent requests run side by side
+  instead of contending on one model.
+- Bounded queue: at most `queue_size` requests may wait for a replica;
+  further requests fail fast with TranscriptionBusy instead of piling up
+  (immediately by default; `queue_timeout` seconds when set). Micro-batched
+  clips take the same slots, so the batch queue is bounded too.
+- Micro-batching (optional, batch_max > 1): short clips submitted within
+  `batch_window_ms` of each other are joined with silence gaps into one
+  decode and split back per clip using word timestamps. Each clip's
+  clip_timestamps are shifted to its offset in the joined audio.
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+BATCH_GAP_SECONDS = 1.0   # silence inserted between clips of a micro-batch
+
+
+class TranscriptionBusy(Exception):
+    """Raised when the transcription queue is full."""
+
+
+def segments_to_result(segments, keep_words=False):
+    """Convert faster-whisper segments to the transcription contract."""
+    seg_list = []
+    full_text_parts = []
+    for seg in segments:
+        entry = {
+            "start": float(seg.start) if seg.start is not None else 0.0,
+            "end": float(seg.end) if seg.end is not None else 0.0,
+            "text": seg.text or ""
+        }
+        if keep_words:
+            entry["words"] = [
+                {"word": w.word, "start": float(w.start), "end": float(w.end),
+                 "probability": float(w.probability)}
+                for w in (seg.words or [])
+            ]
+        seg_list.append(entry)
+        if seg.text:
+            full_text_parts.append(seg.text.strip())
+    return {"text": " ".join(full_text_parts).strip(), "segments": seg_list}
+
+
+def split_batched_result(result, offsets, durations):
+    """Split a word-timestamped transcription of joined clips back into per-clip results."""
+    per_clip = [{"text": "", "segments": []} for _ in offsets]
+    for seg in result["segments"]:
+        pieces = {}
+        for w in seg.get("words", []):
+            mid = (w["start"] + w["end"]) / 2
+            for i, (offset, duration) in enumerate(zip(offsets, durations)):
+                if offset - BATCH_GAP_SECONDS / 2 <= mid < offset + duration + BATCH_GAP_SECONDS / 2:
+                    pieces.setdefault(i, []).append({
+                        "word": w["word"],
+                        "start": round(max(w["start"] - offset, 0.0), 3),
+                        "end": round(max(w["end"] - offset, 0.0), 3),
+                        "probability": w["probability"]
+                    })
+                    break
+        for i, words in sorted(pieces.items()):
+            per_clip[i]["segments"].append({
+                "start": words[0]["start"],
+                "end": words[-1]["end"],
+                "text": "".join(w["word"] for w in words),
+                "words": words
+            })
+    for clip in per_clip:
+        clip["text"] = " ".join(s["text"].strip() for s in clip["segments"]).strip()
+    return per_clip
+
+
+class WhisperPool:
+    def __init__(self, model_name, compute_type="float32", replicas=1, cpu_threads=0,
+                 queue_size=32, queue_timeout=0.0, batch_max=1, batch_window_ms=50,
+                 batch_max_seconds=30.0):
+        from faster_whisper import WhisperModel  # type: ignore
+
+        self.model_name = model_name
+        self.compute_type = compute_type
+        replicas = max(1, int(replicas))
+        if not cpu_threads:
+            cpu_threads = max(1, (os.cpu_count() or 1) // replicas)
+        self.cpu_threads = cpu_threads
+
+        self.models = [
+            WhisperModel(model_name, device="cpu", compute_type=compute_type,
+                         cpu_threads=cpu_threads, num_workers=1)
+            for _ in range(replicas)
+        ]
+        self._idle = queue.Queue()
+        for m in self.models:
+            self._idle.put(m)
+
+        # Replicas in use + requests waiting for one. Over-limit requests do
+        # not wait for a slot: queue_timeout 0 fails them at once
+        slots = replicas + max(0, int(queue_size))
+        self._slots = threading.BoundedSemaphore(slots)
+        self.queue_timeout = max(0.0, float(queue_timeout))
+
+        self.batch_max = max(1, int(batch_max))
+        self.batch_window = batch_window_ms / 1000.0
+        self.batch_max_seconds = batch_max_seconds
+        self._batch_queue = queue.Queue(maxsize=slots)
+        self._batch_runner = None
+        if self.batch_max > 1:
+            self._batch_runner = ThreadPoolExecutor(max_workers=replicas, thread_name_prefix="whisper-batch")
+            threading.Thread(target=self._collect_batches, name="whisper-batcher", daemon=True).start()
+
+    @property
+    def replicas(self):
+        return len(self.models)
+
+    def _acquire_slot(self):
+        if self.queue_timeout > 0:
+            acquired = self._slots.acquire(timeout=self.queue_timeout)
+        else:
+            acquired = self._slots.acquire(blocking=False)
+        if not acquired:
+            raise TranscriptionBusy("Transcription queue is full, please retry shortly")
+
+    @contextmanager
+    def _replica(self):
+        # Callers already hold a slot, so at most `replicas + queue_size` wait here
+        m = self._idle.get()
+        try:
+            yield m
+        finally:
+            self._idle.put(m)
+
+    @contextmanager
+    def model(self):
+        """Borrow an idle replica, waiting in the bounded queue if needed."""
+        self._acquire_slot()
+        try:
+            with self._replica() as m:
+                yield m
+        finally:
+            self._slots.release()
+
+    def _decode(self, m, audio, keep_words, options):
+        segments, _ = m.transcribe(audio, **options)
+        # Segments are generated lazily: decode while holding the replica
+        return segments_to_result(segments, keep_words=keep_words)
+
+    def transcribe(self, audio, keep_words=False, **options):
+        """Transcribe a path or 16 kHz float32 array on a free replica."""
+        with self.model() as m:
+            return self._decode(m, audio, keep_words, options)
+
+    def can_batch(self, audio):
+        return (self._batch_runner is not None and isinstance(audio, np.ndarray)
+                and len(audio) <= self.batch_max_seconds * SAMPLE_RATE)
+
+    def transcribe_batched(self, audio, keep_words=False, **options):
+        """
+        Queue a short clip for micro-batching and wait for its result.
+        Falls back to a direct decode when batching is disabled or the clip is too long.
+        """
+        if not self.can_batch(audio):
+            return self.transcribe(audio, keep_words=keep_words, **options)
+        self._acquire_slot()
+        try:
+            future = Future()
+            # clip_timestamps are per clip: _run_batch shifts them into the joined audio
+            key = tuple(sorted((k, v) for k, v in options.items() if k != "clip_timestamps"))
+            try:
+                self._batch_queue.put_nowait((key, np.asarray(audio, dtype=np.float32), keep_words, options, future))
+            except queue.Full:
+                raise TranscriptionBusy("Transcription queue is full, please retry shortly")
+            return future.result()
+        finally:
+            self._slots.release()
+
+    def _collect_batches(self):
+        while True:
+            first = self._batch_queue.get()
+            batch = [first]
+            total = len(first[1])
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.batch_max:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._batch_queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                # Only clips decoded with the same options can share a batch
+                if item[0] != first[0] or total + len(item[1]) > self.batch_max_seconds * SAMPLE_RATE:
+                    self._batch_runner.submit(self._run_batch, [item])
+                    continue
+                batch.append(item)
+                total += len(item[1])
+            self._batch_runner.submit(self._run_batch, batch)
+
+    def _run_batch(self, batch):
+        futures = [item[4] for item in batch]
+        try:
+            options = dict(batch[0][3])
+            if len(batch) == 1:
+                _, audio, keep_words, _, future = batch[0]
+                with self._replica() as m:
+                    future.set_result(self._decode(m, audio, keep_words, options))
+                return
+
+            gap = np.zeros(int(BATCH_GAP_SECONDS * SAMPLE_RATE), dtype=np.float32)
+            parts, offsets, durations, clips = [], [], [], []
+            position = 0
+            for _, audio, _, clip_options, _ in batch:
+                offset, duration = position / SAMPLE_RATE, len(audio) / SAMPLE_RATE
+                offsets.append(offset)
+                durations.append(duration)
+                # A clip without clip_timestamps is decoded whole
+                clips.extend(round(offset + t, 3) for t in clip_options.get("clip_timestamps") or (0.0, duration))
+                parts.extend([audio, gap])
+                position += len(audio) + len(gap)
+            options.pop("clip_timestamps", None)
+            if any("clip_timestamps" in item[3] for item in batch):
+                options["clip_timestamps"] = clips
+
+            # Word timestamps are needed to split the joined decode, and text
+            # must not be conditioned across unrelated clips
+            options.update(word_timestamps=True, condition_on_previous_text=False)
+            # Each clip already holds a slot: borrow the replica directly
+            with self._replica() as m:
+                joined = self._decode(m, np.concatenate(parts), True, options)
+            for item, clip in zip(batch, split_batched_result(joined, offsets, durations)):
+                if not item[2]:
+                    for seg in clip["segments"]:
+                        seg.pop("words", None)
+                item[4].set_result(clip)
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
@@ -0,0 +1,178 @@
+"""In-process decoding of speech uploads to 16 kHz mono float32.
+
+No ffmpeg/audioread subprocess is started when PyAV is installed:
+- wav/flac/ogg are read with libsndfile
+- webm/opus, mp4/aac and anything else libsndfile rejects go through PyAV
+  (`av`, declared in the requirements). Without PyAV (e.g. on the
+  openai-whisper backend) they fall back to librosa/audioread as before.
+Decoded audio is downmixed and resampled once with soxr. The quality
+preset is chosen with SPEECH_RESAMPLER (see RESAMPLERS); lower presets are
+faster and are still far above what speech analysis needs.
+
+Sources can be a path, raw bytes or a binary file object.
+"""
+
+import io
+import os
+import tempfile
+
+import numpy as np
+import soundfile as sf
+import soxr
+
+SAMPLE_RATE = 16000
+READ_FRAMES = 65536      # frames read from libsndfile per call when streaming
+
+# SPEECH_RESAMPLER -> soxr quality preset
+RESAMPLERS = {"soxr_vhq": "VHQ", "soxr_hq": "HQ", "soxr_mq": "MQ", "soxr_lq": "LQ", "soxr_qq": "QQ"}
+RESAMPLER = os.getenv("SPEECH_RESAMPLER", "soxr_hq")
+if RESAMPLER not in RESAMPLERS:
+    print(f"Warning: Unknown SPEECH_RESAMPLER '{RESAMPLER}', using soxr_hq")
+    RESAMPLER = "soxr_hq"
+
+
+def _source(source):
+    """Something both libsndfile and PyAV can open, rewound to the start."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return source
+
+
+def _is_soundfile(source):
+    try:
+        sf.info(_source(source))
+        return True
+    except Exception:
+        return False
+
+
+def _has_av():
+    try:
+        import av  # type: ignore  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _audioread_decode(source):
+    """librosa/audioread fallback for containers libsndfile cannot read. Returns (samples, rate)."""
+    import librosa
+
+    if isinstance(source, (str, os.PathLike)):
+        return librosa.load(source, sr=None, mono=True)
+    # audioread backends need a path
+    source = _source(source)
+    data = source.getvalue() if isinstance(source, io.BytesIO) else source.read()
+    fd, path = tempfile.mkstemp(suffix=".audio")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        return librosa.load(path, sr=None, mono=True)
+    finally:
+        os.remove(path)
+
+
+def _av_frames(source):
+    """Yield (mono float32 frame, native rate) from PyAV, skipping corrupt packets."""
+    import av  # type: ignore
+
+    with av.open(_source(source), mode="r", metadata_errors="ignore") as container:
+        stream = container.streams.audio[0]
+        rate = stream.codec_context.sample_rate
+        resampler = av.AudioResampler(format="flt", layout="mono", rate=rate)
+        for packet in container.demux(stream):
+            try:
+                frames = packet.decode()
+            except av.error.InvalidDataError:
+                continue
+            for frame in frames:
+                for out in resampler.resample(frame):
+                    yield out.to_ndarray().reshape(-1), rate
+        for out in resampler.resample(None):
+            yield out.to_ndarray().reshape(-1), rate
+
+
+def resample(y, orig_sr, sr=SAMPLE_RATE, resampler=None):
+    if orig_sr == sr:
+        return np.asarray(y, dtype=np.float32)
+    quality = RESAMPLERS[resampler or RESAMPLER]
+    return soxr.resample(np.asarray(y, dtype=np.float32), orig_sr, sr, quality=quality)
+
+
+def decode_native(source):
+    """Decode to mono float32 at the native rate. Returns (samples, sample rate)."""
+    if _is_soundfile(source):
+        y, rate = sf.read(_source(source), dtype="float32", always_2d=True)
+        return (y.mean(axis=1) if y.shape[1] > 1 else y[:, 0]), rate
+    if not _has_av():
+        y, rate = _audioread_decode(source)
+        return np.asarray(y, dtype=np.float32), rate
+
+    parts, rate = [], None
+    for frame, rate in _av_frames(source):
+        parts.append(frame)
+    if rate is None:
+        raise ValueError("No audio stream could be decoded")
+    return (np.concatenate(parts) if parts else np.zeros(0, dtype=np.float32)), rate
+
+
+def decode_audio(source, sr=SAMPLE_RATE, resampler=None):
+    """Decode `source` to mono float32 samples at `sr` (the native rate when `sr` is None)."""
+    y, rate = decode_native(source)
+    return y if sr is None else resample(y, rate, sr, resampler)
+
+
+def decode_audio_bytes(audio_bytes, sr=SAMPLE_RATE, resampler=None):
+    """Decode an encoded upload held in memory. Returns (mono float32 samples, sample rate)."""
+    y, rate = decode_native(audio_bytes)
+    if sr is None:
+        return y, rate
+    return resample(y, rate, sr, resampler), sr
+
+
+def iter_decoded(source, sr=SAMPLE_RATE, resampler=None):
+    """
+    Decode incrementally: yield mono float32 pieces at `sr` while reading, so
+    long recordings never have to be held in memory at once.
+    """
+    quality = RESAMPLERS[resampler or RESAMPLER]
+    stream = None
+
+    def _resampled(mono, rate, last=False):
+        nonlocal stream
+        if rate == sr:
+            return mono
+        if stream is None:
+            stream = soxr.ResampleStream(rate, sr, 1, dtype="float32", quality=quality)
+        return stream.resample_chunk(np.ascontiguousarray(mono, dtype=np.float32), last=last)
+
+    if _is_soundfile(source):
+        with sf.SoundFile(_source(source)) as f:
+            while True:
+                data = f.read(READ_FRAMES, dtype="float32", always_2d=True)
+                last = len(data) < READ_FRAMES
+                mono = data.mean(axis=1) if data.shape[1] > 1 else data[:, 0]
+                out = _resampled(mono, f.samplerate, last=last)
+                if len(out):
+                    yield out
+                if last:
+                    return
+
+    if not _has_av():
+        y, rate = _audioread_decode(source)
+        out = resample(y, rate, sr, resampler)
+        if len(out):
+            yield out
+        return
+
+    rate = None
+    for frame, rate in _av_frames(source):
+        out = _resampled(frame, rate)
+        if len(out):
+            yield out
+    if rate is not None and stream is not None:
+        tail = stream.resample_chunk(np.zeros(0, dtype=np.float32), last=True)
+        if len(tail):
+            yield tail
@@ -1,6 +1,24 @@
 import librosa
 import numpy as np
 
+from .feature_table import GROUP_COLUMNS, ChunkFeatureTable
+from .pitch_tracking import MIN_VOICED_FRAMES, track_f0
+from .speech_rate import syllable_nuclei
+
+# Frame grid shared by every frame-level feature (matches librosa defaults)
+FRAME_LENGTH = 2048
+HOP_LENGTH = 512
+N_MFCC = 13
+MIN_CHUNK_SECONDS = 0.1  # Require at least 100ms of audio per chunk
+
+# Feature groups that can be requested independently:
+#   energy   -> rms_mean, rms_var, zcr, silence_ratio
+#   spectral -> mfccs_mean
+#   pitch    -> pitch_mean, pitch_variance, pitch_max, pitch_min, pitch_range
+#   tempo    -> tempo (speaking rate, syllables per minute)
+FEATURE_GROUPS = ("energy", "spectral", "pitch", "tempo")
+
+
 def split_audio_into_chunks(y, sr, chunk_duration=5):
     """Split audio into chunks of specified duration."""
     chunk_length = int(sr * chunk_duration)
@@ -12,166 +30,284 @@ def split_audio_into_chunks(y, sr, chunk_duration=5):
         chunks.append((chunk, start_time, end_time))
     return chunks
 
-def extract_features(chunk_data, sr, chunk_index, start_time, end_time):
+
+def compute_frame_features(y, sr, frame_length=FRAME_LENGTH, hop_length=HOP_LENGTH, n_mfcc=N_MFCC,
+                           f0_backend=None, include=FEATURE_GROUPS, regions=None):
     """
-    Extract audio features for a chunk, including energy, pitch, tempo, pauses.
-    Returns None if features cannot be extracted.
+    Compute frame-level energy, ZCR, MFCCs and the F0 track once over a whole clip.
+    Chunk statistics are later sliced from these arrays instead of re-running
+    librosa per chunk. A feature that fails is stored as None.
+    `f0_backend` selects the pitch tracker (see pitch_tracking.F0_BACKENDS);
+    `include` limits the work to the requested FEATURE_GROUPS.
+    With `regions` ((starts, ends) samples) the F0 tracker only runs inside
+    them; frames elsewhere are unvoiced.
     """
-    if len(chunk_data) == 0 or len(chunk_data) < sr * 0.1:  # Require at least 100ms of audio
-        print(f"Warning: Chunk {chunk_index} too short")
-        return None
+    frames = {"sr": sr, "hop_length": hop_length, "n_samples": len(y), "include": tuple(include)}
 
-    try:
-        features = {
-            "chunk_index": chunk_index,
-            "start_time": float(start_time),
-            "end_time": float(end_time),
-            "duration": float(end_time - start_time)
-        }
-
-        # --- Energy (RMS mean + variance)
+    if "energy" in include:
         try:
-            rms_values = librosa.feature.rms(y=chunk_data)[0]
-            features.update({
-                "rms_mean": float(np.mean(rms_values)),
-                "rms_var": float(np.var(rms_values))
-            })
+            frames["rms"] = librosa.feature.rms(y=y, frame_length=frame_length, hop_length=hop_length)[0]
         except Exception as e:
-            print(f"Warning: RMS extraction failed for chunk {chunk_index}: {str(e)}")
-            features.update({"rms_mean": 0.0, "rms_var": 0.0})
+            print(f"Warning: RMS extraction failed: {str(e)}")
+            frames["rms"] = None
 
-        # --- ZCR (zero crossing rate)
         try:
-            zcr = librosa.feature.zero_crossing_rate(y=chunk_data)
-            features["zcr"] = float(np.mean(zcr))
+            frames["zcr"] = librosa.feature.zero_crossing_rate(
+                y, frame_length=frame_length, hop_length=hop_length
+            )[0]
         except Exception as e:
-            print(f"Warning: ZCR extraction failed for chunk {chunk_index}: {str(e)}")
-            features["zcr"] = 0.0
+            print(f"Warning: ZCR extraction failed: {str(e)}")
+            frames["zcr"] = None
 
-        # --- MFCCs (spectral features)
+    # One STFT -> mel -> MFCC pass for the whole clip
+    if "spectral" in include:
         try:
-            mfccs = librosa.feature.mfcc(y=chunk_data, sr=sr, n_mfcc=13)
-            features["mfccs_mean"] = [float(np.mean(mfcc)) for mfcc in mfccs]
+            power = np.abs(librosa.stft(y, n_fft=frame_length, hop_length=hop_length)) ** 2
+            mel = librosa.feature.melspectrogram(S=power, sr=sr)
+            frames["mfcc"] = librosa.feature.mfcc(S=librosa.power_to_db(mel), n_mfcc=n_mfcc)
         except Exception as e:
-            print(f"Warning: MFCC extraction failed for chunk {chunk_index}: {str(e)}")
-            features["mfccs_mean"] = [0.0] * 13
+            print(f"Warning: MFCC extraction failed: {str(e)}")
+            frames["mfcc"] = None
 
-        # --- Pitch estimation using pyin
+    # One F0 track for the whole clip
+    if "pitch" in include:
         try:
-            f0, voiced_flag, _ = librosa.pyin(
-                chunk_data,
-                fmin=librosa.note_to_hz('C2'),
-                fmax=librosa.note_to_hz('C7'),
-                sr=sr
-            )
-            valid_f0 = f0[voiced_flag]
-            
-            if len(valid_f0) >= 10:
-                features.update({
-                    "pitch_mean": float(np.mean(valid_f0)),
-                    "pitch_variance": float(np.var(valid_f0)) if len(valid_f0) > 1 else 0.0,
-                    "pitch_max": float(np.max(valid_f0)),
-                    "pitch_min": float(np.min(valid_f0)),
-                    "pitch_range": float(np.max(valid_f0) - np.min(valid_f0))
-                })
+            if regions is None:
+                frames["f0"], frames["voiced"] = track_f0(
+                    y, sr, backend=f0_backend, frame_length=frame_length, hop_length=hop_length
+                )
             else:
-                print(f"Warning: Insufficient voiced frames in chunk {chunk_index}")
-                features.update({
-                    "pitch_mean": 0.0,
-                    "pitch_variance": 0.0,
-                    "pitch_max": 0.0,
-                    "pitch_min": 0.0,
-                    "pitch_range": 0.0
-                })
-        except Exception as e:
-            print(f"Warning: Pitch extraction failed for chunk {chunk_index}: {str(e)}")
-            features.update({
-                "pitch_mean": 0.0,
-                "pitch_variance": 0.0,
-                "pitch_max": 0.0,
-                "pitch_min": 0.0,
-                "pitch_range": 0.0
-            })
-
-        # --- Tempo (proxy for pace, in BPM)
-        try:
-            tempo, _ = librosa.beat.beat_track(y=chunk_data, sr=sr)
-            features["tempo"] = float(tempo)
+                frames["f0"], frames["voiced"] = _track_f0_regions(
+                    y, sr, regions, f0_backend, frame_length, hop_length
+                )
         except Exception as e:
-            # Tempo extraction can fail on short/silent chunks or scipy version issues
-            features["tempo"] = 0.0
+            print(f"Warning: Pitch extraction failed: {str(e)}")
+            frames["f0"], frames["voiced"] = None, None
 
-        # --- Pause ratio (proportion of silence frames)
+    # Syllable nuclei for the whole clip (voiced ones only when F0 is available)
+    if "tempo" in include:
         try:
-            energy_threshold = 0.01 * np.max(np.abs(chunk_data))
-            features["silence_ratio"] = float(np.sum(np.abs(chunk_data) < energy_threshold) / len(chunk_data))
+            frames["nuclei"] = syllable_nuclei(y, sr, hop_length, voiced=frames.get("voiced"))
         except Exception as e:
-            print(f"Warning: Silence ratio calculation failed for chunk {chunk_index}: {str(e)}")
-            features["silence_ratio"] = 0.0
+            print(f"Warning: Speech rate extraction failed: {str(e)}")
+            frames["nuclei"] = None
 
-        return features
+    return frames
 
-    except Exception as e:
-        print(f"Error extracting features for chunk {chunk_index}: {str(e)}")
-        return None
 
-        # --- MFCCs (spectral features)
-        mfccs = librosa.feature.mfcc(y=chunk_data, sr=sr, n_mfcc=13)
-        mfccs_mean = [float(np.mean(mfcc)) for mfcc in mfccs]
-
-        # --- Pitch estimation using pyin
-        f0, voiced_flag, _ = librosa.pyin(
-            chunk_data,
-            fmin=librosa.note_to_hz('C2'),
-            fmax=librosa.note_to_hz('C7')
-        )
-        valid_f0 = f0[voiced_flag]
-        if len(valid_f0) < 10:
-            print(f"Warning: Chunk {chunk_index} has insufficient voiced frames ({len(valid_f0)})")
+def _track_f0_regions(y, sr, regions, f0_backend, frame_length, hop_length):
+    """F0 track on the whole-clip frame grid, computed only inside `regions`."""
+    n_frames = 1 + len(y) // hop_length
+    f0 = np.full(n_frames, np.nan)
+    voiced = np.zeros(n_frames, dtype=bool)
+    for start, end in zip(*regions):
+        # Start on a frame centre so the region's frames line up with the clip grid
+        first = int(start) // hop_length
+        segment = y[first * hop_length:int(end)]
+        if len(segment) < hop_length:
+            continue
+        seg_f0, seg_voiced = track_f0(segment, sr, backend=f0_backend, frame_length=frame_length,
+                                      hop_length=hop_length)
+        n = min(len(seg_f0), n_frames - first)
+        f0[first:first + n] = seg_f0[:n]
+        voiced[first:first + n] = seg_voiced[:n]
+    return f0, voiced
+
+
+def frame_slice(start_sample, end_sample, hop_length, n_frames):
+    """Slice of the (centered) frames whose centre falls inside [start_sample, end_sample)."""
+    first = -(-start_sample // hop_length)
+    last = min(-(-end_sample // hop_length), n_frames)
+    return slice(first, max(last, first))
+
+
+def _frame_bounds(starts, ends, hop_length, n_frames):
+    """Vectorised frame_slice: first/last frame of every chunk."""
+    first = -(-starts // hop_length)
+    last = np.minimum(-(-ends // hop_length), n_frames)
+    return first, np.maximum(last, first)
+
+
+def _segment_sums(values, first, last):
+    """Sums of values[..., first[i]:last[i]] for every chunk, via one prefix sum."""
+    prefix = np.concatenate([np.zeros(values.shape[:-1] + (1,)), np.cumsum(values, axis=-1, dtype=np.float64)],
+                            axis=-1)
+    return prefix[..., last] - prefix[..., first]
+
+
+def _segment_extreme(ufunc, values, first, last):
+    """ufunc.reduceat over [first, last) per chunk (rows with first == last are meaningless)."""
+    padded = np.append(values, values[-1:] if len(values) else [0.0])
+    bounds = np.stack([first, np.minimum(last, len(values))], axis=1).reshape(-1)
+    return ufunc.reduceat(padded, bounds)[::2]
+
+
+def summarize_chunks(frames, y, chunk_indices, starts, ends):
+    """
+    Summarize many chunks at once into a ChunkFeatureTable.
+    Per-chunk means/variances come from prefix sums over the shared frame
+    arrays and extremes from reduceat, so no per-chunk arrays are allocated.
+    `y` is the full clip; chunks are sorted, non-overlapping [starts[i], ends[i])
+    sample ranges (consecutive grid chunks or speech regions).
+    """
+    if len(starts) == 0:
+        return ChunkFeatureTable(np.zeros(0), {})
+    sr = frames["sr"]
+    hop_length = frames["hop_length"]
+    starts = np.asarray(starts, dtype=np.int64)
+    ends = np.asarray(ends, dtype=np.int64)
+    columns = {
+        "start_time": starts / sr,
+        "end_time": ends / sr,
+        "duration": (ends - starts) / sr
+    }
+    mfccs = None
+    include = frames.get("include", FEATURE_GROUPS)
+
+    def _stats(name):
+        """(values, first, last, counts) for a frame feature, or None when it failed."""
+        values = frames.get(name)
+        if values is None:
             return None
+        first, last = _frame_bounds(starts, ends, hop_length, values.shape[-1])
+        return values, first, last, last - first
+
+    def _mean(values, first, last, counts):
+        return np.where(counts > 0, _segment_sums(values, first, last) / np.maximum(counts, 1), 0.0)
+
+    if "energy" in include:
+        # --- Energy (RMS mean + variance)
+        rms = _stats("rms")
+        if rms is not None:
+            rms_mean = _mean(*rms)
+            columns["rms_mean"] = rms_mean
+            columns["rms_var"] = np.maximum(_mean(rms[0] ** 2, *rms[1:]) - rms_mean ** 2, 0.0)
+        else:
+            columns["rms_mean"] = columns["rms_var"] = np.zeros(len(starts))
 
-        pitch_mean = float(np.mean(valid_f0))
-        pitch_var = float(np.var(valid_f0)) if len(valid_f0) > 1 else 0.0
-        pitch_max = float(np.max(valid_f0))
-        pitch_min = float(np.min(valid_f0))
-        pitch_range = pitch_max - pitch_min
+        # --- ZCR (zero crossing rate)
+        zcr = _stats("zcr")
+        columns["zcr"] = _mean(*zcr) if zcr is not None else np.zeros(len(starts))
 
-        # --- Tempo (proxy for pace, in BPM)
+        # --- Pause ratio (proportion of silence samples below 1% of the chunk peak)
         try:
-            tempo, _ = librosa.beat.beat_track(y=chunk_data, sr=sr)
-            tempo = float(tempo)
-        except:
-            tempo = 0.0
-
-        # --- Pause ratio (proportion of silence frames)
-        energy_threshold = 0.01 * np.max(np.abs(chunk_data))
-        silence_ratio = float(np.sum(np.abs(chunk_data) < energy_threshold) / len(chunk_data))
-
-        # --- Jitter & shimmer placeholders
-        jitter = None
-        shimmer = None
-        # (explain in report: real jitter/shimmer require Praat/parselmouth)
-
-        return {
-            "chunk_index": chunk_index,
+            magnitude = np.abs(y[:ends[-1]]) if len(ends) else np.zeros(0)
+            lengths = ends - starts
+            peaks = _segment_extreme(np.maximum, magnitude, starts, ends)
+            # Gather the chunks' samples back to back (a no-op gather for consecutive chunks)
+            offsets = np.cumsum(lengths) - lengths
+            gathered = magnitude[np.arange(offsets[-1] + lengths[-1]) + np.repeat(starts - offsets, lengths)]
+            silent = gathered < np.repeat(0.01 * peaks, lengths)
+            columns["silence_ratio"] = _segment_sums(silent, offsets, offsets + lengths) / lengths
+        except Exception as e:
+            print(f"Warning: Silence ratio calculation failed: {str(e)}")
+            columns["silence_ratio"] = np.zeros(len(starts))
+
+    # --- MFCCs (spectral features)
+    if "spectral" in include:
+        mfcc = _stats("mfcc")
+        if mfcc is not None:
+            mfccs = _mean(*mfcc).T
+        else:
+            mfccs = np.zeros((len(starts), N_MFCC))
+
+    # --- Pitch statistics from the shared F0 track
+    if "pitch" in include:
+        pitch = {name: np.zeros(len(starts)) for name in GROUP_COLUMNS["pitch"]}
+        f0_stats = _stats("f0")
+        if f0_stats is not None:
+            f0, first, last, _ = f0_stats
+            valid = frames["voiced"][:len(f0)] & np.isfinite(f0)
+            f0_valid = np.where(valid, f0, 0.0)
+            counts = _segment_sums(valid, first, last)
+            ok = counts >= MIN_VOICED_FRAMES
+            mean = _segment_sums(f0_valid, first, last) / np.maximum(counts, 1)
+            variance = np.maximum(_segment_sums(f0_valid ** 2, first, last) / np.maximum(counts, 1) - mean ** 2, 0.0)
+            if len(f0):
+                pitch_max = _segment_extreme(np.maximum, np.where(valid, f0, -np.inf), first, last)
+                pitch_min = _segment_extreme(np.minimum, np.where(valid, f0, np.inf), first, last)
+                pitch["pitch_mean"] = np.where(ok, mean, 0.0)
+                pitch["pitch_variance"] = np.where(ok, variance, 0.0)
+                pitch["pitch_max"] = np.where(ok, pitch_max, 0.0)
+                pitch["pitch_min"] = np.where(ok, pitch_min, 0.0)
+                pitch["pitch_range"] = pitch["pitch_max"] - pitch["pitch_min"]
+        else:
+            ok = np.zeros(len(starts), dtype=bool)
+        for chunk_index in np.asarray(chunk_indices)[~ok]:
+            print(f"Warning: Insufficient voiced frames in chunk {chunk_index}")
+        columns.update(pitch)
+
+    # --- Tempo (speaking rate: syllable nuclei per minute)
+    if "tempo" in include:
+        nuclei = _stats("nuclei")
+        if nuclei is not None:
+            columns["tempo"] = _segment_sums(nuclei[0], nuclei[1], nuclei[2]) / (columns["duration"] / 60.0)
+        else:
+            columns["tempo"] = np.zeros(len(starts))
+
+    return ChunkFeatureTable(chunk_indices, columns, mfccs)
+
+
+def summarize_chunk(frames, y, chunk_index, start_sample, end_sample):
+    """Feature dict for one chunk (see summarize_chunks)."""
+    return summarize_chunks(frames, y, [chunk_index], [start_sample], [end_sample]).to_records()[0]
+
+
+def extract_clip_features(y, sr, chunk_duration=5, f0_backend=None, include=FEATURE_GROUPS, regions=None):
+    """
+    Extract features for every chunk of a clip as a ChunkFeatureTable.
+    Frame-level features (including F0) are computed once and all chunks are
+    summarized from those arrays together. Chunks shorter than 100ms are skipped.
+    Only the FEATURE_GROUPS listed in `include` are computed.
+    `regions` ((starts, ends) samples, see vad.speech_regions) replaces the
+    fixed `chunk_duration` grid; silence between regions is never analysed.
+    """
+    if regions is not None and len(regions[0]):
+        starts, ends = (np.asarray(r, dtype=np.int64) for r in regions)
+        frames = compute_frame_features(y, sr, f0_backend=f0_backend, include=include, regions=(starts, ends))
+        table = summarize_chunks(frames, y, np.arange(len(starts)), starts, ends)
+    else:
+        frames = compute_frame_features(y, sr, f0_backend=f0_backend, include=include)
+        chunk_length = int(sr * chunk_duration)
+        min_length = int(sr * MIN_CHUNK_SECONDS)
+
+        starts = np.arange(0, len(y), chunk_length)
+        ends = np.minimum(starts + chunk_length, len(y))
+        indices = np.arange(len(starts))
+        keep = ends - starts >= max(min_length, 1)
+        for idx in indices[~keep]:
+            print(f"Warning: Chunk {idx} too short")
+        table = summarize_chunks(frames, y, indices[keep], starts[keep], ends[keep])
+
+    # Keep the frame-level F0 for contour charts (pitch_service.pitch_contour)
+    if frames.get("f0") is not None:
+        f0 = np.where(frames["voiced"][:len(frames["f0"])], frames["f0"], np.nan)
+        times = np.arange(len(f0)) * frames["hop_length"] / sr
+        table.f0_track = (times.astype(np.float32), f0.astype(np.float32))
+    return table
+
+
+def extract_features(chunk_data, sr, chunk_index, start_time, end_time, f0_backend=None,
+                     include=FEATURE_GROUPS):
+    """
+    Extract audio features for a single chunk, including energy, pitch, speaking rate, pauses.
+    Returns None if features cannot be extracted.
+    """
+    if len(chunk_data) == 0 or len(chunk_data) < sr * MIN_CHUNK_SECONDS:
+        print(f"Warning: Chunk {chunk_index} too short")
+        return None
+
+    try:
+        frames = compute_frame_features(chunk_data, sr, f0_backend=f0_backend, include=include)
+        features = summarize_chunk(frames, chunk_data, chunk_index, 0, len(chunk_data))
+        # Report the caller's timeline rather than chunk-relative times
+        features.update({
             "start_time": float(start_time),
             "end_time": float(end_time),
-            "duration": float(end_time - start_time),
-            "rms_mean": rms_mean,
-            "rms_var": rms_var,
-            "zcr": zcr,
-            "mfccs_mean": mfccs_mean,
-            "pitch_mean": pitch_mean,
-            "pitch_variance": pitch_var,
-            "pitch_max": pitch_max,
-            "pitch_min": pitch_min,
-            "pitch_range": pitch_range,
-            "tempo": tempo,
-            "pause_ratio": silence_ratio,
-            "jitter": jitter,
-            "shimmer": shimmer
-        }
+            "duration": float(end_time - start_time)
+        })
+        return features
 
     except Exception as e:
-        print(f"Error extracting features for chunk {chunk_index}: {e}")
+        print(f"Error extracting features for chunk {chunk_index}: {str(e)}")
         return None
@@ -0,0 +1,97 @@
+"""Benchmark upload decoding per container format and resampler.
+
+Usage (from server/Python_Core):
+    python -m speech_analysis.utils.benchmark_ingest [audio files...] [--repeat N]
+
+Without audio files a synthetic 30 s 48 kHz voiced clip is encoded as wav,
+ogg/vorbis and webm/opus (the formats browsers and the client upload).
+Every file is decoded to 16 kHz mono with each SPEECH_RESAMPLER preset and,
+for reference, with librosa.load (audioread/ffmpeg for compressed input).
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import librosa
+import soundfile as sf
+
+from .audio_io import RESAMPLERS, SAMPLE_RATE, decode_audio
+from .benchmark_pitch import synthetic_clip
+
+SOURCE_SR = 48000
+
+
+def _write_webm(path, y, sr):
+    import av  # type: ignore
+
+    with av.open(path, "w", format="webm") as container:
+        stream = container.add_stream("libopus", rate=sr)
+        stream.layout = "mono"
+        frame = av.AudioFrame.from_ndarray(y.reshape(1, -1), format="flt", layout="mono")
+        frame.sample_rate = sr
+        for packet in stream.encode(frame):
+            container.mux(packet)
+        for packet in stream.encode(None):
+            container.mux(packet)
+
+
+def synthetic_files(directory, duration=30.0):
+    """Encode one synthetic clip per container format. Returns [(label, path)]."""
+    y = synthetic_clip(duration, sr=SOURCE_SR)
+    files = []
+    for label, name, write in [
+        ("wav", "clip.wav", lambda p: sf.write(p, y, SOURCE_SR)),
+        ("ogg/vorbis", "clip.ogg", lambda p: sf.write(p, y, SOURCE_SR, format="OGG", subtype="VORBIS")),
+        ("webm/opus", "clip.webm", lambda p: _write_webm(p, y, SOURCE_SR)),
+    ]:
+        path = os.path.join(directory, name)
+        try:
+            write(path)
+            files.append((label, path))
+        except Exception as e:
+            print(f"Warning: Could not encode {label}: {str(e)}")
+    return files
+
+
+def _best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def benchmark(path, repeat=3):
+    rows = {}
+    for resampler in RESAMPLERS:
+        seconds, y = _best_of(lambda: decode_audio(path, sr=SAMPLE_RATE, resampler=resampler), repeat)
+        rows[resampler] = {"seconds": seconds, "duration": len(y) / SAMPLE_RATE}
+    try:
+        seconds, y = _best_of(lambda: librosa.load(path, sr=SAMPLE_RATE, mono=True)[0], repeat)
+        rows["librosa.load"] = {"seconds": seconds, "duration": len(y) / SAMPLE_RATE}
+    except Exception as e:
+        print(f"Warning: librosa.load failed on {path}: {str(e)}")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="*", help="audio files to benchmark (default: synthetic wav/ogg/webm)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per decoder; best time is reported")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        files = [(os.path.basename(path), path) for path in args.files] or synthetic_files(directory)
+        for label, path in files:
+            print(f"\n{label} ({os.path.getsize(path) / 1024:.0f} KiB)")
+            print(f"{'decoder':<14}{'seconds':>10}{'x realtime':>12}{'audio s':>10}")
+            for decoder, row in benchmark(path, repeat=args.repeat).items():
+                speed = row["duration"] / row["seconds"] if row["seconds"] > 0 else float("inf")
+                print(f"{decoder:<14}{row['seconds']:>10.4f}{speed:>12.1f}{row['duration']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Benchmark the F0 backends in pitch_tracking for latency and agreement with pyin.
+
+Usage (from server/Python_Core):
+    python -m speech_analysis.utils.benchmark_pitch [audio files...] [--repeat N]
+
+Without audio files a synthetic 30 s voiced glide is used.
+Agreement is reported against pyin:
+- voicing: fraction of frames with the same voiced/unvoiced decision
+- gpe: gross pitch error, share of jointly voiced frames off by more than 20%
+- median_cents: median absolute deviation in cents on jointly voiced frames
+"""
+
+import argparse
+import time
+import librosa
+import numpy as np
+
+from .pitch_tracking import F0_BACKENDS, track_f0
+
+SR = 16000
+
+
+def synthetic_clip(duration=30.0, sr=SR):
+    """Voiced glide (120-220 Hz) with syllable-like gaps and light noise."""
+    t = np.arange(int(duration * sr)) / sr
+    f0 = 170 + 50 * np.sin(2 * np.pi * 0.25 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / sr
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 6))
+    gate = (np.sin(2 * np.pi * 3 * t) > -0.4).astype(float)
+    noise = 0.01 * np.random.default_rng(0).standard_normal(len(t))
+    return (0.2 * voiced * gate + noise).astype(np.float32)
+
+
+def agreement(ref_f0, ref_voiced, f0, voiced):
+    n = min(len(ref_f0), len(f0))
+    ref_f0, ref_voiced, f0, voiced = ref_f0[:n], ref_voiced[:n], f0[:n], voiced[:n]
+    both = ref_voiced & voiced & np.isfinite(ref_f0) & np.isfinite(f0)
+    result = {"voicing": float(np.mean(ref_voiced == voiced)) if n else 0.0, "gpe": 0.0, "median_cents": 0.0}
+    if np.any(both):
+        ratio = f0[both] / ref_f0[both]
+        result["gpe"] = float(np.mean(np.abs(ratio - 1) > 0.2))
+        result["median_cents"] = float(np.median(np.abs(1200 * np.log2(ratio))))
+    return result
+
+
+def benchmark(y, sr, repeat=3):
+    rows = {}
+    tracks = {}
+    for backend in F0_BACKENDS:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            tracks[backend] = track_f0(y, sr, backend=backend)
+            timings.append(time.perf_counter() - start)
+        rows[backend] = {"seconds": min(timings)}
+
+    ref_f0, ref_voiced = tracks["pyin"]
+    for backend, (f0, voiced) in tracks.items():
+        rows[backend].update(agreement(ref_f0, ref_voiced, f0, voiced))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="*", help="audio files to benchmark (default: synthetic clip)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per backend; best time is reported")
+    args = parser.parse_args()
+
+    clips = [(path, librosa.load(path, sr=SR, mono=True)[0]) for path in args.files]
+    if not clips:
+        clips = [("synthetic", synthetic_clip())]
+
+    for name, y in clips:
+        duration = len(y) / SR
+        print(f"\n{name} ({duration:.1f}s)")
+        print(f"{'backend':<10}{'seconds':>10}{'x realtime':>12}{'voicing':>10}{'gpe':>8}{'cents':>8}")
+        for backend, row in benchmark(y, SR, repeat=args.repeat).items():
+            speed = duration / row["seconds"] if row["seconds"] > 0 else float("inf")
+            print(f"{backend:<10}{row['seconds']:>10.3f}{speed:>12.1f}"
+                  f"{row['voicing']:>10.2%}{row['gpe']:>8.2%}{row['median_cents']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""JSON encoding helpers for large speech responses.
+
+- dumps / json_response use orjson when it is installed (it serializes numpy
+  values natively and is several times faster than the stdlib encoder) and
+  fall back to FastAPI's jsonable_encoder + json otherwise.
+- to_columns turns a list of per-item dicts (words, chunks, pauses) into one
+  list per key, so key names are sent once instead of once per item.
+"""
+
+import json
+
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+
+try:
+    import orjson  # type: ignore
+except ImportError:
+    orjson = None
+
+# Stdlib fallback: numpy values as plain Python numbers/lists
+NUMPY_ENCODERS = {np.generic: lambda value: value.item(), np.ndarray: lambda array: array.tolist()}
+
+
+def _encode(content):
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(jsonable_encoder(content, custom_encoder=NUMPY_ENCODERS)).encode("utf-8")
+
+
+def dumps(content):
+    """Serialize `content` to a JSON string."""
+    return _encode(content).decode("utf-8")
+
+
+def json_response(content, status_code=200):
+    """A JSON response that skips FastAPI's per-value jsonable_encoder pass when orjson is available."""
+    return Response(_encode(content), status_code=status_code, media_type="application/json")
+
+
+def to_columns(records, keys=None, dictionary=()):
+    """
+    Columnar form of a list of dicts: {key: [value per record]}.
+    String columns named in `dictionary` are dictionary-encoded as
+    {key: [code per record], key + "_values": [distinct strings]}.
+    """
+    records = records or []
+    if keys is None:
+        keys = list(records[0]) if records else []
+    columns = {key: [record.get(key) for record in records] for key in keys}
+    for key in dictionary:
+        if key in columns:
+            codes = {}
+            columns[key] = [codes.setdefault(value, len(codes)) for value in columns[key]]
+            columns[key + "_values"] = list(codes)
+    return columns
@@ -0,0 +1,107 @@
+"""Columnar container for per-chunk audio features.
+
+A ChunkFeatureTable holds one float32 column per scalar feature, an int32
+chunk_index column and a 2-D (chunks x N_MFCC) float32 MFCC block. Services
+compute over whole columns; feature dicts are only rendered at the JSON
+boundary (to_records) or built from legacy dict lists (from_records).
+
+When the pitch group was computed over a whole clip, `f0_track` keeps the
+frame-level contour as (times, f0) float32 arrays (NaN = unvoiced), so
+pitch charts need no second F0 pass.
+"""
+
+import numpy as np
+
+# Scalar columns per feature group (see audio_utils.FEATURE_GROUPS)
+TIME_COLUMNS = ("start_time", "end_time", "duration")
+GROUP_COLUMNS = {
+    "energy": ("rms_mean", "rms_var", "zcr", "silence_ratio"),
+    "spectral": (),   # the MFCC block
+    "pitch": ("pitch_mean", "pitch_variance", "pitch_max", "pitch_min", "pitch_range"),
+    "tempo": ("tempo",),
+}
+
+# Key order of a rendered chunk dict
+RECORD_KEYS = ("chunk_index", "start_time", "end_time", "duration", "rms_mean", "rms_var", "zcr", "mfccs_mean",
+               "pitch_mean", "pitch_variance", "pitch_max", "pitch_min", "pitch_range", "tempo", "silence_ratio")
+
+
+class ChunkFeatureTable:
+    def __init__(self, chunk_index, columns, mfccs=None, f0_track=None):
+        self.chunk_index = np.asarray(chunk_index, dtype=np.int32).reshape(-1)
+        self.columns = {name: np.asarray(values, dtype=np.float32).reshape(-1) for name, values in columns.items()}
+        self.mfccs = None if mfccs is None else np.asarray(mfccs, dtype=np.float32).reshape(len(self.chunk_index), -1)
+        self.f0_track = None if f0_track is None else tuple(np.asarray(a, dtype=np.float32) for a in f0_track)
+
+    def __len__(self):
+        return len(self.chunk_index)
+
+    def __contains__(self, name):
+        if name == "chunk_index":
+            return True
+        if name == "mfccs_mean":
+            return self.mfccs is not None
+        return name in self.columns
+
+    def __getitem__(self, name):
+        if name == "chunk_index":
+            return self.chunk_index
+        if name == "mfccs_mean" and self.mfccs is not None:
+            return self.mfccs
+        return self.columns[name]
+
+    def get(self, name, default=0.0):
+        """Column `name`, or a column filled with `default` when it was not computed."""
+        if name in self:
+            return self[name]
+        return np.full(len(self), default, dtype=np.float32)
+
+    @classmethod
+    def from_records(cls, records):
+        """Build a table from chunk feature dicts (e.g. from worker processes)."""
+        records = [r for r in records if r is not None]
+        if not records:
+            return cls(np.zeros(0), {})
+        names = [k for k in RECORD_KEYS if k in records[0] and k not in ("chunk_index", "mfccs_mean")]
+        columns = {name: np.array([r.get(name, 0.0) for r in records], dtype=np.float32) for name in names}
+        mfccs = None
+        if "mfccs_mean" in records[0]:
+            mfccs = np.array([r["mfccs_mean"] for r in records], dtype=np.float32)
+        return cls([r["chunk_index"] for r in records], columns, mfccs)
+
+    @classmethod
+    def concat(cls, tables):
+        tables = [t for t in tables if len(t)]
+        if not tables:
+            return cls(np.zeros(0), {})
+        first = tables[0]
+        columns = {name: np.concatenate([t.columns[name] for t in tables]) for name in first.columns}
+        mfccs = np.concatenate([t.mfccs for t in tables]) if first.mfccs is not None else None
+        f0_track = None
+        if all(t.f0_track is not None for t in tables):
+            f0_track = tuple(np.concatenate([t.f0_track[i] for t in tables]) for i in range(2))
+        return cls(np.concatenate([t.chunk_index for t in tables]), columns, mfccs, f0_track)
+
+    def shifted(self, index_offset=0, time_offset=0.0):
+        """Copy of the table moved onto a longer timeline (streamed blocks)."""
+        columns = dict(self.columns)
+        for name in ("start_time", "end_time"):
+            if name in columns:
+                columns[name] = columns[name] + np.float32(time_offset)
+        f0_track = None
+        if self.f0_track is not None:
+            f0_track = (self.f0_track[0] + np.float32(time_offset), self.f0_track[1])
+        return ChunkFeatureTable(self.chunk_index + index_offset, columns, self.mfccs, f0_track)
+
+    def to_records(self):
+        """Render the table as the list of chunk feature dicts used in JSON responses."""
+        keys = [k for k in RECORD_KEYS if k in self]
+        values = [self[k].tolist() for k in keys]
+        return [dict(zip(keys, row)) for row in zip(*values)]
+
+
+def as_table(chunk_features):
+    """Accept a ChunkFeatureTable or a list of chunk feature dicts."""
+    if isinstance(chunk_features, ChunkFeatureTable):
+        return chunk_features
+    return ChunkFeatureTable.from_records(chunk_features)
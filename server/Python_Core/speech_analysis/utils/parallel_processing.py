@@ -1,10 +1,111 @@
-from concurrent.futures import ThreadPoolExecutor
+"""Process-pool chunk analysis.
+
+The cleaned clip is copied once into a shared-memory block; workers attach
+to it by name and run `extract_features` on their chunk, so no numpy arrays
+are pickled per task. The pool is persistent and shared by all requests.
+
+Configuration:
+    SPEECH_CHUNK_WORKERS  worker processes (0 or 1 keeps chunk analysis serial)
+"""
+
+import atexit
+import os
+import threading
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
 import numpy as np
 
+from .audio_utils import FEATURE_GROUPS, extract_features
+from .feature_table import ChunkFeatureTable
+
+CHUNK_WORKERS = int(os.getenv("SPEECH_CHUNK_WORKERS", "0"))
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def get_pool(workers=None):
+    """Return the persistent process pool, creating it on first use."""
+    global _pool, _pool_workers
+    workers = workers or CHUNK_WORKERS or os.cpu_count() or 1
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            # spawn: never fork a server process that is running model threads
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn"))
+            _pool_workers = workers
+        return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+            _pool = None
+
+
+atexit.register(shutdown_pool)
+
+
+def _attach(name):
+    """Attach to an existing shared-memory block without taking ownership of it."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        # Spawned workers share the parent's resource tracker, which already
+        # owns the block; re-registering it there is a no-op
+        return shared_memory.SharedMemory(name=name)
+
+
 def process_chunk_parallel(args):
     """Helper function for parallel processing of audio chunks"""
-    from utils.audio_utils import extract_features
-    chunk_data, sr, idx, start, end = args
-    features = extract_features(chunk_data, sr, idx, start, end)
+    shm_name, n_samples, dtype, sr, idx, start, end, f0_backend, include = args
+    shm = _attach(shm_name)
+    try:
+        y = np.ndarray((n_samples,), dtype=dtype, buffer=shm.buf)
+        features = extract_features(y[start:end], sr, idx, start / sr, end / sr,
+                                    f0_backend=f0_backend, include=include)
+        del y
+    finally:
+        shm.close()
+    if features is None:
+        return None
     return {k: float(v) if isinstance(v, (np.float32, np.float64, np.int32, np.int64)) else v
-            for k, v in features.items()}
\ No newline at end of file
+            for k, v in features.items()}
+
+
+def extract_features_parallel(y, sr, chunk_duration=5, workers=None, f0_backend=None, include=FEATURE_GROUPS,
+                              regions=None):
+    """
+    Extract chunk features across worker processes into a ChunkFeatureTable.
+    Results come back in chunk order; chunks that yield no features are skipped.
+    `regions` ((starts, ends) samples) replaces the fixed chunk grid.
+    """
+    y = np.ascontiguousarray(y, dtype=np.float32)
+    chunk_length = int(sr * chunk_duration)
+    if len(y) == 0:
+        return ChunkFeatureTable.from_records([])
+    if regions is not None and len(regions[0]):
+        spans = [(int(start), int(end)) for start, end in zip(*regions)]
+    else:
+        spans = [(start, min(start + chunk_length, len(y))) for start in range(0, len(y), chunk_length)]
+
+    shm = shared_memory.SharedMemory(create=True, size=y.nbytes)
+    try:
+        shared = np.ndarray(y.shape, dtype=y.dtype, buffer=shm.buf)
+        shared[:] = y
+        del shared
+        tasks = [
+            (shm.name, len(y), y.dtype.str, sr, idx, start, end, f0_backend, tuple(include))
+            for idx, (start, end) in enumerate(spans)
+        ]
+        results = get_pool(workers).map(process_chunk_parallel, tasks)
+        return ChunkFeatureTable.from_records(results)
+    finally:
+        shm.close()
+        shm.unlink()
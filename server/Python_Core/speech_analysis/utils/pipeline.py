@@ -0,0 +1,137 @@
+"""Small dependency-graph scheduler for the speech analysis stages.
+
+A pipeline is a list of `Stage`s. Each stage names the stages it depends on
+and receives their results as positional arguments, in `deps` order. A stage
+is submitted to the executor as soon as all of its dependencies have finished,
+so independent stages (e.g. transcription and chunk features) overlap and
+end-to-end latency approaches the longest dependency chain instead of the sum
+of all stages.
+
+Passing `targets` resolves the graph lazily: only the target stages and
+the stages they transitively depend on are executed. An `on_result`
+callback sees every stage result as soon as it is ready (progressive
+responses).
+
+Stages run on a shared thread pool: the heavy work (librosa/numpy, the
+spectral gate, CTranslate2) releases the GIL, and threads can share large
+arrays without copying them.
+
+Configuration:
+    SPEECH_PIPELINE_WORKERS  threads shared by all pipeline runs (default 8)
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+PIPELINE_WORKERS = int(os.getenv("SPEECH_PIPELINE_WORKERS", "8"))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Return the shared stage executor, creating it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=PIPELINE_WORKERS, thread_name_prefix="speech-stage")
+        return _executor
+
+
+class Stage:
+    """A named unit of work and the stages whose results it needs."""
+
+    def __init__(self, name, fn, deps=()):
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+
+    def __repr__(self):
+        return f"Stage({self.name!r}, deps={self.deps})"
+
+
+def _check_graph(stages):
+    by_name = {}
+    for stage in stages:
+        if stage.name in by_name:
+            raise ValueError(f"Duplicate stage '{stage.name}'")
+        by_name[stage.name] = stage
+    for stage in stages:
+        missing = [d for d in stage.deps if d not in by_name]
+        if missing:
+            raise ValueError(f"Stage '{stage.name}' depends on unknown stages {missing}")
+    return by_name
+
+
+def resolve_stages(stages, targets):
+    """Return the stages needed for `targets` (the targets plus their transitive dependencies)."""
+    by_name = _check_graph(stages)
+    unknown = [t for t in targets if t not in by_name]
+    if unknown:
+        raise ValueError(f"Unknown target stages {unknown}")
+    needed = set()
+    pending = list(targets)
+    while pending:
+        name = pending.pop()
+        if name not in needed:
+            needed.add(name)
+            pending.extend(by_name[name].deps)
+    return [stage for stage in stages if stage.name in needed]
+
+
+def run_pipeline(stages, executor=None, timings=None, targets=None, on_result=None):
+    """
+    Execute `stages` respecting their dependencies and return {name: result}.
+    When `targets` is given, only the stages they need are executed.
+    `on_result(name, result, results)` is called from the scheduling thread
+    as each stage finishes, with all results available so far.
+    If a stage raises, no further stages are started and the exception is
+    re-raised once running stages have finished. When `timings` is a dict it
+    receives the wall time of every stage in seconds.
+    """
+    if targets is not None:
+        stages = resolve_stages(stages, targets)
+    by_name = _check_graph(stages)
+    executor = executor or get_executor()
+    results = {}
+    remaining = dict(by_name)
+    running = {}
+
+    def _timed(stage, args):
+        start = time.perf_counter()
+        try:
+            return stage.fn(*args)
+        finally:
+            if timings is not None:
+                timings[stage.name] = round(time.perf_counter() - start, 3)
+
+    def _submit_ready():
+        for name, stage in list(remaining.items()):
+            if all(d in results for d in stage.deps):
+                del remaining[name]
+                args = [results[d] for d in stage.deps]
+                running[executor.submit(_timed, stage, args)] = name
+
+    _submit_ready()
+    error = None
+    while running:
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            name = running.pop(future)
+            try:
+                results[name] = future.result()
+                if on_result is not None and error is None:
+                    on_result(name, results[name], results)
+            except BaseException as e:
+                if error is None:
+                    error = e
+        if error is None:
+            _submit_ready()
+
+    if error is not None:
+        raise error
+    if remaining:
+        raise ValueError(f"Dependency cycle between stages {sorted(remaining)}")
+    return results
@@ -0,0 +1,148 @@
+"""Whole-clip F0 tracking with selectable backends.
+
+Backends (select with F0_BACKEND env var or the `backend` argument):
+- pyin: probabilistic YIN with Viterbi smoothing (most accurate, slowest)
+- yin: plain YIN with an energy gate for voicing (fast)
+- autocorr: vectorised FFT autocorrelation tracker (fastest)
+
+Every backend returns frames on the same grid as audio_utils
+(centered frames, FRAME_LENGTH / HOP_LENGTH), so chunk statistics can be
+aggregated from frame indices.
+"""
+
+import os
+import librosa
+import numpy as np
+from scipy.signal import medfilt
+
+FMIN = float(librosa.note_to_hz('C2'))
+FMAX = float(librosa.note_to_hz('C7'))
+MIN_VOICED_FRAMES = 10
+
+# Voicing thresholds for the fast backends
+VOICING_TOP_DB = 30.0          # frames this far below the loudest frame are unvoiced
+YIN_MEDIAN_FRAMES = 5          # median filter length that removes YIN octave jumps
+AUTOCORR_THRESHOLD = 0.3       # normalized autocorrelation peak needed for voicing
+AUTOCORR_BATCH_FRAMES = 512    # frames per FFT batch (bounds memory on long clips)
+
+
+def _energy_voicing(y, frame_length, hop_length, top_db=None):
+    """Voicing mask from frame energy relative to the loudest frame."""
+    top_db = VOICING_TOP_DB if top_db is None else top_db
+    rms = librosa.feature.rms(y=y, frame_length=frame_length, hop_length=hop_length)[0]
+    if rms.size == 0 or np.max(rms) <= 0:
+        return np.zeros(rms.shape, dtype=bool)
+    return librosa.amplitude_to_db(rms, ref=np.max) > -top_db
+
+
+def _track_pyin(y, sr, frame_length, hop_length):
+    f0, voiced_flag, _ = librosa.pyin(
+        y, fmin=FMIN, fmax=FMAX, sr=sr, frame_length=frame_length, hop_length=hop_length
+    )
+    return f0, voiced_flag
+
+
+def _track_yin(y, sr, frame_length, hop_length):
+    f0 = librosa.yin(y, fmin=FMIN, fmax=FMAX, sr=sr, frame_length=frame_length, hop_length=hop_length)
+    voiced_range = (f0 > FMIN * 1.01) & (f0 < FMAX * 0.99)
+    if len(f0) >= YIN_MEDIAN_FRAMES:
+        f0 = medfilt(f0, YIN_MEDIAN_FRAMES)
+    voiced = _energy_voicing(y, frame_length, hop_length)
+    n = min(len(f0), len(voiced))
+    f0, voiced = f0[:n], voiced[:n]
+    # YIN reports the search bounds when it finds no period
+    voiced &= voiced_range[:n]
+    return np.where(voiced, f0, np.nan), voiced
+
+
+def _track_autocorr(y, sr, frame_length, hop_length):
+    padded = np.pad(np.asarray(y, dtype=np.float32), frame_length // 2)
+    frames = librosa.util.frame(padded, frame_length=frame_length, hop_length=hop_length)
+    n_frames = frames.shape[1]
+
+    lag_min = max(int(np.floor(sr / FMAX)), 1)
+    lag_max = min(int(np.ceil(sr / FMIN)), frame_length - 2)
+    window = np.hanning(frame_length).astype(np.float32)[:, None]
+    n_fft = 2 * frame_length
+
+    f0 = np.full(n_frames, np.nan)
+    strength = np.zeros(n_frames)
+    for b in range(0, n_frames, AUTOCORR_BATCH_FRAMES):
+        block = frames[:, b:b + AUTOCORR_BATCH_FRAMES]
+        block = (block - block.mean(axis=0, keepdims=True)) * window
+        spec = np.fft.rfft(block, n=n_fft, axis=0)
+        r = np.fft.irfft(np.abs(spec) ** 2, n=n_fft, axis=0)[:lag_max + 2]
+        r0 = r[0]
+        r = r / np.where(r0 > 0, r0, 1.0)
+
+        # Only consider lags after the first zero crossing (skips the lag-0 lobe)
+        negative = r[:lag_max + 1] < 0
+        first_neg = np.where(negative.any(axis=0), np.argmax(negative, axis=0), lag_max)
+        lags = np.arange(lag_max + 1)[:, None]
+        search = np.where((lags >= np.maximum(first_neg, lag_min)), r[:lag_max + 1], -np.inf)
+        peak = np.argmax(search, axis=0)
+        peak_val = search[peak, np.arange(search.shape[1])]
+
+        # Parabolic interpolation around the peak
+        inner = (peak > 0) & (peak < lag_max)
+        cols = np.arange(search.shape[1])
+        left = r[np.maximum(peak - 1, 0), cols]
+        right = r[np.minimum(peak + 1, lag_max + 1), cols]
+        denom = left - 2 * r[peak, cols] + right
+        shift = np.where(inner & (denom != 0), 0.5 * (left - right) / np.where(denom != 0, denom, 1.0), 0.0)
+        lag = peak + np.clip(shift, -0.5, 0.5)
+
+        valid = np.isfinite(peak_val) & (lag > 0)
+        f0[b:b + block.shape[1]] = np.where(valid, sr / np.where(lag > 0, lag, 1.0), np.nan)
+        strength[b:b + block.shape[1]] = np.where(valid, peak_val, 0.0)
+
+    voiced = _energy_voicing(y, frame_length, hop_length)
+    n = min(n_frames, len(voiced))
+    f0, strength, voiced = f0[:n], strength[:n], voiced[:n]
+    voiced &= (strength >= AUTOCORR_THRESHOLD) & (f0 >= FMIN) & (f0 <= FMAX)
+    return np.where(voiced, f0, np.nan), voiced
+
+
+F0_BACKENDS = {
+    "pyin": _track_pyin,
+    "yin": _track_yin,
+    "autocorr": _track_autocorr,
+}
+
+# Default backend; an unknown name would make every track_f0 call fail and
+# pitch silently drop to zero, so it is checked here
+F0_BACKEND = os.getenv("F0_BACKEND", "pyin")
+if F0_BACKEND not in F0_BACKENDS:
+    print(f"Warning: Unknown F0_BACKEND '{F0_BACKEND}' (available: {', '.join(F0_BACKENDS)}), using pyin")
+    F0_BACKEND = "pyin"
+
+
+def track_f0(y, sr, backend=None, frame_length=2048, hop_length=512):
+    """
+    Compute one F0 track over the whole clip.
+    Returns (f0, voiced): f0 in Hz with NaN on unvoiced frames, voiced as a bool mask.
+    """
+    backend = backend or F0_BACKEND
+    if backend not in F0_BACKENDS:
+        raise ValueError(f"Unknown F0 backend '{backend}'. Choose from {sorted(F0_BACKENDS)}")
+    f0, voiced = F0_BACKENDS[backend](y, sr, frame_length, hop_length)
+    return np.asarray(f0, dtype=float), np.asarray(voiced, dtype=bool)
+
+
+def pitch_stats(f0, voiced):
+    """
+    Aggregate pitch statistics from a (sliced) F0 track.
+    Returns None when there are fewer than MIN_VOICED_FRAMES voiced frames.
+    """
+    valid_f0 = f0[voiced & np.isfinite(f0)]
+    if len(valid_f0) < MIN_VOICED_FRAMES:
+        return None
+    pitch_max = float(np.max(valid_f0))
+    pitch_min = float(np.min(valid_f0))
+    return {
+        "pitch_mean": float(np.mean(valid_f0)),
+        "pitch_variance": float(np.var(valid_f0)) if len(valid_f0) > 1 else 0.0,
+        "pitch_max": pitch_max,
+        "pitch_min": pitch_min,
+        "pitch_range": pitch_max - pitch_min
+    }
@@ -0,0 +1,156 @@
+"""Content-addressed two-tier cache for analysis results and transcripts.
+
+Keys are SHA-256 digests of the audio content plus the parameters that shape
+the result, so a re-submitted recording hits the cache whatever its file name.
+
+- Memory tier: bounded LRU per process. Worker processes do not see each
+  other's entries.
+- Disk tier (optional, off by default): the only tier shared across workers
+  and restarts, so nothing is shared unless it is enabled. One JSON file
+  per key. Files are written to a temp file and atomically renamed into
+  place, so several worker processes can share the directory without ever
+  reading a partial entry.
+  Reads refresh the file's mtime and the oldest files are pruned once the
+  tier is full.
+  Entries hold user transcripts, so the tier lives outside the source tree
+  (SPEECH_CACHE_DIR, default ~/.cache/expressly/speech).
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+def cache_dir(name):
+    """Disk-tier directory `name` under SPEECH_CACHE_DIR (default $XDG_CACHE_HOME/expressly/speech)."""
+    root = os.getenv("SPEECH_CACHE_DIR")
+    if not root:
+        xdg = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        root = os.path.join(xdg, "expressly", "speech")
+    return os.path.join(root, name)
+
+
+def content_key(blocks, params):
+    """SHA-256 over audio blocks (float32 PCM arrays or raw bytes) and the JSON-encoded parameters."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode("utf-8"))
+    for block in blocks:
+        if isinstance(block, (bytes, bytearray)):
+            digest.update(block)
+        else:
+            digest.update(np.ascontiguousarray(block, dtype=np.float32).tobytes())
+    return digest.hexdigest()
+
+
+def file_blocks(path, block_size=1 << 20):
+    """Yield the raw bytes of a file in `block_size` pieces (for content_key without loading it whole)."""
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                return
+            yield block
+
+
+def _json_default(value):
+    # numpy scalars/arrays that slipped into a result
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return str(value)
+
+
+class ResultCache:
+    def __init__(self, max_entries=64, disk_dir=None, max_disk_entries=512):
+        self.max_entries = max(0, int(max_entries))
+        self.disk_dir = disk_dir
+        self.max_disk_entries = max(0, int(max_disk_entries))
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def get(self, key):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+
+        if not self.disk_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+            os.utime(path)  # disk-tier LRU
+        except (OSError, ValueError):
+            return None
+        self._remember(key, value)
+        return value
+
+    def put(self, key, value):
+        self._remember(key, value)
+        if not self.disk_dir or self.max_disk_entries == 0:
+            return
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(value, f, default=_json_default)
+                os.replace(tmp_path, path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        except OSError as e:
+            print(f"Warning: Could not write cache entry {key[:12]}: {str(e)}")
+            return
+
+        with self._lock:
+            self._writes += 1
+            prune = self._writes % 16 == 0
+        if prune:
+            self.prune_disk()
+
+    def _remember(self, key, value):
+        if self.max_entries == 0:
+            return
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def prune_disk(self):
+        """Delete the least recently used disk entries beyond max_disk_entries."""
+        entries = []
+        for root, _, files in os.walk(self.disk_dir):
+            for name in files:
+                if name.endswith(".json"):
+                    path = os.path.join(root, name)
+                    try:
+                        entries.append((os.path.getmtime(path), path))
+                    except OSError:
+                        pass  # removed by another worker
+        excess = len(entries) - self.max_disk_entries
+        if excess <= 0:
+            return
+        for _, path in sorted(entries)[:excess]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
@@ -0,0 +1,79 @@
+"""Speaking rate from syllable nuclei in the energy envelope.
+
+A syllable nucleus is a local peak of the short-time energy (in dB) that
+- rises at least PROMINENCE_DB above the dips around it,
+- lies within THRESHOLD_DB of the clip's loudest frame,
+- is at least MIN_SYLLABLE_SECONDS away from the previous nucleus,
+- and is voiced, when an F0 track is available.
+
+Nuclei are marked once on the shared frame grid (audio_utils.HOP_LENGTH), so
+any chunk's rate is a prefix-sum lookup. The chunk `tempo` column is this
+rate in syllables per minute. The clip-level estimate (estimate_speech_rate)
+gives a pace signal that does not depend on the transcript.
+"""
+
+import librosa
+import numpy as np
+from scipy.signal import find_peaks
+
+from .feature_table import as_table
+
+ENVELOPE_FRAME_LENGTH = 1024
+PROMINENCE_DB = 2.0
+THRESHOLD_DB = 25.0
+MIN_SYLLABLE_SECONDS = 0.1
+SYLLABLES_PER_WORD = 1.5   # average for conversational English
+
+
+def syllable_nuclei(y, sr, hop_length, voiced=None):
+    """Boolean array on the (centered) frame grid marking syllable nuclei."""
+    rms = librosa.feature.rms(y=y, frame_length=ENVELOPE_FRAME_LENGTH, hop_length=hop_length)[0]
+    nuclei = np.zeros(len(rms), dtype=bool)
+    if len(rms) < 3 or np.max(rms) <= 0:
+        return nuclei
+
+    envelope = librosa.amplitude_to_db(np.convolve(rms, np.ones(3) / 3, mode="same"), ref=np.max)
+    distance = max(1, int(MIN_SYLLABLE_SECONDS * sr / hop_length))
+    peaks, _ = find_peaks(envelope, height=-THRESHOLD_DB, prominence=PROMINENCE_DB, distance=distance)
+    if voiced is not None and len(peaks):
+        voiced = np.asarray(voiced, dtype=bool)
+        # Allow the voicing decision to be one frame off the energy peak
+        near = np.zeros(len(nuclei), dtype=bool)
+        near[:len(voiced)] = voiced[:len(nuclei)]
+        near[1:] |= near[:-1].copy()
+        near[:-1] |= near[1:].copy()
+        peaks = peaks[near[peaks]]
+    nuclei[peaks] = True
+    return nuclei
+
+
+def pacing_score_from_rate(wpm):
+    """0-100 pacing score for a words-per-minute rate (ideal range: 80-180)."""
+    if wpm < 80:
+        score = (wpm / 80) * 60  # very slow
+    elif wpm > 180:
+        score = 100 - ((wpm - 180) / 50) * 40  # very fast
+    else:
+        score = 100  # within ideal range
+    return round(min(max(score, 0), 100), 2)
+
+
+def estimate_speech_rate(chunk_features):
+    """
+    Clip-level rate from the chunks' `tempo` column (syllables per minute).
+    Returns syllables, speaking seconds, syllables_per_minute, estimated_wpm
+    (at SYLLABLES_PER_WORD) and the pacing_score of that estimate.
+    """
+    table = as_table(chunk_features)
+    durations = table.get("duration").astype(np.float64)
+    syllables = float(np.sum(table.get("tempo").astype(np.float64) * durations / 60.0))
+    seconds = float(np.sum(durations))
+    per_minute = syllables / (seconds / 60.0) if seconds > 0 else 0.0
+    wpm = per_minute / SYLLABLES_PER_WORD
+    return {
+        "syllables": int(round(syllables)),
+        "seconds": round(seconds, 2),
+        "syllables_per_minute": round(per_minute, 2),
+        "estimated_wpm": round(wpm, 2),
+        "pacing_score": pacing_score_from_rate(wpm),
+    }
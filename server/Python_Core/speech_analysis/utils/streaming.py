@@ -0,0 +1,116 @@
+"""Streaming, block-wise audio ingestion for long recordings.
+
+Audio is decoded and resampled in fixed-size blocks, so memory stays flat
+no matter how long the recording is. Each block is denoised (with a short
+overlap of the previous block as context, and the noise profile of the
+first block), optionally appended to the processed WAV, and analysed into
+chunk features before the next block is decoded. Callers get chunk results
+as soon as their block is ready.
+"""
+
+import numpy as np
+import soundfile as sf
+
+from .audio_io import iter_decoded
+from .audio_utils import extract_clip_features
+from .denoise import NoiseProfile, reduce_noise
+from .vad import speech_regions
+
+BLOCK_DURATION = 30      # seconds per analysis block (multiple of the chunk duration)
+CONTEXT_DURATION = 1.0   # seconds of the previous block used as denoise context
+
+
+def iter_audio_blocks(path, sr=16000, block_duration=BLOCK_DURATION):
+    """
+    Yield mono float32 blocks of exactly `block_duration` seconds at `sr`
+    (the final block may be shorter).
+    """
+    decoded = iter_decoded(path, sr)
+    block_samples = int(sr * block_duration)
+    pending = []
+    pending_len = 0
+    for data in decoded:
+        pending.append(data)
+        pending_len += len(data)
+        while pending_len >= block_samples:
+            buf = np.concatenate(pending)
+            yield buf[:block_samples]
+            rest = buf[block_samples:]
+            pending = [rest] if len(rest) else []
+            pending_len = len(rest)
+    if pending_len:
+        yield np.concatenate(pending)
+
+
+def iter_denoised_blocks(path, sr=16000, block_duration=BLOCK_DURATION, prop_decrease=0.75):
+    """
+    Yield (block_index, denoised block, denoise report) for each block of
+    iter_audio_blocks. Each block is denoised with the tail of the previous
+    raw block as context and the first block's noise profile, so block edges
+    do not restart the estimate.
+    """
+    context_samples = int(sr * CONTEXT_DURATION)
+    context = np.zeros(0, dtype=np.float32)
+    profile = None
+    for block_index, block in enumerate(iter_audio_blocks(path, sr, block_duration)):
+        try:
+            if profile is None:
+                profile = NoiseProfile.from_audio(block, sr)
+            y = np.concatenate([context, block])
+            y_clean, report = reduce_noise(y, sr, prop_decrease=prop_decrease, profile=profile)
+            y_clean = y_clean[len(context):]
+        except Exception as e:
+            print(f"Warning: Noise reduction failed for block {block_index}: {str(e)}")
+            y_clean, report = block, {"applied": False, "snr_db": None, "seconds": 0.0}
+        context = block[-context_samples:]
+        yield block_index, y_clean, report
+
+
+def write_denoised_wav(path, output_path, sr=16000, block_duration=BLOCK_DURATION, prop_decrease=0.75):
+    """Denoise a recording block by block into a WAV at `output_path`, without analysing it."""
+    with sf.SoundFile(output_path, "w", samplerate=sr, channels=1) as writer:
+        for _, y_clean, _ in iter_denoised_blocks(path, sr, block_duration, prop_decrease):
+            writer.write(y_clean)
+
+
+def stream_chunk_features(path, sr=16000, chunk_duration=5, block_duration=BLOCK_DURATION,
+                          output_path=None, prop_decrease=0.75, vad=False):
+    """
+    Analyse a recording block by block.
+
+    Yields one dict per block:
+        {"block_index", "start_time", "end_time", "chunks": ChunkFeatureTable,
+         "denoise": {"applied", "snr_db", "seconds"}}
+    Chunk indices and times are on the timeline of the whole recording.
+    When `output_path` is given the denoised audio is appended to it as a WAV.
+    With `vad` each block is analysed in speech regions instead of fixed chunks.
+    """
+    if block_duration % chunk_duration:
+        raise ValueError("block_duration must be a multiple of chunk_duration")
+
+    writer = sf.SoundFile(output_path, "w", samplerate=sr, channels=1) if output_path else None
+    offset = 0
+    n_chunks = 0
+    try:
+        for block_index, y_clean, report in iter_denoised_blocks(path, sr, block_duration, prop_decrease):
+            if writer is not None:
+                writer.write(y_clean)
+
+            start_time = offset / sr
+            regions = speech_regions(y_clean, sr, max_region_seconds=chunk_duration) if vad else None
+            chunks = extract_clip_features(y_clean, sr, chunk_duration=chunk_duration, regions=regions).shifted(
+                index_offset=n_chunks, time_offset=start_time
+            )
+            n_chunks += len(chunks)
+
+            offset += len(y_clean)
+            yield {
+                "block_index": block_index,
+                "start_time": float(start_time),
+                "end_time": float(offset / sr),
+                "chunks": chunks,
+                "denoise": report
+            }
+    finally:
+        if writer is not None:
+            writer.close()
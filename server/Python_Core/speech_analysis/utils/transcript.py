@@ -0,0 +1,159 @@
+"""Tokenized view of a transcription, shared by the transcript services.
+
+A TranscriptDocument is built once per transcription (the `document`
+pipeline stage) and read by fluency, pronunciation and context detection,
+so the transcript is tokenized, normalized and scanned for fillers once:
+- tokens           NLTK word tokens of the text (punctuation included)
+- normalized       per token: lowercase, punctuation removed ("" for punctuation)
+- sentence_spans   (start, end) character offsets of the non-empty sentences
+- words            Whisper word timestamps, normalized: [{"word", "start", "end", "probability"}]
+- filler_positions (index into `words`, number of words) per filler, in spoken order
+
+Services accept either a document or the raw transcription dict (see as_document).
+"""
+
+import re
+import string
+
+import nltk
+from nltk.tokenize import word_tokenize
+
+try:
+    nltk.data.find("tokenizers/punkt")
+except LookupError:
+    nltk.download("punkt")
+
+FILLER_WORDS = ["um", "uh", "like", "you know", "so", "actually", "basically", "right", "er", "ahm", "well"]
+
+# Fillers as token sequences, longest first so "you know" wins over a single-word match
+_FILLER_SEQUENCES = sorted((tuple(f.split()) for f in FILLER_WORDS), key=len, reverse=True)
+_FILLER_STARTS = {}
+for _seq in _FILLER_SEQUENCES:
+    _FILLER_STARTS.setdefault(_seq[0], []).append(_seq)
+_MAX_FILLER_WORDS = len(_FILLER_SEQUENCES[0])
+
+_STRIP_CHARS = "".join(c for c in string.punctuation if c != "'") + " "
+_PUNCTUATION_TABLE = str.maketrans("", "", string.punctuation)
+_SENTENCE_END = re.compile(r"[.!?]")
+
+
+def normalize_word(word):
+    """Lowercase a Whisper word token and strip surrounding spaces/punctuation (apostrophes kept)."""
+    return word.strip(_STRIP_CHARS).lower()
+
+
+def clean_word(word):
+    """Lowercase and remove punctuation"""
+    return word.lower().translate(_PUNCTUATION_TABLE)
+
+
+def build_word_index(segments):
+    """
+    Flatten Whisper word timestamps into one list of normalized words:
+    [{"word", "start", "end", "probability"}], in spoken order.
+    """
+    index = []
+    for segment in segments:
+        for word_info in segment.get("words", []) or []:
+            word = normalize_word(word_info.get("word", ""))
+            if word:
+                index.append({
+                    "word": word,
+                    "start": word_info.get("start", 0.0),
+                    "end": word_info.get("end", 0.0),
+                    "probability": word_info.get("probability")
+                })
+    return index
+
+
+def filler_spans(word_index, start=0, final=True):
+    """
+    (position, length) of the fillers from position `start`; returns (spans, next_start).
+    With final=False the scan stops before words that a longer filler could
+    still extend, so a growing (live) word index can be scanned incrementally.
+    """
+    spans = []
+    i = start
+    n = len(word_index)
+    stop = n if final else n - _MAX_FILLER_WORDS + 1
+    while i < stop:
+        match = None
+        for seq in _FILLER_STARTS.get(word_index[i]["word"], ()):
+            if i + len(seq) <= n and all(word_index[i + k]["word"] == seq[k] for k in range(1, len(seq))):
+                match = seq
+                break
+        if match:
+            spans.append((i, len(match)))
+            i += len(match)
+        else:
+            i += 1
+    return spans, max(i, start)
+
+
+def filler_records(word_index, spans):
+    """Render filler spans as [{"word", "start", "end"}] with timestamps."""
+    return [
+        {
+            "word": " ".join(w["word"] for w in word_index[i:i + length]),
+            "start": round(word_index[i]["start"], 2),
+            "end": round(word_index[i + length - 1]["end"], 2)
+        }
+        for i, length in spans
+    ]
+
+
+def scan_fillers(word_index, start=0, final=True):
+    """Fillers with timestamps from position `start`; returns (fillers, next_start). See filler_spans."""
+    spans, next_start = filler_spans(word_index, start, final)
+    return filler_records(word_index, spans), next_start
+
+
+def sentence_spans(text):
+    """(start, end) offsets of the stripped, non-empty sentences of `text` (split at . ! ?)."""
+    spans = []
+    begin = 0
+    for end in [m.start() for m in _SENTENCE_END.finditer(text)] + [len(text)]:
+        piece = text[begin:end]
+        stripped = piece.strip()
+        if stripped:
+            offset = begin + (len(piece) - len(piece.lstrip()))
+            spans.append((offset, offset + len(stripped)))
+        begin = end + 1
+    return spans
+
+
+class TranscriptDocument:
+    def __init__(self, text="", segments=None):
+        self.text = text or ""
+        self.segments = segments or []
+        self.tokens = word_tokenize(self.text) if self.text else []
+        self.normalized = [clean_word(token) for token in self.tokens]
+        self.sentence_spans = sentence_spans(self.text)
+        self.words = build_word_index(self.segments)
+        self.filler_positions = filler_spans(self.words)[0]
+
+    @classmethod
+    def from_transcription(cls, transcription_result):
+        return cls(transcription_result.get("text", ""), transcription_result.get("segments", []))
+
+    @property
+    def sentences(self):
+        return [self.text[start:end] for start, end in self.sentence_spans]
+
+    @property
+    def spoken_words(self):
+        """Normalized forms of the word tokens (punctuation tokens dropped)."""
+        return [word for word in self.normalized if word]
+
+    @property
+    def fillers(self):
+        return filler_records(self.words, self.filler_positions)
+
+
+def as_document(transcription):
+    """Accept a TranscriptDocument, a transcription dict or plain text."""
+    if isinstance(transcription, TranscriptDocument):
+        return transcription
+    if isinstance(transcription, str):
+        return TranscriptDocument(transcription)
+    return TranscriptDocument.from_transcription(transcription)
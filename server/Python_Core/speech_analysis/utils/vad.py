@@ -0,0 +1,117 @@
+"""Energy/spectral voice-activity detection.
+
+Speech frames are frames that are ENERGY_MARGIN_DB above the clip's noise
+floor (10th percentile of frame energy) and either spectrally peaked
+(flatness below FLATNESS_MAX) or louder still (2 x ENERGY_MARGIN_DB, which
+keeps fricatives). Runs of speech frames are then
+- merged across gaps shorter than MIN_SILENCE_SECONDS,
+- dropped when shorter than MIN_SPEECH_SECONDS,
+- padded by PAD_SECONDS on both sides,
+- split into equal parts no longer than the requested maximum.
+
+The resulting regions replace the fixed chunk grid as analysis units, and
+their merged spans are handed to faster-whisper as clip timestamps so the
+decoder skips long silences too.
+
+Configuration:
+    SPEECH_VAD  use speech regions as analysis units (1/0; 0 = fixed chunks)
+"""
+
+import os
+
+import librosa
+import numpy as np
+
+VAD_ENABLED = os.getenv("SPEECH_VAD", "1") == "1"
+
+FRAME_LENGTH = 512
+HOP_LENGTH = 256
+ENERGY_MARGIN_DB = 6.0
+FLATNESS_MAX = 0.3
+MIN_SPEECH_SECONDS = 0.25
+MIN_SILENCE_SECONDS = 0.3
+PAD_SECONDS = 0.1
+WHISPER_MIN_GAP_SECONDS = 2.0   # shorter silences stay inside one Whisper clip
+
+
+def speech_frames(y):
+    """Boolean speech decision per VAD frame (centered frames of HOP_LENGTH)."""
+    power = np.abs(librosa.stft(y, n_fft=FRAME_LENGTH, hop_length=HOP_LENGTH)) ** 2
+    energy_db = 10 * np.log10(np.mean(power, axis=0) + 1e-10)
+    flatness = librosa.feature.spectral_flatness(S=power, power=1.0)[0]
+    floor = np.percentile(energy_db, 10)
+    loud = energy_db > floor + ENERGY_MARGIN_DB
+    return loud & ((flatness < FLATNESS_MAX) | (energy_db > floor + 2 * ENERGY_MARGIN_DB))
+
+
+def _runs(mask):
+    """(starts, ends) frame indices of the True runs of `mask`."""
+    edges = np.diff(np.concatenate([[0], mask.astype(np.int8), [0]]))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def _merge(starts, ends, min_gap):
+    """Merge [start, end) spans separated by less than `min_gap`."""
+    if len(starts) == 0:
+        return starts, ends
+    keep = np.concatenate([[True], starts[1:] - ends[:-1] >= min_gap])
+    group = np.cumsum(keep) - 1
+    merged_ends = np.zeros(group[-1] + 1, dtype=ends.dtype)
+    np.maximum.at(merged_ends, group, ends)
+    return starts[keep], merged_ends
+
+
+def speech_regions(y, sr, max_region_seconds=5.0):
+    """
+    Speech regions of a clip as (starts, ends) sample arrays, sorted and
+    non-overlapping, each at most `max_region_seconds` long.
+    """
+    empty = np.zeros(0, dtype=np.int64)
+    if len(y) < FRAME_LENGTH:
+        return empty, empty
+
+    starts, ends = _runs(speech_frames(y))
+    # Frame indices -> samples (frame k is centered on k * HOP_LENGTH)
+    starts = np.maximum(starts * HOP_LENGTH - HOP_LENGTH // 2, 0)
+    ends = np.minimum(ends * HOP_LENGTH - HOP_LENGTH // 2, len(y))
+
+    starts, ends = _merge(starts, ends, int(MIN_SILENCE_SECONDS * sr))
+    keep = ends - starts >= int(MIN_SPEECH_SECONDS * sr)
+    starts, ends = starts[keep], ends[keep]
+
+    pad = int(PAD_SECONDS * sr)
+    starts, ends = _merge(np.maximum(starts - pad, 0), np.minimum(ends + pad, len(y)), 1)
+
+    # Cap the length: split long regions into equal parts
+    max_length = max(1, int(max_region_seconds * sr))
+    parts = -(-(ends - starts) // max_length)
+    region = np.repeat(np.arange(len(starts)), parts)
+    part = np.arange(len(region)) - np.repeat(np.cumsum(parts) - parts, parts)
+    lengths = (ends - starts)[region]
+    split_starts = starts[region] + lengths * part // parts[region]
+    split_ends = starts[region] + lengths * (part + 1) // parts[region]
+    return split_starts.astype(np.int64), split_ends.astype(np.int64)
+
+
+def summarize_regions(starts, ends, n_samples, sr):
+    """Cheap summary of the speech/silence split of a clip."""
+    speech = int(np.sum(ends - starts)) if len(starts) else 0
+    gaps = np.diff(np.concatenate([[0], np.column_stack([starts, ends]).reshape(-1), [n_samples]]))[::2]
+    return {
+        "speech_regions": int(len(starts)),
+        "speech_seconds": round(speech / sr, 2),
+        "silence_seconds": round((n_samples - speech) / sr, 2),
+        "longest_silence": round(float(np.max(gaps)) / sr, 2) if len(gaps) else 0.0,
+    }
+
+
+def whisper_clips(starts, ends, sr, min_gap_seconds=WHISPER_MIN_GAP_SECONDS):
+    """
+    Flat [start, end, start, end, ...] seconds for faster-whisper's
+    clip_timestamps. Regions closer than `min_gap_seconds` are joined so the
+    decoder is not restarted for every short pause.
+    """
+    if len(starts) == 0:
+        return None
+    starts, ends = _merge(np.asarray(starts), np.asarray(ends), int(min_gap_seconds * sr))
+    return [round(float(t) / sr, 3) for pair in zip(starts, ends) for t in pair]
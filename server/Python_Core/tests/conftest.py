@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+# Tests import the service packages (speech_analysis, ...) from server/Python_Core
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def punkt():
+    """Skip tests that tokenize text when NLTK's punkt tokenizer data is not installed."""
+    nltk = pytest.importorskip("nltk")
+    try:
+        nltk.word_tokenize("Hello world.")
+    except LookupError:
+        pytest.skip("NLTK punkt data is not installed")
@@ -0,0 +1,26 @@
+import pytest
+
+pytest.importorskip("fastapi")
+
+from fastapi import HTTPException
+
+from speech_analysis.analyzer import EvaluateFeatureRequest, evaluate_feature, requested_sections
+
+
+def test_requested_sections_follow_response_order():
+    assert requested_sections(None) is None
+    assert requested_sections(["scoring", "transcription"]) == ["transcription", "scoring"]
+
+
+@pytest.mark.parametrize("fields", [[], ["transcription", "nope"]])
+def test_empty_or_unknown_fields_are_rejected(fields):
+    with pytest.raises(HTTPException) as error:
+        requested_sections(fields)
+    assert error.value.status_code == 400
+
+
+@pytest.mark.parametrize("audio_data, feature", [(None, "Pitch"), ("AAAA", "Volume")])
+def test_evaluate_feature_keeps_bad_requests_as_400(audio_data, feature):
+    with pytest.raises(HTTPException) as error:
+        evaluate_feature(EvaluateFeatureRequest(audioData=audio_data, feature=feature))
+    assert error.value.status_code == 400
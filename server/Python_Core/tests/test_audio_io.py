@@ -0,0 +1,60 @@
+import io
+
+import numpy as np
+import pytest
+
+sf = pytest.importorskip("soundfile")
+pytest.importorskip("soxr")
+
+from speech_analysis.utils import audio_io
+
+
+def _wav_bytes(y, sr):
+    buffer = io.BytesIO()
+    sf.write(buffer, y, sr, format="WAV", subtype="FLOAT")
+    return buffer.getvalue()
+
+
+def _tone(seconds, sr, channels=1):
+    t = np.arange(int(seconds * sr)) / sr
+    y = (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+    return np.column_stack([y] * channels) if channels > 1 else y
+
+
+def test_decode_bytes_resamples_to_16k_mono():
+    y, sr = audio_io.decode_audio_bytes(_wav_bytes(_tone(2.0, 48000, channels=2), 48000))
+    assert sr == audio_io.SAMPLE_RATE
+    assert y.dtype == np.float32 and y.ndim == 1
+    assert abs(len(y) - 2 * audio_io.SAMPLE_RATE) <= 1
+
+
+def test_decode_at_native_rate():
+    y, sr = audio_io.decode_audio_bytes(_wav_bytes(_tone(1.0, 22050), 22050), sr=None)
+    assert sr == 22050 and len(y) == 22050
+
+
+def test_incremental_decode_matches_whole_decode(monkeypatch):
+    monkeypatch.setattr(audio_io, "READ_FRAMES", 4096)
+    data = _wav_bytes(_tone(3.0, 44100), 44100)
+    whole = audio_io.decode_audio(data)
+    pieces = list(audio_io.iter_decoded(data))
+    assert len(pieces) > 1
+    streamed = np.concatenate(pieces)
+    assert abs(len(streamed) - len(whole)) <= 2
+    n = min(len(streamed), len(whole))
+    # Stream and one-shot resampling differ only at the very edges
+    np.testing.assert_allclose(streamed[100:n - 100], whole[100:n - 100], atol=1e-3)
+
+
+def test_without_pyav_falls_back_to_audioread(monkeypatch):
+    calls = []
+
+    def fake_decode(source):
+        calls.append(source)
+        return np.zeros(32000, dtype=np.float32), 32000
+
+    monkeypatch.setattr(audio_io, "_has_av", lambda: False)
+    monkeypatch.setattr(audio_io, "_audioread_decode", fake_decode)
+    y, sr = audio_io.decode_audio_bytes(b"not a soundfile container")
+    assert calls and sr == audio_io.SAMPLE_RATE and len(y) == 16000
+    assert sum(len(p) for p in audio_io.iter_decoded(b"still not one")) == 16000
@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("librosa")
+
+from speech_analysis.utils import audio_utils
+from speech_analysis.utils.pitch_tracking import MIN_VOICED_FRAMES
+
+SR = 16000
+HOP = audio_utils.HOP_LENGTH
+
+
+def _frames(n_samples, seed=0):
+    """Synthetic frame arrays on the shared grid, with a partly unvoiced F0 track."""
+    rng = np.random.default_rng(seed)
+    n_frames = 1 + n_samples // HOP
+    f0 = rng.uniform(90.0, 250.0, n_frames)
+    voiced = rng.random(n_frames) > 0.3
+    f0[~voiced] = np.nan
+    return {
+        "sr": SR, "hop_length": HOP, "n_samples": n_samples, "include": audio_utils.FEATURE_GROUPS,
+        "rms": rng.random(n_frames),
+        "zcr": rng.random(n_frames),
+        "mfcc": rng.standard_normal((audio_utils.N_MFCC, n_frames)),
+        "f0": f0, "voiced": voiced,
+        "nuclei": (rng.random(n_frames) > 0.9).astype(float),
+    }
+
+
+def _reference(frames, y, start, end):
+    """Per-chunk statistics computed directly from the frame slice."""
+    frame = audio_utils.frame_slice(start, end, HOP, len(frames["rms"]))
+    rms = frames["rms"][frame]
+    f0 = frames["f0"][frame]
+    f0 = f0[frames["voiced"][frame] & np.isfinite(f0)]
+    chunk = np.abs(y[start:end])
+    duration = (end - start) / SR
+    pitch = len(f0) >= MIN_VOICED_FRAMES
+    return {
+        "rms_mean": rms.mean(), "rms_var": rms.var(), "zcr": frames["zcr"][frame].mean(),
+        "silence_ratio": np.mean(chunk < 0.01 * chunk.max()),
+        "mfccs_mean": frames["mfcc"][:, frame].mean(axis=1),
+        "pitch_mean": f0.mean() if pitch else 0.0,
+        "pitch_variance": f0.var() if pitch else 0.0,
+        "pitch_max": f0.max() if pitch else 0.0,
+        "pitch_min": f0.min() if pitch else 0.0,
+        "tempo": frames["nuclei"][frame].sum() / (duration / 60.0),
+    }
+
+
+@pytest.mark.parametrize("starts, ends", [
+    # Consecutive grid chunks, last one short
+    ([0, 80000, 160000], [80000, 160000, 200000]),
+    # Speech regions with gaps, off the frame grid
+    ([3000, 41234, 150001], [30000, 99999, 198765]),
+])
+def test_summarize_chunks_matches_per_chunk_statistics(starts, ends):
+    rng = np.random.default_rng(1)
+    y = rng.standard_normal(200000).astype(np.float32)
+    y[50000:52000] = 0.0
+    frames = _frames(len(y))
+    table = audio_utils.summarize_chunks(frames, y, np.arange(len(starts)), starts, ends)
+    records = table.to_records()
+    assert len(records) == len(starts)
+    for record, start, end in zip(records, starts, ends):
+        expected = _reference(frames, y, start, end)
+        assert record["start_time"] == pytest.approx(start / SR)
+        assert record["duration"] == pytest.approx((end - start) / SR)
+        for name, value in expected.items():
+            np.testing.assert_allclose(record[name], value, rtol=1e-5, atol=1e-5, err_msg=name)
+        assert record["pitch_range"] == pytest.approx(record["pitch_max"] - record["pitch_min"])
+
+
+def test_summarize_chunks_zeroes_pitch_without_voiced_frames():
+    y = np.ones(40000, dtype=np.float32)
+    frames = _frames(len(y))
+    frames["voiced"][:] = False
+    record = audio_utils.summarize_chunk(frames, y, 0, 0, len(y))
+    assert record["pitch_mean"] == record["pitch_max"] == record["pitch_range"] == 0.0
+    assert record["silence_ratio"] == 0.0
+
+
+def test_summarize_chunks_skips_failed_features():
+    y = np.ones(40000, dtype=np.float32)
+    frames = _frames(len(y))
+    frames["rms"] = frames["mfcc"] = None
+    record = audio_utils.summarize_chunk(frames, y, 0, 0, len(y))
+    assert record["rms_mean"] == record["rms_var"] == 0.0
+    np.testing.assert_array_equal(record["mfccs_mean"], np.zeros(audio_utils.N_MFCC))
+
+
+def test_extract_clip_features_matches_single_chunk_extraction():
+    t = np.arange(int(7.5 * SR)) / SR
+    y = (0.3 * np.sin(2 * np.pi * 180 * t) * (1 + np.sin(2 * np.pi * 0.5 * t))).astype(np.float32)
+    include = ("energy", "spectral")
+    table = audio_utils.extract_clip_features(y, SR, chunk_duration=5, include=include)
+    records = table.to_records()
+    assert [r["chunk_index"] for r in records] == [0, 1]
+    assert records[1]["end_time"] == pytest.approx(7.5)
+    # Chunk 0 sits at the start of the clip, so its frames match a standalone extraction
+    single = audio_utils.extract_features(y[:5 * SR], SR, 0, 0.0, 5.0, include=include)
+    assert records[0]["rms_mean"] == pytest.approx(single["rms_mean"], rel=0.02)
+    assert records[0]["zcr"] == pytest.approx(single["zcr"], rel=0.02)
+
+
+def test_extract_clip_features_drops_short_trailing_chunk():
+    y = np.random.default_rng(0).standard_normal(5 * SR + SR // 20).astype(np.float32)
+    table = audio_utils.extract_clip_features(y, SR, chunk_duration=5, include=("energy",))
+    assert len(table.to_records()) == 1
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from speech_analysis.utils.feature_table import RECORD_KEYS, ChunkFeatureTable, as_table
+
+
+def _records(n, offset=0):
+    return [
+        {"chunk_index": offset + i, "start_time": 5.0 * i, "end_time": 5.0 * (i + 1), "duration": 5.0,
+         "rms_mean": 0.1 * (i + 1), "mfccs_mean": [float(i)] * 13, "pitch_mean": 120.0 + i}
+        for i in range(n)
+    ]
+
+
+def test_records_round_trip_in_record_key_order():
+    records = _records(3)
+    table = ChunkFeatureTable.from_records(records + [None])
+    assert len(table) == 3
+    rendered = table.to_records()
+    assert list(rendered[0]) == [k for k in RECORD_KEYS if k in records[0]]
+    for got, expected in zip(rendered, records):
+        assert got["chunk_index"] == expected["chunk_index"]
+        assert got["rms_mean"] == pytest.approx(expected["rms_mean"])
+        assert got["mfccs_mean"] == expected["mfccs_mean"]
+
+
+def test_missing_columns_read_as_defaults():
+    table = ChunkFeatureTable.from_records(_records(2))
+    assert "tempo" not in table and "mfccs_mean" in table
+    np.testing.assert_array_equal(table.get("tempo", default=-1.0), [-1.0, -1.0])
+    assert table.get("pitch_mean").dtype == np.float32
+
+
+def test_shifted_and_concat_build_a_streamed_timeline():
+    block = ChunkFeatureTable.from_records(_records(2))
+    block.f0_track = (np.array([0.0, 0.5], dtype=np.float32), np.array([100.0, np.nan], dtype=np.float32))
+    table = ChunkFeatureTable.concat([block, ChunkFeatureTable(np.zeros(0), {}),
+                                      block.shifted(index_offset=2, time_offset=10.0)])
+    np.testing.assert_array_equal(table["chunk_index"], [0, 1, 2, 3])
+    np.testing.assert_allclose(table["start_time"], [0.0, 5.0, 10.0, 15.0])
+    np.testing.assert_allclose(table.f0_track[0], [0.0, 0.5, 10.0, 10.5])
+    assert table.mfccs.shape == (4, 13)
+    # The source block is untouched
+    np.testing.assert_allclose(block["start_time"], [0.0, 5.0])
+
+
+def test_empty_inputs():
+    assert len(ChunkFeatureTable.from_records([])) == 0
+    assert ChunkFeatureTable.concat([]).to_records() == []
+    table = ChunkFeatureTable.from_records(_records(1))
+    assert as_table(table) is table
+    assert len(as_table(_records(2))) == 2
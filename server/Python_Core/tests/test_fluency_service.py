@@ -0,0 +1,56 @@
+import pytest
+
+pytest.importorskip("nltk")
+pytest.importorskip("librosa")
+
+from speech_analysis.services.fluency_service import PAUSE_THRESHOLD, calculate_fluency, find_pauses
+
+
+def _word(word, start, end):
+    return {"word": f" {word}", "start": start, "end": end, "probability": 0.9}
+
+
+# One segment with a 1.0 s hesitation inside it, then a second segment that
+# follows after only 0.3 s. Segment gaps alone would find no pause.
+TRANSCRIPTION = {
+    "text": "I think um the answer is clear. We should act.",
+    "segments": [
+        {"start": 0.0, "end": 4.0, "text": " I think um the answer is clear.", "words": [
+            _word("I", 0.0, 0.2), _word("think", 0.2, 0.5), _word("um", 0.6, 0.9),
+            _word("the", 1.9, 2.1), _word("answer", 2.1, 2.6), _word("is", 2.6, 2.8), _word("clear.", 2.8, 4.0),
+        ]},
+        {"start": 4.3, "end": 5.5, "text": " We should act.", "words": [
+            _word("We", 4.3, 4.5), _word("should", 4.5, 4.9), _word("act.", 4.9, 5.5),
+        ]},
+    ],
+}
+
+
+def test_pauses_are_gaps_between_words():
+    pauses = find_pauses([{"start": 0.0, "end": 0.5}, {"start": 1.2, "end": 1.5}, {"start": 1.9, "end": 2.0}])
+    assert pauses == [{"start": 0.5, "end": 1.2, "duration": 0.7}]
+    assert PAUSE_THRESHOLD == 0.7
+
+
+def test_segment_gaps_are_used_without_word_timestamps():
+    segments = [{"start": 0.0, "end": 1.0}, {"start": 2.0, "end": 3.0}]
+    assert find_pauses(segments) == [{"start": 1.0, "end": 2.0, "duration": 1.0}]
+
+
+def test_fluency_scores_are_pinned(punkt):
+    result = calculate_fluency(TRANSCRIPTION)
+    # The hesitation inside the first segment counts; the 0.3 s segment gap does not
+    assert result["pauses"] == [{"start": 0.9, "end": 1.9, "duration": 1.0}]
+    assert [f["word"] for f in result["filler_words"]] == ["um"]
+    # 12 tokens (punctuation included) over 5.5 s
+    assert result["total_words"] == 12
+    assert result["wpm"] == 130.91
+    assert result["pacing_score"] == 100
+    # 100 - filler penalty (1 / 12 * 200) - pause penalty (1 * 5)
+    assert result["fluency_score"] == 78.33
+    assert result["clarity_score"] == 87.0
+
+
+def test_empty_transcript_reports_an_error():
+    result = calculate_fluency({"text": "", "segments": []})
+    assert result["error"] and result["fluency_score"] == 0 and result["pacing_score"] == 0
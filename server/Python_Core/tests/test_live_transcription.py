@@ -0,0 +1,119 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("nltk")
+
+from speech_analysis.services.live_transcription import MAX_WINDOW_SECONDS, STEP_SECONDS, LiveTranscriber
+
+SR = 16000
+
+
+def _result(*words):
+    """Transcription dict from (word, start, end) tuples (times relative to the window)."""
+    return {"segments": [{"words": [{"word": w, "start": s, "end": e, "probability": 0.9} for w, s, e in words]}]}
+
+
+class ScriptedDecoder:
+    """Returns the scripted hypotheses in order and records every window it was given."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = []
+
+    def __call__(self, window, initial_prompt=None):
+        self.calls.append((len(window), initial_prompt))
+        return self.results.pop(0) if self.results else _result()
+
+
+def _feed(session, seconds):
+    return session.add_audio(np.zeros(int(seconds * SR), dtype=np.float32))
+
+
+def test_decode_is_due_every_step():
+    session = LiveTranscriber(ScriptedDecoder(), sr=SR)
+    assert not _feed(session, STEP_SECONDS / 2)
+    assert _feed(session, STEP_SECONDS / 2)
+
+
+def test_agreed_prefix_is_committed_and_window_restarts():
+    decoder = ScriptedDecoder(
+        _result((" Hello", 0.0, 0.4), (" wor", 0.5, 0.8)),
+        _result((" Hello", 0.0, 0.4), (" world", 0.5, 0.9), (" how", 1.2, 1.5)),
+    )
+    session = LiveTranscriber(decoder, sr=SR)
+    _feed(session, 1.0)
+    state = session.update()
+    assert state["committed"] == "" and state["partial"] == "Hello wor"
+
+    _feed(session, 1.0)
+    state = session.update()
+    assert state["committed"] == "Hello"
+    assert state["partial"] == "world how"
+    assert session.window_start == pytest.approx(0.4)
+
+    _feed(session, 1.0)
+    session.update()
+    # The next window starts after the committed word and is prompted with it
+    assert decoder.calls[-1] == (int(3.0 * SR) - int(0.4 * SR), "Hello")
+
+
+def test_window_offsets_make_times_absolute():
+    decoder = ScriptedDecoder(
+        _result((" one", 0.0, 1.0)),
+        _result((" one", 0.0, 1.0)),
+        _result((" two", 0.5, 0.9)),
+        _result((" two", 0.5, 0.9)),
+    )
+    session = LiveTranscriber(decoder, sr=SR)
+    for _ in range(4):
+        _feed(session, 1.0)
+        session.update()
+    assert [(w["word"], w["start"]) for w in session.committed] == [(" one", 0.0), (" two", 1.5)]
+
+
+def test_long_window_without_agreement_is_force_committed():
+    words = [(f" w{i}", float(i), i + 0.5) for i in range(16)]
+    session = LiveTranscriber(ScriptedDecoder(_result(*words)), sr=SR)
+    _feed(session, MAX_WINDOW_SECONDS + 1)
+    session.update()
+    window_end = MAX_WINDOW_SECONDS + 1
+    assert [w["word"] for w in session.committed] == [w for w, _, end in words if end <= window_end - 2 * STEP_SECONDS]
+
+
+def test_fillers_pauses_and_final_transcription():
+    decoder = ScriptedDecoder(
+        _result((" Um", 0.0, 0.3), (" you", 0.4, 0.6), (" know", 0.6, 0.8), (" it", 2.0, 2.2)),
+        _result((" Um", 0.0, 0.3), (" you", 0.4, 0.6), (" know", 0.6, 0.8), (" it", 2.0, 2.2), (" works", 2.3, 2.6)),
+        _result(),
+    )
+    session = LiveTranscriber(decoder, sr=SR)
+    _feed(session, 1.0)
+    session.update()
+    _feed(session, 2.0)
+    state = session.update()
+    # "you know" is not counted until the words after it are committed
+    assert state["fillers"] == 2
+    assert state["pauses"] == 1
+
+    transcription = session.finish()
+    assert [f["word"] for f in session.fillers] == ["um", "you know"]
+    assert transcription["text"] == "Um you know it works"
+    # Words more than SEGMENT_GAP_SECONDS apart start a new segment
+    assert len(transcription["segments"]) == 2
+
+
+def test_audio_is_capped_and_not_copied():
+    session = LiveTranscriber(ScriptedDecoder(), sr=SR, max_seconds=2)
+    _feed(session, 1.5)
+    _feed(session, 1.5)
+    audio = session.audio()
+    assert len(audio) == 2 * SR
+    assert np.shares_memory(audio, session.audio())
+    assert not _feed(session, 1.0)
+
+
+def test_decoder_error_is_reported():
+    session = LiveTranscriber(lambda window, initial_prompt=None: {"error": "busy"}, sr=SR)
+    _feed(session, 1.0)
+    assert session.update()["committed"] == ""
+    assert session.error == "busy"
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("librosa")
+
+from speech_analysis.utils import parallel_processing
+from speech_analysis.utils.audio_utils import extract_features
+
+SR = 16000
+BACKEND = "yin"
+
+
+@pytest.fixture
+def pool():
+    yield 2
+    parallel_processing.shutdown_pool()
+
+
+def _clip(seconds):
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * SR)) / SR
+    return (0.3 * np.sin(2 * np.pi * 200 * t) + 0.05 * rng.standard_normal(len(t))).astype(np.float32)
+
+
+def test_workers_match_serial_extraction(pool):
+    y = _clip(2.5)
+    table = parallel_processing.extract_features_parallel(y, SR, chunk_duration=1, workers=pool, f0_backend=BACKEND)
+    records = table.to_records()
+    assert [r["chunk_index"] for r in records] == [0, 1, 2]
+    for record, start in zip(records, (0, SR, 2 * SR)):
+        end = min(start + SR, len(y))
+        serial = extract_features(y[start:end], SR, record["chunk_index"], start / SR, end / SR, f0_backend=BACKEND)
+        assert record["end_time"] == pytest.approx(end / SR)
+        for name in ("rms_mean", "zcr", "pitch_mean", "silence_ratio"):
+            assert record[name] == pytest.approx(serial[name], rel=1e-5), name
+        np.testing.assert_allclose(record["mfccs_mean"], serial["mfccs_mean"], rtol=1e-4, atol=1e-4)
+
+
+def test_short_trailing_chunk_is_skipped(pool):
+    table = parallel_processing.extract_features_parallel(_clip(2.05), SR, chunk_duration=1, workers=pool,
+                                                          f0_backend=BACKEND)
+    assert [r["chunk_index"] for r in table.to_records()] == [0, 1]
+
+
+def test_regions_replace_the_grid(pool):
+    y = _clip(3.0)
+    regions = (np.array([0, SR, 2 * SR]), np.array([SR // 2, SR + 800, 3 * SR]))
+    table = parallel_processing.extract_features_parallel(y, SR, workers=pool, f0_backend=BACKEND, regions=regions)
+    records = table.to_records()
+    # The 50 ms region is below MIN_CHUNK_SECONDS
+    assert [r["chunk_index"] for r in records] == [0, 2]
+    assert [r["end_time"] for r in records] == [pytest.approx(0.5), pytest.approx(3.0)]
+
+
+def test_empty_clip():
+    assert len(parallel_processing.extract_features_parallel(np.zeros(0), SR)) == 0
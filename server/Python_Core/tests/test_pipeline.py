@@ -0,0 +1,96 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from speech_analysis.utils.pipeline import Stage, resolve_stages, run_pipeline
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        yield pool
+
+
+def _graph(calls):
+    """audio -> (transcription, features) -> scoring; pitch only needs audio."""
+    def stage(name, fn, deps=()):
+        def run(*args):
+            calls.append(name)
+            return fn(*args)
+        return Stage(name, run, deps)
+
+    return [
+        stage("audio", lambda: 2),
+        stage("transcription", lambda a: a * 10, ["audio"]),
+        stage("features", lambda a: a + 1, ["audio"]),
+        stage("pitch", lambda a: -a, ["audio"]),
+        stage("scoring", lambda t, f: (t, f), ["transcription", "features"]),
+    ]
+
+
+def test_results_are_passed_in_deps_order(executor):
+    calls = []
+    results = run_pipeline(_graph(calls), executor=executor)
+    assert results == {"audio": 2, "transcription": 20, "features": 3, "pitch": -2, "scoring": (20, 3)}
+    assert calls[0] == "audio" and calls[-1] in ("scoring", "pitch")
+
+
+def test_timings_cover_every_stage(executor):
+    timings = {}
+    run_pipeline(_graph([]), executor=executor, timings=timings)
+    assert set(timings) == {"audio", "transcription", "features", "pitch", "scoring"}
+
+
+def test_targets_run_only_their_dependencies(executor):
+    calls = []
+    timings = {}
+    results = run_pipeline(_graph(calls), executor=executor, targets=["features"], timings=timings)
+    assert results == {"audio": 2, "features": 3}
+    assert sorted(calls) == ["audio", "features"]
+    assert set(timings) == {"audio", "features"}
+
+
+def test_resolve_stages_keeps_declaration_order():
+    names = [s.name for s in resolve_stages(_graph([]), ["scoring"])]
+    assert names == ["audio", "transcription", "features", "scoring"]
+
+
+def test_independent_stages_overlap(executor):
+    barrier = threading.Barrier(2, timeout=5)
+    stages = [Stage("a", barrier.wait), Stage("b", barrier.wait), Stage("c", lambda a, b: "both ran", ["a", "b"])]
+    # Would time out if "a" and "b" were run one after the other
+    assert run_pipeline(stages, executor=executor)["c"] == "both ran"
+
+
+def test_on_result_sees_each_stage_as_it_finishes(executor):
+    seen = []
+    run_pipeline(_graph([]), executor=executor, targets=["scoring"],
+                 on_result=lambda name, result, results: seen.append((name, name in results)))
+    assert [name for name, _ in seen][0] == "audio"
+    assert seen[-1] == ("scoring", True)
+    assert len(seen) == 4
+
+
+def test_failed_stage_stops_its_dependents(executor):
+    calls = []
+
+    def fail(a):
+        raise RuntimeError("decode failed")
+
+    stages = _graph(calls)
+    stages[1] = Stage("transcription", fail, ["audio"])
+    with pytest.raises(RuntimeError, match="decode failed"):
+        run_pipeline(stages, executor=executor)
+    assert "scoring" not in calls
+
+
+@pytest.mark.parametrize("stages, targets, message", [
+    ([Stage("a", int), Stage("a", int)], None, "Duplicate stage"),
+    ([Stage("a", int, ["missing"])], None, "unknown stages"),
+    ([Stage("a", int)], ["b"], "Unknown target"),
+    ([Stage("a", int, ["b"]), Stage("b", int, ["a"])], None, "Dependency cycle"),
+])
+def test_invalid_graphs_are_rejected(executor, stages, targets, message):
+    with pytest.raises(ValueError, match=message):
+        run_pipeline(stages, executor=executor, targets=targets)
@@ -0,0 +1,45 @@
+import base64
+
+import numpy as np
+import pytest
+
+from speech_analysis.services import pitch_service
+from speech_analysis.utils.feature_table import ChunkFeatureTable
+
+
+def _decode(contour):
+    return np.frombuffer(base64.b64decode(contour["f0"]), dtype="<f2").astype(np.float64)
+
+
+def _table(times, f0):
+    table = ChunkFeatureTable(np.zeros(0), {})
+    table.f0_track = (np.asarray(times, dtype=np.float32), np.asarray(f0, dtype=np.float32))
+    return table
+
+
+def test_contour_averages_voiced_frames_per_bin():
+    # 4 s of frames every 0.5 s: two frames per bin at 4 points
+    times = np.arange(9) * 0.5
+    f0 = [100, 120, np.nan, np.nan, 200, np.nan, 150, 170, 300]
+    contour = pitch_service.pitch_contour(_table(times, f0), points=4)
+    assert contour["points"] == 4
+    assert contour["duration"] == 4.0 and contour["step"] == 1.0
+    values = _decode(contour)
+    np.testing.assert_allclose(values[[0, 2]], [110.0, 200.0])
+    assert np.isnan(values[1])
+    # The frame centred on the clip end falls in the last bin
+    assert values[3] == pytest.approx((150 + 170 + 300) / 3, rel=1e-3)
+    assert contour["voiced_ratio"] == 0.75
+
+
+def test_contour_points_are_capped():
+    times = np.linspace(0, 10, 20000)
+    contour = pitch_service.pitch_contour(_table(times, np.full(20000, 120.0)), points=10 ** 6)
+    assert contour["points"] == pitch_service.MAX_CONTOUR_POINTS
+    assert len(_decode(contour)) == pitch_service.MAX_CONTOUR_POINTS
+
+
+def test_no_contour_without_a_track():
+    assert pitch_service.pitch_contour(ChunkFeatureTable(np.zeros(0), {})) is None
+    assert pitch_service.pitch_contour(_table([0.0, 0.5], [100, 100]), points=0) is None
+    assert pitch_service.pitch_contour(_table([0.0], [100]), points=10) is None
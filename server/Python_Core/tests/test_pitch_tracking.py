@@ -0,0 +1,55 @@
+import importlib
+
+import numpy as np
+import pytest
+
+pytest.importorskip("librosa")
+
+from speech_analysis.utils import pitch_tracking
+
+SR = 16000
+
+
+def _tone(f0, seconds=1.0):
+    t = np.arange(int(seconds * SR)) / SR
+    return sum(np.sin(2 * np.pi * f0 * k * t) / k for k in range(1, 6)).astype(np.float32) * 0.3
+
+
+@pytest.mark.parametrize("backend", sorted(pitch_tracking.F0_BACKENDS))
+@pytest.mark.parametrize("f0", [110.0, 220.0])
+def test_backends_track_a_steady_tone(backend, f0):
+    y = np.concatenate([np.zeros(SR // 2, dtype=np.float32), _tone(f0)])
+    track, voiced = pitch_tracking.track_f0(y, SR, backend=backend)
+    # Frames on the audio_utils grid: one per hop, centred
+    assert len(track) == len(voiced) == 1 + len(y) // 512
+    assert not voiced[:8].any()
+    assert np.all(np.isnan(track[~voiced]))
+    inner = voiced.copy()
+    inner[:int(0.6 * SR) // 512] = False
+    assert np.count_nonzero(inner) > 15
+    assert np.median(track[inner]) == pytest.approx(f0, rel=0.03)
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError, match="Unknown F0 backend"):
+        pitch_tracking.track_f0(np.zeros(SR, dtype=np.float32), SR, backend="crepe")
+
+
+def test_unknown_default_backend_falls_back_at_import(monkeypatch, capsys):
+    monkeypatch.setenv("F0_BACKEND", "crepe")
+    try:
+        assert importlib.reload(pitch_tracking).F0_BACKEND == "pyin"
+        assert "Unknown F0_BACKEND 'crepe'" in capsys.readouterr().out
+    finally:
+        monkeypatch.delenv("F0_BACKEND")
+        importlib.reload(pitch_tracking)
+
+
+def test_pitch_stats_needs_enough_voiced_frames():
+    f0 = np.array([100.0, 200.0, np.nan] + [150.0] * (pitch_tracking.MIN_VOICED_FRAMES - 2))
+    voiced = np.isfinite(f0)
+    stats = pitch_tracking.pitch_stats(f0, voiced)
+    assert stats["pitch_max"] == 200.0 and stats["pitch_min"] == 100.0
+    assert stats["pitch_range"] == 100.0
+    voiced[0] = False
+    assert pitch_tracking.pitch_stats(f0, voiced) is None
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from speech_analysis.services import prompt_match_service as pm
+
+
+def _reference_matrix(ref, hyp):
+    """Textbook O(n*m) Levenshtein DP over Python lists."""
+    D = [[j for j in range(len(hyp) + 1)]]
+    for i in range(1, len(ref) + 1):
+        row = [i]
+        for j in range(1, len(hyp) + 1):
+            row.append(min(D[i - 1][j] + 1, row[j - 1] + 1, D[i - 1][j - 1] + (ref[i - 1] != hyp[j - 1])))
+        D.append(row)
+    return np.array(D)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_vectorised_matrix_matches_textbook_dp(seed):
+    rng = np.random.default_rng(seed)
+    ref = rng.integers(0, 5, rng.integers(0, 15)).astype(np.int32)
+    hyp = rng.integers(0, 5, rng.integers(0, 15)).astype(np.int32)
+    np.testing.assert_array_equal(pm.edit_distance_matrix(ref, hyp), _reference_matrix(list(ref), list(hyp)))
+
+
+def test_insertion_chain_runs_left_to_right():
+    # Every spoken word after the first is an insertion, which only the accumulate step can chain
+    D = pm.edit_distance_matrix(np.array([0], dtype=np.int32), np.array([0, 1, 2, 3], dtype=np.int32))
+    np.testing.assert_array_equal(D[1], [1, 0, 1, 2, 3])
+
+
+def test_alignment_reports_each_operation():
+    result = pm.match_prompt("The quick red fox jumps high", "the quick brown fox jumps")
+    assert result["distance"] == 2
+    assert [op["op"] for op in result["diff"]] == ["match", "match", "substitution", "match", "match", "extra"]
+    assert result["diff"][2] == {"op": "substitution", "expected": "brown", "spoken": "red"}
+    assert result["alignment_ratio"] == pytest.approx(1 - 2 / 6, abs=1e-4)
+    assert result["keywords_missed"] == ["brown"]
+    assert result["keyword_coverage"] == 0.75
+    assert result["ratio"] == pytest.approx(
+        pm.ALIGNMENT_WEIGHT * result["alignment_ratio"] + pm.KEYWORD_WEIGHT * 0.75, abs=1e-4)
+
+
+def test_missing_words_and_empty_transcript():
+    result = pm.match_prompt("", "Tell me about yourself")
+    assert result["distance"] == 4
+    assert all(op["op"] == "missing" for op in result["diff"])
+    assert result["ratio"] == 0.0
+    assert pm.match_prompt("anything", "") is None
+
+
+def test_tokenize_normalizes_case_and_apostrophes():
+    assert pm.tokenize("I’m READY, aren't you?") == ["i'm", "ready", "aren't", "you"]
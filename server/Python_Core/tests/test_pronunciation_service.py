@@ -0,0 +1,54 @@
+import pytest
+
+pytest.importorskip("nltk")
+pytest.importorskip("phonetics")
+
+from speech_analysis.services import pronunciation_service as ps
+
+
+def _transcription(*words, text=""):
+    # Empty text: only the word timestamps are read, no tokenizer needed
+    return {"text": text, "segments": [{"words": [
+        {"word": f" {w}", "start": i * 0.5, "end": i * 0.5 + 0.4, "probability": p} for i, (w, p) in enumerate(words)
+    ]}]}
+
+
+@pytest.fixture
+def small_vocabulary(monkeypatch):
+    monkeypatch.setattr(ps, "vocabulary", lambda: ({"hello", "world"}, {}))
+
+
+def test_confidence_mode_flags_low_probability_words():
+    result = ps.assess_pronunciation_from_confidence(_transcription(("hello", 0.9), ("wrld", 0.2)),
+                                                     min_probability=0.5)
+    assert result["mode"] == "confidence"
+    assert [r["correct"] for r in result["results"]] == [True, False]
+    assert result["score_percent"] == 50.0
+    assert result["mean_probability"] == pytest.approx(0.55)
+    assert result["low_confidence_words"] == [{"word": "wrld", "start": 0.5, "end": 0.9, "probability": 0.2}]
+
+
+def test_confidence_mode_needs_word_probabilities():
+    assert ps.assess_pronunciation_from_confidence({"text": "", "segments": []}) is None
+
+
+def test_threshold_follows_the_transcription_tier(monkeypatch):
+    monkeypatch.setitem(ps.PRONUNCIATION_TIERS, "fast", {"mode": "confidence", "min_probability": 0.3})
+    monkeypatch.setitem(ps.PRONUNCIATION_TIERS, "accurate", {"mode": "confidence", "min_probability": 0.5})
+    transcription = _transcription(("hello", 0.9), ("world", 0.4))
+    assert ps.assess_pronunciation_from_transcription(transcription, tier="accurate")["score_percent"] == 50.0
+    assert ps.assess_pronunciation_from_transcription(transcription, tier="fast")["score_percent"] == 100.0
+    # Unknown tiers use the accurate settings
+    assert ps.assess_pronunciation_from_transcription(transcription, tier="custom")["score_percent"] == 50.0
+
+
+def test_fast_tier_defaults_to_vocabulary_mode():
+    assert ps.pronunciation_settings("fast")["mode"] == "vocabulary"
+
+
+def test_vocabulary_mode_checks_the_dictionary(small_vocabulary, punkt):
+    result = ps.assess_pronunciation_from_transcription(
+        _transcription(("hello", 0.1), ("world", 0.1), text="Hello, world!"), mode="vocabulary"
+    )
+    assert result["mode"] == "vocabulary"
+    assert result["score_percent"] == 100.0
@@ -0,0 +1,100 @@
+import os
+
+import numpy as np
+import pytest
+
+from speech_analysis.utils import result_cache
+from speech_analysis.utils.result_cache import ResultCache, content_key
+
+
+class _Unserializable:
+    def __str__(self):
+        raise TypeError("cannot encode")
+
+
+def _disk_files(root, suffix):
+    return [name for _, _, files in os.walk(root) for name in files if name.endswith(suffix)]
+
+
+def test_content_key_depends_on_audio_and_params():
+    audio = np.linspace(-1, 1, 1000, dtype=np.float32)
+    key = content_key([audio], {"model": "base.en", "tier": "fast"})
+    assert key == content_key([audio[:500], audio[500:]], {"tier": "fast", "model": "base.en"})
+    assert key != content_key([audio], {"model": "base.en", "tier": "accurate"})
+    assert key != content_key([audio[::-1]], {"model": "base.en", "tier": "fast"})
+    # float64 input hashes like its float32 PCM
+    assert key == content_key([audio.astype(np.float64)], {"model": "base.en", "tier": "fast"})
+
+
+def test_file_blocks_hash_like_the_whole_file(tmp_path):
+    path = tmp_path / "clip.wav"
+    data = os.urandom(10_000)
+    path.write_bytes(data)
+    assert b"".join(result_cache.file_blocks(str(path), block_size=4096)) == data
+    assert content_key(result_cache.file_blocks(str(path), block_size=333), {}) == content_key([data], {})
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = ResultCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1   # "b" is now the oldest
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+
+def test_disabled_memory_tier_stores_nothing():
+    cache = ResultCache(max_entries=0)
+    cache.put("a", 1)
+    assert cache.get("a") is None
+
+
+def test_disk_tier_round_trip_and_atomic_writes(tmp_path):
+    key = "ab" + "0" * 62
+    value = {"score": np.float32(0.5), "chunks": np.arange(3)}
+    ResultCache(max_entries=0, disk_dir=str(tmp_path)).put(key, value)
+    assert os.path.exists(tmp_path / "ab" / f"{key}.json")
+    assert _disk_files(tmp_path, ".tmp") == []
+
+    # A fresh instance (another worker) reads the entry back and keeps it in memory
+    other = ResultCache(max_entries=4, disk_dir=str(tmp_path))
+    assert other.get(key) == {"score": 0.5, "chunks": [0, 1, 2]}
+    os.remove(tmp_path / "ab" / f"{key}.json")
+    assert other.get(key) == {"score": 0.5, "chunks": [0, 1, 2]}
+
+
+def test_failed_write_leaves_no_partial_entry(tmp_path):
+    cache = ResultCache(max_entries=0, disk_dir=str(tmp_path))
+    key = "cd" + "0" * 62
+    with pytest.raises(TypeError):
+        cache.put(key, {"bad": _Unserializable()})
+    assert _disk_files(tmp_path, ".json") == [] and _disk_files(tmp_path, ".tmp") == []
+
+
+def test_corrupt_entry_is_a_miss(tmp_path):
+    key = "ef" + "0" * 62
+    os.makedirs(tmp_path / "ef")
+    (tmp_path / "ef" / f"{key}.json").write_text("{truncated")
+    assert ResultCache(disk_dir=str(tmp_path)).get(key) is None
+
+
+def test_prune_disk_keeps_the_most_recently_used(tmp_path):
+    cache = ResultCache(max_entries=0, disk_dir=str(tmp_path), max_disk_entries=2)
+    keys = [f"{i:02d}" + "0" * 62 for i in range(4)]
+    for age, key in enumerate(keys):
+        cache.put(key, age)
+        path = cache._path(key)
+        os.utime(path, (1000 + age, 1000 + age))
+    cache.get(keys[0])   # refreshes its mtime
+    cache.prune_disk()
+    assert sorted(_disk_files(tmp_path, ".json")) == sorted([f"{keys[0]}.json", f"{keys[3]}.json"])
+
+
+def test_cache_dir_lives_outside_the_source_tree(monkeypatch, tmp_path):
+    monkeypatch.setenv("SPEECH_CACHE_DIR", str(tmp_path))
+    assert result_cache.cache_dir("results") == os.path.join(str(tmp_path), "results")
+    monkeypatch.delenv("SPEECH_CACHE_DIR")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+    assert result_cache.cache_dir("transcripts") == os.path.join(str(tmp_path / "xdg"), "expressly", "speech",
+                                                                 "transcripts")
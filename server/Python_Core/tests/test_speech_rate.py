@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("librosa")
+pytest.importorskip("scipy")
+
+from speech_analysis.utils.feature_table import ChunkFeatureTable
+from speech_analysis.utils.speech_rate import (SYLLABLES_PER_WORD, estimate_speech_rate, pacing_score_from_rate,
+                                               syllable_nuclei)
+
+SR = 16000
+HOP = 512
+
+
+def _syllable_train(rate_hz, seconds=6.0):
+    """Voiced tone whose loudness rises and falls `rate_hz` times per second."""
+    t = np.arange(int(seconds * SR)) / SR
+    carrier = sum(np.sin(2 * np.pi * 150 * k * t) / k for k in range(1, 6))
+    envelope = 0.5 * (1 - np.cos(2 * np.pi * rate_hz * t))
+    return (0.3 * carrier * envelope).astype(np.float32)
+
+
+@pytest.mark.parametrize("rate_hz", [3.0, 5.0])
+def test_nuclei_count_syllable_peaks(rate_hz):
+    nuclei = syllable_nuclei(_syllable_train(rate_hz), SR, HOP)
+    assert abs(int(nuclei.sum()) - rate_hz * 6) <= 1
+
+
+def test_unvoiced_peaks_are_dropped():
+    y = _syllable_train(4.0)
+    voiced = np.zeros(len(syllable_nuclei(y, SR, HOP)), dtype=bool)
+    assert not syllable_nuclei(y, SR, HOP, voiced=voiced).any()
+
+
+def test_silence_has_no_nuclei():
+    assert not syllable_nuclei(np.zeros(SR, dtype=np.float32), SR, HOP).any()
+
+
+def test_pacing_score_from_rate():
+    assert pacing_score_from_rate(40) == 30.0
+    assert pacing_score_from_rate(120) == 100
+    assert pacing_score_from_rate(230) == 60.0
+    assert pacing_score_from_rate(1000) == 0
+
+
+def test_clip_rate_weights_chunks_by_duration():
+    table = ChunkFeatureTable([0, 1], {"duration": [5.0, 2.5], "tempo": [240.0, 120.0]})
+    rate = estimate_speech_rate(table)
+    # 20 + 5 syllables over 7.5 s
+    assert rate["syllables"] == 25
+    assert rate["syllables_per_minute"] == 200.0
+    assert rate["estimated_wpm"] == round(200.0 / SYLLABLES_PER_WORD, 2)
+    assert rate["pacing_score"] == 100
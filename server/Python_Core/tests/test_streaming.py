@@ -0,0 +1,70 @@
+import os
+
+import numpy as np
+import pytest
+
+sf = pytest.importorskip("soundfile")
+pytest.importorskip("soxr")
+pytest.importorskip("librosa")
+
+from speech_analysis.utils import streaming
+from speech_analysis.utils.result_cache import content_key, file_blocks
+
+SR = 16000
+
+
+def _voiced_wav(tmp_path, seconds=12.0):
+    t = np.arange(int(seconds * SR)) / SR
+    y = sum(np.sin(2 * np.pi * 140 * k * t) / k for k in range(1, 6)) * 0.2
+    y *= (np.sin(2 * np.pi * 0.5 * t) > -0.3)  # speech bursts with pauses
+    y = (y + 0.01 * np.random.default_rng(0).standard_normal(len(t))).astype(np.float32)
+    path = tmp_path / "recording.wav"
+    sf.write(path, y, SR)
+    return str(path), y
+
+
+def test_blocks_have_fixed_length(tmp_path):
+    path, y = _voiced_wav(tmp_path, seconds=7.5)
+    blocks = list(streaming.iter_audio_blocks(path, sr=SR, block_duration=2))
+    assert [len(b) for b in blocks] == [2 * SR, 2 * SR, 2 * SR, int(1.5 * SR)]
+    np.testing.assert_allclose(np.concatenate(blocks), y, atol=1e-4)  # 16-bit PCM
+
+
+def test_chunks_are_on_the_recording_timeline(tmp_path):
+    path, _ = _voiced_wav(tmp_path)
+    blocks = list(streaming.stream_chunk_features(path, sr=SR, chunk_duration=2, block_duration=4))
+    assert [b["block_index"] for b in blocks] == [0, 1, 2]
+    assert [b["start_time"] for b in blocks] == [0.0, 4.0, 8.0]
+    starts = np.concatenate([b["chunks"].get("start_time") for b in blocks])
+    indexes = np.concatenate([b["chunks"].get("chunk_index") for b in blocks])
+    np.testing.assert_allclose(starts, np.arange(0, 12, 2))
+    np.testing.assert_array_equal(indexes, np.arange(6))
+
+
+def test_processed_wav_is_only_written_when_requested(tmp_path):
+    path, y = _voiced_wav(tmp_path, seconds=8.0)
+    output = tmp_path / "clean.wav"
+    list(streaming.stream_chunk_features(path, sr=SR, chunk_duration=2, block_duration=4, output_path=str(output)))
+    assert sf.info(str(output)).frames == len(y)
+
+    before = set(os.listdir(tmp_path))
+    list(streaming.stream_chunk_features(path, sr=SR, chunk_duration=2, block_duration=4, output_path=None))
+    assert set(os.listdir(tmp_path)) == before
+
+
+def test_denoised_wav_matches_the_streamed_one(tmp_path):
+    # Cached streaming requests rewrite the processed WAV without analysing the blocks again
+    path, _ = _voiced_wav(tmp_path, seconds=8.0)
+    streamed, written = tmp_path / "streamed.wav", tmp_path / "written.wav"
+    list(streaming.stream_chunk_features(path, sr=SR, chunk_duration=2, block_duration=4, output_path=str(streamed)))
+    streaming.write_denoised_wav(path, str(written), sr=SR, block_duration=4)
+    np.testing.assert_array_equal(sf.read(str(written))[0], sf.read(str(streamed))[0])
+
+
+def test_upload_key_hashes_raw_bytes_incrementally(tmp_path):
+    path, _ = _voiced_wav(tmp_path, seconds=3.0)
+    with open(path, "rb") as f:
+        whole = f.read()
+    assert len(list(file_blocks(path, block_size=4096))) > 1
+    assert content_key(file_blocks(path, block_size=4096), {"p": 1}) == content_key([whole], {"p": 1})
+    assert content_key(file_blocks(path), {"p": 1}) != content_key(file_blocks(path), {"p": 2})
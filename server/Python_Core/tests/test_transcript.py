@@ -0,0 +1,73 @@
+import pytest
+
+pytest.importorskip("nltk")
+
+from speech_analysis.utils import transcript
+
+
+def _words(*tokens):
+    """Word index with one token per 0.5 s."""
+    return [{"word": w, "start": i * 0.5, "end": i * 0.5 + 0.4, "probability": 0.9} for i, w in enumerate(tokens)]
+
+
+def test_word_index_normalizes_whisper_tokens():
+    segments = [{"words": [{"word": " Well,", "start": 0.0, "end": 0.3, "probability": 0.8},
+                           {"word": " ...", "start": 0.3, "end": 0.4, "probability": 0.1},
+                           {"word": " don't", "start": 0.5, "end": 0.8, "probability": 0.9}]},
+                {"text": "no words"}]
+    index = transcript.build_word_index(segments)
+    assert [w["word"] for w in index] == ["well", "don't"]
+    assert index[1] == {"word": "don't", "start": 0.5, "end": 0.8, "probability": 0.9}
+
+
+def test_multi_word_fillers_win_over_single_words():
+    words = _words("so", "you", "know", "i", "like", "it", "you", "said")
+    spans, next_start = transcript.filler_spans(words)
+    assert spans == [(0, 1), (1, 2), (4, 1)]
+    assert next_start == len(words)
+    fillers, _ = transcript.scan_fillers(words)
+    assert fillers[1] == {"word": "you know", "start": 0.5, "end": 1.4}
+
+
+def test_incremental_scan_waits_for_words_that_could_extend_a_filler():
+    words = _words("um", "i", "think", "you")
+    spans, next_start = transcript.filler_spans(words, final=False)
+    # "you" may still become "you know": it is left for the next scan
+    assert spans == [(0, 1)]
+    assert next_start == 3
+
+    words = _words("um", "i", "think", "you", "know", "it")
+    spans, next_start = transcript.filler_spans(words, start=next_start, final=False)
+    assert spans == [(3, 2)]
+    assert next_start == 5
+
+
+def test_incremental_scan_matches_a_full_scan():
+    tokens = "well i um you know think like so you know basically it right".split()
+    words = _words(*tokens)
+    spans, start = [], 0
+    for n in range(1, len(words) + 1):
+        found, start = transcript.filler_spans(words[:n], start=start, final=False)
+        spans.extend(found)
+    found, _ = transcript.filler_spans(words, start=start)
+    spans.extend(found)
+    assert spans == transcript.filler_spans(words)[0]
+
+
+def test_sentence_spans_skip_empty_sentences():
+    text = "  Hello there.  How are you?! Fine"
+    spans = transcript.sentence_spans(text)
+    assert [text[a:b] for a, b in spans] == ["Hello there", "How are you", "Fine"]
+    assert transcript.sentence_spans("...") == []
+
+
+def test_document_tokenizes_once(punkt):
+    doc = transcript.TranscriptDocument("Um, I think so.", [{"words": [
+        {"word": " Um,", "start": 0.0, "end": 0.3, "probability": 0.5},
+        {"word": " I", "start": 0.4, "end": 0.5, "probability": 0.9},
+        {"word": " think", "start": 0.5, "end": 0.8, "probability": 0.9},
+        {"word": " so.", "start": 0.8, "end": 1.0, "probability": 0.9}]}])
+    assert doc.spoken_words == ["um", "i", "think", "so"]
+    assert doc.sentences == ["Um, I think so"]
+    assert [f["word"] for f in doc.fillers] == ["um", "so"]
+    assert transcript.as_document(doc) is doc
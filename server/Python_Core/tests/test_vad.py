@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("librosa")
+
+from speech_analysis.utils import vad
+
+SR = 16000
+
+
+def _voiced(seconds, f0=150.0):
+    t = np.arange(int(seconds * SR)) / SR
+    return sum(np.sin(2 * np.pi * f0 * k * t) / k for k in range(1, 8)).astype(np.float32) * 0.2
+
+
+def _clip(layout, seed=0):
+    """Concatenate ("speech"|"silence", seconds) parts over a faint noise floor."""
+    parts = [_voiced(s) if kind == "speech" else np.zeros(int(s * SR), dtype=np.float32) for kind, s in layout]
+    y = np.concatenate(parts)
+    return y + 1e-3 * np.random.default_rng(seed).standard_normal(len(y)).astype(np.float32)
+
+
+def test_regions_follow_speech_bursts():
+    y = _clip([("silence", 1.0), ("speech", 1.5), ("silence", 1.0), ("speech", 1.0), ("silence", 1.0)])
+    starts, ends = vad.speech_regions(y, SR)
+    assert len(starts) == 2
+    np.testing.assert_allclose(starts / SR, [1.0 - vad.PAD_SECONDS, 3.5 - vad.PAD_SECONDS], atol=0.05)
+    np.testing.assert_allclose(ends / SR, [2.5 + vad.PAD_SECONDS, 4.5 + vad.PAD_SECONDS], atol=0.05)
+
+
+def test_short_pauses_are_merged_and_blips_dropped():
+    y = _clip([("silence", 1.0), ("speech", 1.0), ("silence", 0.1), ("speech", 1.0),
+               ("silence", 1.0), ("speech", 0.05), ("silence", 1.0)])
+    starts, ends = vad.speech_regions(y, SR)
+    assert len(starts) == 1
+    assert ends[0] / SR == pytest.approx(3.1 + vad.PAD_SECONDS, abs=0.05)
+
+
+def test_long_regions_are_split_evenly():
+    y = _clip([("silence", 0.5), ("speech", 7.0), ("silence", 0.5)])
+    starts, ends = vad.speech_regions(y, SR, max_region_seconds=2.0)
+    lengths = ends - starts
+    assert len(starts) == 4
+    assert np.all(lengths <= 2 * SR)
+    assert lengths.max() - lengths.min() <= 1
+    np.testing.assert_array_equal(starts[1:], ends[:-1])
+
+
+def test_silence_has_no_regions():
+    starts, ends = vad.speech_regions(np.zeros(SR, dtype=np.float32), SR)
+    assert len(starts) == 0 and len(ends) == 0
+
+
+def test_summary_and_whisper_clips():
+    starts, ends = np.array([16000, 48000, 96000]), np.array([32000, 64000, 112000])
+    summary = vad.summarize_regions(starts, ends, 128000, SR)
+    assert summary == {"speech_regions": 3, "speech_seconds": 3.0, "silence_seconds": 5.0, "longest_silence": 2.0}
+    # The 1 s gap is joined, the 2 s gap is kept
+    assert vad.whisper_clips(starts, ends, SR, min_gap_seconds=1.5) == [1.0, 4.0, 6.0, 7.0]
+    assert vad.whisper_clips(np.zeros(0), np.zeros(0), SR) is None
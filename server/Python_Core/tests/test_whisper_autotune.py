@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+from speech_analysis.services.whisper_autotune import load_tuning, threads_per_replica, word_error_rate
+
+TUNINGS = {
+    "base.en": {"compute_type": "int8", "compute_types": {"int8": {"cpu_threads": 4}, "float32": {"cpu_threads": 8}}},
+    "tiny.en": {"compute_type": "float32", "compute_types": {"float32": {"cpu_threads": 2}}},
+}
+
+
+def test_tuned_threads_are_kept_for_a_single_replica():
+    assert threads_per_replica(6, replicas=1, cores=8) == 6
+
+
+def test_tuned_threads_are_capped_per_replica():
+    assert threads_per_replica(8, replicas=2, cores=8) == 4
+    assert threads_per_replica(2, replicas=2, cores=8) == 2
+    assert threads_per_replica(8, replicas=16, cores=8) == 1
+
+
+def test_untuned_threads_stay_automatic():
+    assert threads_per_replica(0, replicas=4, cores=8) == 0
+
+
+def test_word_error_rate():
+    assert word_error_rate("the cat sat", "the cat sat") == 0.0
+    assert word_error_rate("the cat sat", "the bat sat down") == 2 / 3
+    assert word_error_rate("", "") == 0.0
+
+
+def test_tuning_is_keyed_by_model_and_compute_type(tmp_path):
+    path = tmp_path / "tuning.json"
+    path.write_text(json.dumps(TUNINGS), encoding="utf-8")
+    assert load_tuning("base.en", path=str(path)) == {"compute_type": "int8", "cpu_threads": 4}
+    assert load_tuning("base.en", "float32", path=str(path)) == {"compute_type": "float32", "cpu_threads": 8}
+    assert load_tuning("tiny.en", path=str(path)) == {"compute_type": "float32", "cpu_threads": 2}
+    # Not tuned: the model or compute type falls back to the defaults
+    assert load_tuning("tiny.en", "int8", path=str(path)) is None
+    assert load_tuning("small.en", path=str(path)) is None
+
+
+@pytest.mark.parametrize("content", ["", "{not json", "[1, 2]", '{"base.en": 3}',
+                                     '{"base.en": {"compute_type": "int8", "compute_types": []}}',
+                                     '{"base.en": {"compute_type": "int8", "compute_types": {"int8": {}}}}'])
+def test_malformed_tuning_falls_back_to_defaults(tmp_path, content):
+    path = tmp_path / "tuning.json"
+    path.write_text(content, encoding="utf-8")
+    assert load_tuning("base.en", path=str(path)) is None
+    assert load_tuning("base.en", path=str(tmp_path / "missing.json")) is None
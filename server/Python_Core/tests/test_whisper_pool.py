@@ -0,0 +1,161 @@
+import sys
+import threading
+import time
+import types
+
+import numpy as np
+import pytest
+
+from speech_analysis.services.whisper_pool import TranscriptionBusy, WhisperPool, split_batched_result
+
+
+class _Segment:
+    def __init__(self, text, start, end):
+        self.text, self.start, self.end, self.words = text, start, end, []
+
+
+class _BlockingModel:
+    """WhisperModel stand-in whose decode waits until the test releases it."""
+    release = None
+    started = None
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def transcribe(self, audio, **options):
+        _BlockingModel.started.set()
+        _BlockingModel.release.wait(5)
+        return [_Segment(" hello", 0.0, 1.0)], None
+
+
+class _Word:
+    def __init__(self, word, start, end):
+        self.word, self.start, self.end, self.probability = word, start, end, 0.9
+
+
+class _SpeechModel:
+    """WhisperModel stand-in that emits one word per non-silent run of samples."""
+    calls = None
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def transcribe(self, audio, **options):
+        _SpeechModel.calls.append(options)
+        voiced = np.concatenate([[0], (np.asarray(audio) != 0).astype(np.int8), [0]])
+        edges = np.flatnonzero(np.diff(voiced))
+        segment = _Segment("", 0.0, len(audio) / 16000)
+        for i, (start, end) in enumerate(zip(edges[::2], edges[1::2])):
+            segment.words.append(_Word(f" w{i}", start / 16000, end / 16000))
+        segment.text = "".join(w.word for w in segment.words)
+        return [segment], None
+
+
+@pytest.fixture
+def pool_factory(monkeypatch):
+    monkeypatch.setitem(sys.modules, "faster_whisper", types.SimpleNamespace(WhisperModel=_BlockingModel))
+    _BlockingModel.release = threading.Event()
+    _BlockingModel.started = threading.Event()
+    yield lambda **kwargs: WhisperPool("tiny.en", **kwargs)
+    _BlockingModel.release.set()
+
+
+@pytest.fixture
+def batching_pool(monkeypatch):
+    monkeypatch.setitem(sys.modules, "faster_whisper", types.SimpleNamespace(WhisperModel=_SpeechModel))
+    _SpeechModel.calls = []
+    return WhisperPool("tiny.en", replicas=1, cpu_threads=1, batch_max=4, batch_window_ms=300)
+
+
+def test_over_limit_request_fails_fast(pool_factory):
+    pool = pool_factory(replicas=1, queue_size=0, cpu_threads=1)
+    busy = threading.Thread(target=pool.transcribe, args=(np.zeros(16000, dtype=np.float32),))
+    busy.start()
+    assert _BlockingModel.started.wait(5)
+
+    started = time.perf_counter()
+    with pytest.raises(TranscriptionBusy):
+        pool.transcribe(np.zeros(16000, dtype=np.float32))
+    assert time.perf_counter() - started < 0.5
+
+    _BlockingModel.release.set()
+    busy.join(5)
+    assert pool.transcribe(np.zeros(16000, dtype=np.float32))["text"] == "hello"
+
+
+def test_queued_request_waits_for_a_replica(pool_factory):
+    pool = pool_factory(replicas=1, queue_size=1, cpu_threads=1)
+    results = []
+    first = threading.Thread(target=lambda: results.append(pool.transcribe(np.zeros(160, dtype=np.float32))))
+    first.start()
+    assert _BlockingModel.started.wait(5)
+    second = threading.Thread(target=lambda: results.append(pool.transcribe(np.zeros(160, dtype=np.float32))))
+    second.start()
+    time.sleep(0.05)
+    _BlockingModel.release.set()
+    first.join(5)
+    second.join(5)
+    assert [r["text"] for r in results] == ["hello", "hello"]
+
+
+def test_batch_queue_is_bounded_by_slots(pool_factory):
+    pool = pool_factory(replicas=1, queue_size=2, cpu_threads=1, batch_max=4)
+    assert pool._batch_queue.maxsize == 3
+
+
+def test_short_clips_share_one_decode(batching_pool):
+    clips = [np.ones(8000, dtype=np.float32), np.ones(4000, dtype=np.float32)]
+    results = [None, None]
+
+    def run(i):
+        results[i] = batching_pool.transcribe_batched(clips[i], keep_words=True, language="en")
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+    assert len(_SpeechModel.calls) == 1
+    assert _SpeechModel.calls[0]["word_timestamps"] is True
+    # Each clip gets back its own word, on its own timeline
+    assert sorted(r["text"] for r in results) == ["w0", "w1"]
+    for clip, result in zip(clips, results):
+        word = result["segments"][0]["words"][0]
+        assert word["start"] == pytest.approx(0.0)
+        assert word["end"] == pytest.approx(len(clip) / 16000)
+
+
+def test_vad_clip_timestamps_are_shifted_into_the_batch(batching_pool):
+    # VAD speech spans (vad.whisper_clips): the second half of the first clip, all of the second
+    first = np.concatenate([np.zeros(8000, dtype=np.float32), np.ones(8000, dtype=np.float32)])
+    second = np.ones(8000, dtype=np.float32)
+    requests = [(first, [0.5, 1.0]), (second, [0.0, 0.5])]
+    results = [None, None]
+
+    def run(i):
+        audio, clips = requests[i]
+        results[i] = batching_pool.transcribe_batched(audio, keep_words=True, language="en",
+                                                      clip_timestamps=clips, vad_filter=False)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(2)]
+    for t in threads:
+        t.start()
+        time.sleep(0.05)
+    for t in threads:
+        t.join(5)
+    assert len(_SpeechModel.calls) == 1
+    # The second clip starts after the first one and a 1 s gap
+    assert _SpeechModel.calls[0]["clip_timestamps"] == [0.5, 1.0, 2.0, 2.5]
+    assert [r["segments"][0]["words"][0]["start"] for r in results] == [pytest.approx(0.5), pytest.approx(0.0)]
+
+
+def test_split_batched_result_assigns_words_to_clips():
+    # Two 2 s clips joined with a 1 s gap: the second starts at 3 s
+    joined = {"segments": [{"start": 0.2, "end": 4.5, "text": " one two", "words": [
+        {"word": " one", "start": 0.2, "end": 0.6, "probability": 0.9},
+        {"word": " two", "start": 3.4, "end": 3.9, "probability": 0.8},
+    ]}]}
+    first, second = split_batched_result(joined, offsets=[0.0, 3.0], durations=[2.0, 2.0])
+    assert first["text"] == "one"
+    assert second["text"] == "two"
+    assert second["segments"][0]["words"][0]["start"] == pytest.approx(0.4)